@@ -5,7 +5,7 @@ import sys
 # Add interviewer module to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from streamlit_app.config import load_sidebar_config, initialize_session_state
+from streamlit_app.config import COMPARE_VIEW, load_sidebar_config, initialize_session_state
 from streamlit_app.ui import render_interview_header, render_interview_interface
 from streamlit_app.report import render_report
 
@@ -25,12 +25,18 @@ initialize_session_state()
 # Load sidebar configuration
 config = load_sidebar_config()
 
-# Render interview header
-render_interview_header(config["template"])
-
-# Render interview interface
-render_interview_interface(config, config["template"])
-
-# Render report if interview is complete
-if st.session_state.interview_complete and st.session_state.report:
-    render_report(st.session_state.report)
+if config["view"] == COMPARE_VIEW:
+    # Cross-candidate analytics over archived reports (imported here: the
+    # analytics stack pulls in numpy, which the interview view doesn't need)
+    from streamlit_app.compare import render_compare_view
+    render_compare_view()
+else:
+    # Render interview header
+    render_interview_header(config["template"], config)
+
+    # Render interview interface
+    render_interview_interface(config, config["template"])
+
+    # Render report if interview is complete
+    if st.session_state.interview_complete and st.session_state.report:
+        render_report(st.session_state.report)
@@ -0,0 +1,78 @@
+"""
+Time to build a ReportTable from synthetic reports and compute the
+cross-candidate statistics (weighted scores, percentile ranks, dimension
+percentiles, distributions and a candidate comparison), plus the .npz
+save/load round trip.
+
+Usage (from the project root):
+    python -m benchmarks.bench_analytics --reports 100000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from interviewer.analytics import ReportTable
+from interviewer.report import get_recommendation
+
+TEMPLATES = [("AI_engineer.yaml", "AI Engineer", ["ML Basics", "Applied AI & LLMs", "Communication"]),
+             (None, "AI Engineer", ["ML Basics", "Applied AI & LLMs", "Communication"]),
+             (None, "Backend Engineer", ["APIs", "Databases", "System Design", "Behavioral"])]
+
+
+def make_reports(count, seed=7):
+    rng = random.Random(seed)
+    reports = []
+    for i in range(count):
+        template, role, dimensions = TEMPLATES[i % len(TEMPLATES)]
+        dimension_scores = {
+            dimension: {"average_score": rng.randint(2, 10) / 2, "count": 2}
+            for dimension in dimensions if rng.random() > 0.05
+        }
+        average = sum(d["average_score"] for d in dimension_scores.values()) / max(1, len(dimension_scores))
+        reports.append({
+            "candidate_summary": {"name": f"Candidate {i}", "position": role, "template": template,
+                                  "date": "2026-10-18"},
+            "overall_recommendation": get_recommendation(average),
+            "average_score": round(average, 2),
+            "dimension_scores": dimension_scores,
+            "total_turns": 2 * len(dimensions),
+            "summary_statistics": {
+                "score_distribution": {str(level): rng.randint(0, 3) for level in range(1, 6)},
+                "unscored_turns": rng.randint(0, 1)
+            }
+        })
+    return reports
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"  {label:<24} {time.perf_counter() - start:7.3f}s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, default=100000)
+    args = parser.parse_args()
+
+    reports = make_reports(args.reports)
+    print(f"{args.reports} reports")
+    table = timed("build table", lambda: ReportTable.from_reports(reports))
+    weighted = timed("weighted scores", table.weighted_scores)
+    timed("percentile ranks", lambda: table.percentile_ranks(weighted))
+    timed("dimension percentiles", table.dimension_percentiles)
+    summary = timed("full summary", lambda: table.summary(top=10))
+    timed("compare 5 candidates", lambda: table.compare(table.find("Candidate 1")[:5]))
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "reports.npz")
+        timed("save .npz", lambda: table.save(path))
+        size = os.path.getsize(path)
+        loaded = timed("load .npz", lambda: ReportTable.load(path))
+    print(f"  .npz size {size / 1024 / 1024:.1f} MB ({size / len(loaded):.0f} B/report) | "
+          f"mean weighted score {summary['weighted_score']['mean']}")
+
+
+if __name__ == "__main__":
+    main()
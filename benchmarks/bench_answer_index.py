@@ -0,0 +1,105 @@
+"""
+Near-duplicate lookups in the answer index (LSH buckets) against a brute
+force comparison with every indexed answer to the question, as the index
+grows. Answers are synthetic; a share of the queries are lightly edited
+copies of indexed answers.
+
+Reports the mean lookup time of both, the recall of the LSH lookup (brute
+force matches above the threshold it also finds), the mean number of
+scores it would reuse, and the time to persist and reload the index.
+
+Usage (from the project root):
+    python -m benchmarks.bench_answer_index --sizes 1000 10000 50000 --queries 200
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import numpy as np
+from interviewer.answer_index import AnswerIndex, partition_key
+from interviewer.sessions import InterviewSession
+
+QUESTION = "How would you reduce the latency of an LLM-backed service?"
+SCORER = "bench-model/v1"
+WORDS = ("model data training latency prompt evaluation feature pipeline trade-off overfitting "
+         "regularization embedding retrieval context window token batch gradient cache request "
+         "throughput queue replica quantization streaming cost accuracy").split()
+
+
+def make_answer(rng):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 120)))
+
+
+def edit_answer(answer, rng, edits=2):
+    """A near-copy: a few words swapped out"""
+    words = answer.split()
+    for _ in range(edits):
+        words[rng.randrange(len(words))] = rng.choice(WORDS)
+    return " ".join(words)
+
+
+def build_index(answers, path=None):
+    index = AnswerIndex(path=path, max_per_partition=len(answers))
+    # Added in sessions of 50 answers, as interviews finishing would
+    for start in range(0, len(answers), 50):
+        session = InterviewSession(role="AI Engineer")
+        for answer in answers[start:start + 50]:
+            session.add_turn(QUESTION, answer, 1 + len(answer) % 5)
+        index.add_session(session, SCORER)
+    return index
+
+
+def brute_force(index, answer):
+    """Every indexed answer compared with the query"""
+    signature = index.hasher.signature(answer)
+    partition = index._partitions[partition_key(QUESTION, SCORER)]
+    similarities = (np.stack(partition.signatures) == signature).mean(axis=1)
+    floor = min(index.reuse_threshold, index.flag_threshold)
+    return sorted(round(float(s), 3) for s in similarities if s >= floor)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--duplicate-share", type=float, default=0.5)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        rng = random.Random(size)
+        answers = [make_answer(rng) for _ in range(size)]
+        index = build_index(answers)
+        queries = [edit_answer(rng.choice(answers), rng) if rng.random() < args.duplicate_share else make_answer(rng)
+                   for _ in range(args.queries)]
+
+        start = time.perf_counter()
+        results = [index.lookup(QUESTION, query, SCORER) for query in queries]
+        lsh_seconds = (time.perf_counter() - start) / len(queries)
+        start = time.perf_counter()
+        expected = [brute_force(index, query) for query in queries]
+        brute_seconds = (time.perf_counter() - start) / len(queries)
+
+        found = sum(len(matches) for matches in results)
+        total = sum(len(matches) for matches in expected)
+        reused = sum(index.reusable_score(matches) is not None for matches in results)
+        print(f"{size:>7} answers | lookup {lsh_seconds * 1000:6.2f} ms vs brute force {brute_seconds * 1000:7.2f} ms "
+              f"({brute_seconds / lsh_seconds:5.1f}x) | recall {found / max(1, total):6.1%} | "
+              f"{reused}/{len(queries)} scores reused")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "answer_index.sqlite")
+        rng = random.Random(0)
+        answers = [make_answer(rng) for _ in range(min(args.sizes))]
+        start = time.perf_counter()
+        build_index(answers, path)
+        insert_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        reloaded = AnswerIndex(path=path)
+        load_seconds = time.perf_counter() - start
+        print(f"persist {len(answers)} answers {insert_seconds:.2f}s | reload {load_seconds:.2f}s | "
+              f"{os.path.getsize(path) / len(answers):.0f} B/answer | {reloaded.stats()['answers']} reloaded")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Compare single-answer scoring with packed batch scoring.
+
+Usage (from the project root, GROQ_API_KEY set):
+    python -m benchmarks.bench_batch_scoring --answers 40
+    python -m benchmarks.bench_batch_scoring --report interview_report.json
+"""
+import argparse
+import json
+import time
+from dotenv import load_dotenv
+from interviewer.clients import require_api_key
+from interviewer.evaluator import evaluate_answer, evaluate_answers_batch
+
+SAMPLE_ANSWERS = [
+    "Supervised learning uses labeled data to learn a mapping from inputs to outputs, unsupervised learning finds structure in unlabeled data such as clusters.",
+    "I don't know.",
+    "Prompt engineering is designing the input text so the model produces the output you want; it matters because small wording changes shift results a lot.",
+    "Overfitting is when the model memorizes the training set. Regularization, dropout, early stopping and more data help.",
+    "I read the docs, build a tiny project with it and then compare it to something I already know.",
+]
+
+
+def load_answers(args):
+    if args.report:
+        with open(args.report, "r") as f:
+            report = json.load(f)
+        return [turn["answer"] for turn in report["transcript"]]
+    return [SAMPLE_ANSWERS[i % len(SAMPLE_ANSWERS)] for i in range(args.answers)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--answers", type=int, default=20, help="Number of synthetic answers")
+    parser.add_argument("--report", help="Score the transcript of a downloaded report instead")
+    parser.add_argument("--batch-tokens", type=int, default=3000)
+    parser.add_argument("--skip-single", action="store_true", help="Only run the batched path")
+    args = parser.parse_args()
+
+    load_dotenv()
+    api_key = require_api_key("Groq")
+
+    answers = load_answers(args)
+    print(f"Scoring {len(answers)} answers")
+
+    if not args.skip_single:
+        start = time.perf_counter()
+        for answer in answers:
+            evaluate_answer(answer, api_key)
+        elapsed = time.perf_counter() - start
+        print(f"single : {len(answers)} requests | 1.00 answers/request | {len(answers) / elapsed:.2f} answers/s")
+
+    stats = {}
+    start = time.perf_counter()
+    evaluate_answers_batch(answers, api_key, max_batch_tokens=args.batch_tokens, stats=stats)
+    elapsed = time.perf_counter() - start
+    requests = stats["batch_requests"] + stats["single_requests"]
+    print(
+        f"batched: {requests} requests ({stats['single_requests']} fallback) | "
+        f"{len(answers) / max(requests, 1):.2f} answers/request | {len(answers) / elapsed:.2f} answers/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
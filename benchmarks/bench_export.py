@@ -0,0 +1,108 @@
+"""
+Size and throughput of the report export formats against the current
+export (one indented JSON document per report): NDJSON archives plain,
+gzip and zstd, and Parquet with zstd and gzip. Reports are synthetic
+sessions with full transcripts.
+
+Reports "write" and "read all" throughput, bytes per report and the mean
+time to load one candidate by name from the archive.
+
+Usage (from the project root):
+    python -m benchmarks.bench_export --reports 2000 --turns 12
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from interviewer.export import open_archive, open_archive_writer
+from interviewer.report import generate_report
+from interviewer.sessions import InterviewSession
+
+DIMENSIONS = ["ML Basics", "Applied AI & LLMs", "Communication"]
+WORDS = ("model data training latency prompt evaluation feature pipeline trade-off overfitting "
+         "regularization embedding retrieval context window token batch gradient").split()
+ARCHIVES = ["reports.ndjson", "reports.ndjson.gz", "reports.ndjson.zst", "reports.parquet", "reports.gz.parquet"]
+
+
+def make_reports(count, turns, seed=11):
+    rng = random.Random(seed)
+    reports = []
+    for i in range(count):
+        session = InterviewSession(role="AI Engineer", candidate_name=f"Candidate {i}", template="AI_engineer.yaml")
+        for turn in range(turns):
+            answer = " ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 120)))
+            session.add_turn(f"Question {turn}: how would you approach {rng.choice(WORDS)}?", answer,
+                             rng.randint(1, 5), dimension=DIMENSIONS[turn % len(DIMENSIONS)])
+        reports.append(generate_report(session))
+    return reports
+
+
+def bench_json_files(reports, directory):
+    """The current export: one indented JSON file per report"""
+    start = time.perf_counter()
+    paths = []
+    for i, report in enumerate(reports):
+        path = os.path.join(directory, f"report_{i}.json")
+        with open(path, "w") as f:
+            f.write(json.dumps(report, indent=2, default=str))
+        paths.append(path)
+    write_seconds = time.perf_counter() - start
+    size = sum(os.path.getsize(path) for path in paths)
+    start = time.perf_counter()
+    for path in paths:
+        with open(path, "r") as f:
+            json.load(f)
+    read_seconds = time.perf_counter() - start
+    # Loading one candidate means finding and parsing its file
+    start = time.perf_counter()
+    for i in range(0, len(paths), max(1, len(paths) // 50)):
+        with open(paths[i], "r") as f:
+            json.load(f)
+    get_seconds = (time.perf_counter() - start) / len(range(0, len(paths), max(1, len(paths) // 50)))
+    return write_seconds, read_seconds, get_seconds, size
+
+
+def bench_archive(reports, path):
+    start = time.perf_counter()
+    compression = "gzip" if path.endswith(".gz.parquet") else None
+    with open_archive_writer(path, compression=compression) as writer:
+        for report in reports:
+            writer.write(report)
+    write_seconds = time.perf_counter() - start
+    size = os.path.getsize(path)
+    start = time.perf_counter()
+    count = sum(1 for _ in open_archive(path))
+    read_seconds = time.perf_counter() - start
+    assert count == len(reports)
+    names = [f"Candidate {i}" for i in range(0, len(reports), max(1, len(reports) // 50))]
+    start = time.perf_counter()
+    for name in names:
+        # A fresh reader each time: nothing cached between lookups
+        assert open_archive(path).get(name) is not None
+    get_seconds = (time.perf_counter() - start) / len(names)
+    return write_seconds, read_seconds, get_seconds, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, default=2000)
+    parser.add_argument("--turns", type=int, default=12)
+    args = parser.parse_args()
+
+    reports = make_reports(args.reports, args.turns)
+    print(f"{args.reports} reports x {args.turns} turns")
+    with tempfile.TemporaryDirectory() as directory:
+        results = [("indented JSON files", bench_json_files(reports, directory))]
+        for name in ARCHIVES:
+            results.append((name, bench_archive(reports, os.path.join(directory, name))))
+    baseline = results[0][1][3]
+    for label, (write_seconds, read_seconds, get_seconds, size) in results:
+        print(f"  {label:<20} {size / len(reports):8.0f} B/report ({size / baseline:5.1%}) | "
+              f"write {len(reports) / write_seconds:7.0f}/s | read all {len(reports) / read_seconds:7.0f}/s | "
+              f"get one {get_seconds * 1000:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
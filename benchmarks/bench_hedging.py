@@ -0,0 +1,62 @@
+"""
+Tail latency with and without hedged requests, on the Local fake model with
+a simulated slow tail (a share of calls stalls before the first token).
+
+Reports p50 / p95 / p99 / max call latency, the hedge rate and the latency
+saved by hedges that won.
+
+Usage (from the project root):
+    python -m benchmarks.bench_hedging --calls 600 --slow-rate 0.03 --slow-seconds 1.5
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from interviewer.hedging import Hedger
+from interviewer.local_llm import FakeChatModel
+from interviewer.scheduler import ScheduledChatModel
+from interviewer.telemetry import percentile
+import interviewer.hedging as hedging
+
+
+def run(args, hedge_percentile):
+    # A fresh hedger per run so the latency history starts empty
+    hedging._default_hedger = Hedger(hedge_percentile=hedge_percentile, max_hedge_rate=args.max_hedge_rate)
+    llm = ScheduledChatModel(
+        provider="Local", model_name="fake",
+        inner=FakeChatModel(first_token_seconds=args.first_token_seconds, tokens_per_second=0,
+                            slow_call_rate=args.slow_rate, slow_call_seconds=args.slow_seconds)
+    )
+
+    def call(i):
+        start = time.perf_counter()
+        llm.invoke(f"Benchmark prompt {i % 7}")
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        latencies = list(pool.map(call, range(args.calls)))
+    # Let abandoned primaries finish so the latency saved is counted
+    time.sleep(args.slow_seconds)
+    return latencies, hedging._default_hedger.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=600)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--first-token-seconds", type=float, default=0.05)
+    parser.add_argument("--slow-rate", type=float, default=0.03)
+    parser.add_argument("--slow-seconds", type=float, default=1.5)
+    parser.add_argument("--percentile", type=float, default=95)
+    parser.add_argument("--max-hedge-rate", type=float, default=0.1)
+    args = parser.parse_args()
+
+    for label, hedge_percentile in (("no hedging", 0), (f"hedge at p{args.percentile:g}", args.percentile)):
+        latencies, stats = run(args, hedge_percentile)
+        print(f"{label:<14} p50 {percentile(latencies, 50):.3f}s | p95 {percentile(latencies, 95):.3f}s | "
+              f"p99 {percentile(latencies, 99):.3f}s | max {max(latencies):.3f}s | "
+              f"hedged {stats['hedge_rate']:.1%} ({stats['hedge_wins']} won, "
+              f"{stats['latency_saved_seconds']:.1f}s saved)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Measure cold-start import time of the app entry modules with
+`python -X importtime` in a fresh interpreter, print the heaviest imports
+and append the result to a JSONL history so regressions are visible
+across commits.
+
+Usage (from the project root):
+    python -m benchmarks.bench_import_time --runs 3
+    python -m benchmarks.bench_import_time --max-ms 1500   # exit 1 if slower
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ENTRY_MODULES = ["streamlit_app.config", "streamlit_app.ui", "streamlit_app.report"]
+HISTORY_PATH = Path(".cache/import_time.jsonl")
+
+
+def measure(modules):
+    """Return ({module: cumulative_us}, total_us) for one cold import"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + ", ".join(modules)],
+        capture_output=True, text=True, check=True
+    )
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cum, name = line[len("import time:"):].split("|")
+        if cum.strip().isdigit():
+            cumulative[name.strip()] = int(cum)
+    total = sum(cumulative.get(module, 0) for module in modules)
+    return cumulative, total
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", nargs="+", default=ENTRY_MODULES)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--max-ms", type=float, default=None)
+    parser.add_argument("--history", default=str(HISTORY_PATH))
+    args = parser.parse_args()
+
+    totals = []
+    for _ in range(args.runs):
+        cumulative, total = measure(args.modules)
+        totals.append(total / 1000)
+    median_ms = statistics.median(totals)
+
+    print(f"import {', '.join(args.modules)}: median {median_ms:.0f} ms over {args.runs} runs")
+    print("Heaviest imports (last run):")
+    for name, us in sorted(cumulative.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    history = Path(args.history)
+    history.parent.mkdir(parents=True, exist_ok=True)
+    with open(history, "a") as f:
+        f.write(json.dumps({
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": git_commit(),
+            "modules": args.modules,
+            "median_ms": round(median_ms, 1)
+        }) + "\n")
+
+    if args.max_ms is not None and median_ms > args.max_ms:
+        print(f"Import time {median_ms:.0f} ms exceeds budget of {args.max_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Time reruns of the parts of the Streamlit report page that changed with
+memoization (transcript rendering and the JSON download artifact) for a
+long interview: the previous per-turn rendering and per-rerun json.dumps
+against the memoized versions in streamlit_app/report.py.
+
+Usage (from the project root):
+    python -m benchmarks.bench_report_render --turns 200 --reruns 20
+"""
+import argparse
+import statistics
+import time
+from streamlit.testing.v1 import AppTest
+from interviewer.report import generate_report
+from interviewer.sessions import InterviewSession
+
+
+def legacy_page():
+    import json
+    import streamlit as st
+    report = st.session_state.report
+    with st.expander("📝 Full Transcript"):
+        for i, turn in enumerate(report["transcript"], 1):
+            st.write(f"**Q{i}:** {turn['question']}")
+            st.write(f"**A:** {turn['answer']}")
+            st.caption(f"Score: {turn['score']}/5 | Dimension: {turn.get('dimension', 'N/A')}")
+            st.divider()
+    st.download_button("📥 Download Report (JSON)", data=json.dumps(report, indent=2, default=str),
+                       file_name="report.json", mime="application/json")
+
+
+def memoized_page():
+    import streamlit as st
+    from streamlit_app.report import get_report_download, get_transcript_markdown
+    report = st.session_state.report
+    with st.expander("📝 Full Transcript"):
+        st.markdown(get_transcript_markdown(report))
+    report_json, file_name = get_report_download(report)
+    st.download_button("📥 Download Report (JSON)", data=report_json,
+                       file_name=file_name, mime="application/json")
+
+
+def build_report(turns):
+    session = InterviewSession(role="AI Engineer", candidate_name="Benchmark Candidate")
+    for i in range(turns):
+        session.add_turn(
+            f"Question {i}: explain a machine learning concept in depth?",
+            "A fairly long answer about bias, variance, regularization and evaluation. " * 8,
+            (i % 5) + 1,
+            dimension=f"Section {i % 4}"
+        )
+    return generate_report(session)
+
+
+def time_reruns(page, report, reruns):
+    app = AppTest.from_function(page, default_timeout=60)
+    app.session_state["report"] = report
+    app.run()  # first render, not timed
+    samples = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        app.run()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--reruns", type=int, default=20)
+    args = parser.parse_args()
+
+    report = build_report(args.turns)
+    for label, page in (("before (per rerun)", legacy_page), ("after (memoized)", memoized_page)):
+        samples = time_reruns(page, report, args.reruns)
+        print(f"{label:<20} mean {statistics.mean(samples) * 1000:7.1f} ms | p50 {statistics.median(samples) * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
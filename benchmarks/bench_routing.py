@@ -0,0 +1,117 @@
+"""
+Model routing by answer complexity against fixed evaluator models, on the
+Local fake models: `fake` as the fast tier and `fake-large` (3x slower) as
+the strong one, priced as the Groq models they stand in for.
+
+Scores a mix of short, plain, technical, code and long answers three
+ways: always the fast model, always the strong model, and routed by the
+template's routing settings (with borderline re-evaluation), turned on
+for the run even if the template leaves routing off. Reports calls per
+tier, re-evaluations, mean/p95 scoring latency and estimated cost, and
+the time taken to size up an answer.
+
+Usage (from the project root):
+    python -m benchmarks.bench_routing --answers 60 --template AI_engineer.yaml
+"""
+import argparse
+import os
+import random
+import time
+
+# Shorter simulated latency than the app default, set before the models are built
+os.environ.setdefault("LOCAL_LLM_FIRST_TOKEN_SECONDS", "0.05")
+
+from interviewer.evaluator import EVALUATION_PROMPT, evaluate_answer
+from interviewer.local_llm import _usage, fake_response
+from interviewer.routing import RoutingPolicy, assess_answer, model_prices
+from interviewer.telemetry import TurnTelemetry, percentile
+from interviewer.templates import DEFAULT_TEMPLATE, get_template_registry
+
+ANSWERS = {
+    "short": ["I don't know.", "Labels versus no labels.", "Mostly by reading the docs."],
+    "plain": [
+        "Supervised learning is when we have examples with the right answers and the model learns from them, "
+        "while unsupervised learning has no answers and looks for groups on its own.",
+        "I usually start with a small project, read how other people use the tool and then compare it with what "
+        "I already know, so that I understand where it helps and where it does not.",
+        "It learns from labelled examples while the other kind finds patterns in data without any labels."
+    ],
+    "technical": [
+        "I'd shard the Postgres DB by tenant_id, put a Redis LRU cache with TTL 60s in front, use gRPC between "
+        "services and track p99 latency with Prometheus histograms and batch inference on GPU.",
+        "Use L2 regularization and dropout, tune the learning_rate with a cosine schedule, watch validation loss "
+        "for overfitting and compare F1 and AUC across k-fold splits."
+    ],
+    "code": ["You can do it like this:\n```python\ndef score(x):\n    return model.predict(x)\n```"],
+    "long": [" ".join(["The trade-off depends on the data we have, how much latency the product allows and "
+                       "how often the model has to be retrained to keep up with the users."] * 6)]
+}
+
+
+def make_answers(count, seed=0):
+    rng = random.Random(seed)
+    kinds = list(ANSWERS)
+    # Unique suffixes so nothing is served from a cache
+    return [f"{rng.choice(ANSWERS[kind])} ({i})" for i, kind in ((i, rng.choice(kinds)) for i in range(count))]
+
+
+def run(answers, model, routing=None):
+    latencies = []
+    routes = []
+    for i, answer in enumerate(answers):
+        telemetry = TurnTelemetry()
+        start = time.perf_counter()
+        with telemetry.active():
+            evaluate_answer(answer, None, question=f"Question {i}", use_cache=False, provider="Local", model=model,
+                            routing=routing)
+        latencies.append(time.perf_counter() - start)
+        routes.extend(telemetry.as_dict().get("routes", []))
+    return latencies, routes
+
+
+def fixed_cost(answers, model):
+    # The fake evaluator's usage is the prompt and a short reply, as estimated in local_llm
+    price = model_prices()[model]
+    total = 0.0
+    for answer in answers:
+        prompt = EVALUATION_PROMPT.format(answer=answer)
+        usage = _usage(prompt, fake_response(prompt))
+        total += (usage["input_tokens"] * price[0] + usage["output_tokens"] * price[1]) / 1e6
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--answers", type=int, default=60)
+    parser.add_argument("--template", default=DEFAULT_TEMPLATE, help="Template whose routing policy is used")
+    args = parser.parse_args()
+
+    answers = make_answers(args.answers)
+    template = get_template_registry().get(args.template)
+    policy = RoutingPolicy.from_config(dict(template.raw.get("routing") or {}, enabled=True))
+    if policy.tiers("scoring", "Local", "fake") is None:
+        raise ValueError("Routing is disabled (MODEL_ROUTING=0)")
+
+    start = time.perf_counter()
+    for answer in answers:
+        policy.classify(assess_answer(answer))
+    assess_us = (time.perf_counter() - start) / len(answers) * 1e6
+
+    print(f"Scoring {len(answers)} answers; sizing up an answer takes {assess_us:.0f} us")
+    for name, model in (("fast only", "fake"), ("strong only", "fake-large")):
+        latencies, _ = run(answers, model)
+        print(f"{name:>12} | mean {sum(latencies) / len(latencies) * 1000:5.0f} ms | "
+              f"p95 {percentile(latencies, 95) * 1000:5.0f} ms | ${fixed_cost(answers, model):.5f}")
+
+    latencies, routes = run(answers, "fake", routing=policy)
+    tiers = {tier: sum(1 for r in routes if r["tier"] == tier and not r["re_evaluation"]) for tier in ("fast", "strong")}
+    re_evaluations = sum(1 for r in routes if r["re_evaluation"])
+    cost = sum(r.get("cost_usd", 0.0) for r in routes)
+    baseline = sum(r.get("baseline_usd", 0.0) for r in routes)
+    print(f"{'routed':>12} | mean {sum(latencies) / len(latencies) * 1000:5.0f} ms | "
+          f"p95 {percentile(latencies, 95) * 1000:5.0f} ms | ${cost:.5f} | {tiers['fast']} fast / "
+          f"{tiers['strong']} strong, {re_evaluations} re-evaluated | {1 - cost / baseline:.0%} cheaper than strong only")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Load test of the async interview service (interviewer/service.py) against
+the Local fake LLM: how many concurrent interviews one core sustains.
+
+The service runs in a subprocess pinned to one CPU core. Each level keeps
+`concurrency` simulated candidates busy: they answer, wait a think time,
+answer again, and start a new interview when one completes. Reports turns
+per second, turn latency percentiles, failed turns (503/504/other) and the
+server's CPU use (from /health). A level is sustained when the p95 turn
+latency stays under --max-p95 and fewer than 1% of turns fail.
+
+Usage (from the project root):
+    python -m benchmarks.bench_service --levels 100 200 400 800 --think-seconds 5 --duration 20
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import aiohttp
+from interviewer.telemetry import percentile
+
+WORDS = ("model data training latency prompt evaluation feature pipeline trade-off overfitting "
+         "regularization embedding retrieval context window token batch gradient cache").split()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port, max_sessions, first_token_seconds, directory):
+    env = dict(os.environ, LOCAL_LLM_FIRST_TOKEN_SECONDS=str(first_token_seconds), SESSION_LOG_DIR="",
+               SCORE_CACHE_PATH=os.path.join(directory, "score_cache.sqlite"),
+               ANSWER_INDEX_PATH=os.path.join(directory, "answer_index.sqlite"))
+    pin = (lambda: os.sched_setaffinity(0, {0})) if hasattr(os, "sched_setaffinity") else None
+    return subprocess.Popen(
+        [sys.executable, "-m", "interviewer.service", "--provider", "Local", "--model", "fake",
+         "--port", str(port), "--max-sessions", str(max_sessions), "--max-inflight-turns", str(max_sessions)],
+        env=env, preexec_fn=pin, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+
+async def wait_ready(client, url, timeout=60):
+    until = time.monotonic() + timeout
+    while time.monotonic() < until:
+        try:
+            async with client.get(f"{url}/health") as response:
+                if response.status == 200:
+                    return
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("service did not start")
+
+
+async def candidate(client, url, index, think_seconds, until, results):
+    rng = random.Random(index)
+    await asyncio.sleep(rng.uniform(0, think_seconds))
+    while time.monotonic() < until:
+        async with client.post(f"{url}/sessions", json={"candidate_name": f"Load {index}"}) as response:
+            if response.status != 201:
+                results["errors"][response.status] = results["errors"].get(response.status, 0) + 1
+                await asyncio.sleep(think_seconds)
+                continue
+            session_id = (await response.json())["session_id"]
+        complete = False
+        while not complete and time.monotonic() < until:
+            await asyncio.sleep(think_seconds * rng.uniform(0.5, 1.5))
+            # Unique answers, so neither the score cache nor the answer index short-cuts scoring
+            answer = f"Candidate {index} says " + " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 60)))
+            start = time.perf_counter()
+            async with client.post(f"{url}/sessions/{session_id}/answers", json={"answer": answer}) as response:
+                if response.status == 200:
+                    complete = (await response.json())["complete"]
+                    results["latencies"].append(time.perf_counter() - start)
+                else:
+                    results["errors"][response.status] = results["errors"].get(response.status, 0) + 1
+        async with client.delete(f"{url}/sessions/{session_id}") as response:
+            await response.read()
+
+
+async def server_stats(client, url):
+    async with client.get(f"{url}/health") as response:
+        return await response.json()
+
+
+async def run_level(client, url, concurrency, think_seconds, duration):
+    results = {"latencies": [], "errors": {}}
+    before = await server_stats(client, url)
+    start = time.monotonic()
+    until = start + duration
+    await asyncio.gather(*(candidate(client, url, i, think_seconds, until, results) for i in range(concurrency)))
+    wall = time.monotonic() - start
+    after = await server_stats(client, url)
+    results["wall_seconds"] = wall
+    results["server_cpu"] = (after["cpu_seconds"] - before["cpu_seconds"]) / wall
+    return results
+
+
+async def main_async(args):
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory() as directory:
+        server = start_server(port, max(args.levels) * 2, args.first_token_seconds, directory)
+        try:
+            connector = aiohttp.TCPConnector(limit=0)
+            async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=120)) as client:
+                await wait_ready(client, url)
+                if (os.cpu_count() or 1) == 1:
+                    print("Note: one CPU only; the load generator shares the server's core")
+                print(f"think time {args.think_seconds}s, fake LLM first token {args.first_token_seconds}s, "
+                      f"{args.duration}s per level")
+                sustained = None
+                for concurrency in args.levels:
+                    results = await run_level(client, url, concurrency, args.think_seconds, args.duration)
+                    latencies = results["latencies"]
+                    failed = sum(results["errors"].values())
+                    p95 = percentile(latencies, 95) if latencies else float("inf")
+                    ok = latencies and p95 <= args.max_p95 and failed <= 0.01 * (len(latencies) + failed)
+                    if ok:
+                        sustained = concurrency
+                    print(f"  {concurrency:>6} interviews | {len(latencies) / results['wall_seconds']:7.1f} turns/s | "
+                          f"p50 {percentile(latencies, 50) * 1000 if latencies else 0:6.0f} ms | "
+                          f"p95 {p95 * 1000:6.0f} ms | failed {failed} {results['errors'] or ''} | "
+                          f"server CPU {results['server_cpu']:4.0%} | {'sustained' if ok else 'overloaded'}")
+                    if not ok:
+                        break
+                print(f"Sustained on one core: {sustained or 0} concurrent interviews "
+                      f"(p95 <= {args.max_p95}s, {args.think_seconds}s think time)")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", type=int, nargs="+", default=[100, 200, 400, 800])
+    parser.add_argument("--think-seconds", type=float, default=5.0, help="Mean time a candidate takes to answer")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per level")
+    parser.add_argument("--first-token-seconds", type=float, default=0.3, help="Fake LLM latency")
+    parser.add_argument("--max-p95", type=float, default=2.0, help="Turn latency (seconds) a level must stay under")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Bytes per InterviewSession at 10 / 100 / 1000 turns, for the compact layout
+in interviewer/sessions.py against the previous dict-per-turn layout
+(transcript dicts, a parallel evaluations list, per-dimension score lists
+and copied notable quotes).
+
+Question and answer strings are created before measuring, so the numbers
+are the overhead of the session layout itself (what is added per session
+on top of the text, which both layouts share).
+
+Usage (from the project root):
+    python -m benchmarks.bench_session_memory --sessions 50
+"""
+import argparse
+import gc
+import tracemalloc
+from interviewer.sessions import InterviewSession
+
+DIMENSIONS = ["ML Basics", "System Design", "Behavioral", "Coding"]
+
+
+class LegacySession:
+    """The session layout before the compact representation"""
+
+    def __init__(self, role, candidate_name=None):
+        self.role = role
+        self.candidate_name = candidate_name or "Anonymous"
+        self.transcript = []
+        self.evaluations = []
+        self.dimension_scores = {}
+        self.notable_quotes = []
+
+    def add_turn(self, question, answer, evaluation, dimension=None, telemetry=None):
+        self.transcript.append({"question": question, "answer": answer, "score": evaluation, "dimension": dimension})
+        if evaluation is None:
+            return
+        self.evaluations.append(evaluation)
+        if dimension:
+            self.dimension_scores.setdefault(dimension, []).append(evaluation)
+        if evaluation >= 4 or evaluation <= 2:
+            self.notable_quotes.append({"question": question, "answer": answer, "score": evaluation})
+
+
+def make_turns(turns):
+    return [
+        (f"Question {i}: explain a concept in depth?", f"Answer {i} about trade-offs. " * 10,
+         (i % 5) + 1, DIMENSIONS[i % len(DIMENSIONS)])
+        for i in range(turns)
+    ]
+
+
+def bytes_per_session(session_class, turns, sessions):
+    scripts = [make_turns(turns) for _ in range(sessions)]
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = []
+    for script in scripts:
+        session = session_class(role="AI Engineer", candidate_name="Benchmark Candidate")
+        for question, answer, score, dimension in script:
+            session.add_turn(question, answer, score, dimension=dimension)
+        kept.append(session)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used / sessions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--turns", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    for turns in args.turns:
+        legacy = bytes_per_session(LegacySession, turns, args.sessions)
+        compact = bytes_per_session(InterviewSession, turns, args.sessions)
+        print(f"{turns:>5} turns: legacy {legacy / 1024:8.1f} KB | compact {compact / 1024:8.1f} KB | "
+              f"{compact / turns:6.0f} B/turn ({1 - compact / legacy:.0%} smaller)")
+
+
+if __name__ == "__main__":
+    main()
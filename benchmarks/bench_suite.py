@@ -0,0 +1,121 @@
+"""
+Offline benchmark suite on the Local provider (no API keys needed).
+
+Measures, for the split, streaming and combined turn paths:
+  - per-turn latency (p50 / p95)
+  - prompt and output tokens per turn
+  - interviewer reply parse success rate
+and report generation time for the CLI path (generate_report) and the
+Streamlit report page (AppTest rerun).
+
+Use `--model replay` to run against responses recorded with LLM_RECORD=1.
+
+Usage (from the project root):
+    python -m benchmarks.bench_suite --turns 12 --json bench_results.json
+"""
+import argparse
+import json
+import statistics
+import time
+import uuid
+from langchain_core.callbacks import get_usage_metadata_callback
+from interviewer.clients import LOCAL_MODELS, LOCAL_PROVIDER
+from interviewer.evaluator import evaluate_answer
+from interviewer.interview_chain import build_interview_chain
+from interviewer.interview_step import build_step_chain
+from interviewer.parsing import get_parse_stats
+from interviewer.report import generate_report
+from interviewer.sessions import InterviewSession
+from interviewer.telemetry import percentile
+from interviewer.turns import StreamingTurn, run_turn, run_step_turn
+from benchmarks.bench_report_render import build_report, memoized_page, time_reruns
+from benchmarks.bench_turn_modes import SCRIPT
+
+
+def run_path(path, model, turns):
+    chain = build_interview_chain(LOCAL_PROVIDER, None, model)
+    step_chain = build_step_chain(LOCAL_PROVIDER, None, model) if path == "combined" else None
+    session_id = f"bench-{path}-{uuid.uuid4().hex}"
+    parse_before = get_parse_stats()
+    latencies = []
+    with get_usage_metadata_callback() as usage:
+        for i in range(turns):
+            question, answer = SCRIPT[i % len(SCRIPT)]
+            chain_input = {"input": answer, "role": "AI Engineer", "question": question}
+            evaluate = lambda: evaluate_answer(answer, None, question=question, use_cache=False,
+                                               provider=LOCAL_PROVIDER, model=model)
+            if path == "combined":
+                turn = run_step_turn(step_chain, chain_input, session_id)
+            elif path == "streaming":
+                streaming = StreamingTurn(chain, chain_input, session_id, evaluate)
+                for _ in streaming.question_stream():
+                    pass
+                turn = streaming.result()
+            else:
+                turn = run_turn(chain, chain_input, session_id, evaluate)
+            latencies.append(turn.timings["total_seconds"])
+    parse_after = get_parse_stats()
+
+    parsed = parse_after["responses"] - parse_before["responses"]
+    failed = parse_after["failures"] - parse_before["failures"]
+    input_tokens = sum(u.get("input_tokens", 0) for u in usage.usage_metadata.values())
+    output_tokens = sum(u.get("output_tokens", 0) for u in usage.usage_metadata.values())
+    return {
+        "turns": turns,
+        "latency_p50_seconds": percentile(latencies, 50),
+        "latency_p95_seconds": percentile(latencies, 95),
+        "prompt_tokens_per_turn": round(input_tokens / turns, 1),
+        "output_tokens_per_turn": round(output_tokens / turns, 1),
+        # Combined turns are validated against the step schema instead
+        "parse_success_rate": round(1 - failed / parsed, 3) if parsed else None
+    }
+
+
+def time_report_paths(turns, repeats):
+    report = build_report(turns)
+    session = InterviewSession(role="AI Engineer", candidate_name="Benchmark Candidate")
+    for turn in report["transcript"]:
+        session.add_turn(turn["question"], turn["answer"], turn["score"], dimension=turn["dimension"])
+
+    cli_samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        generate_report(session)
+        cli_samples.append(time.perf_counter() - start)
+    streamlit_samples = time_reruns(memoized_page, report, repeats)
+    return {
+        "turns": turns,
+        "cli_generate_report_ms": round(statistics.median(cli_samples) * 1000, 2),
+        "streamlit_report_rerun_ms": round(statistics.median(streamlit_samples) * 1000, 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=12)
+    parser.add_argument("--model", choices=LOCAL_MODELS, default="fake")
+    parser.add_argument("--report-turns", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    results = {"model": args.model, "paths": {}}
+    for path in ("split", "streaming", "combined"):
+        stats = run_path(path, args.model, args.turns)
+        results["paths"][path] = stats
+        parse_rate = "n/a" if stats["parse_success_rate"] is None else f"{stats['parse_success_rate']:.0%}"
+        print(f"{path:<10} p50 {stats['latency_p50_seconds']:.3f}s | p95 {stats['latency_p95_seconds']:.3f}s | "
+              f"tokens/turn {stats['prompt_tokens_per_turn']:.0f} in / {stats['output_tokens_per_turn']:.0f} out | "
+              f"parsed {parse_rate}")
+
+    results["report"] = time_report_paths(args.report_turns, args.repeats)
+    print(f"report ({args.report_turns} turns): CLI generate_report {results['report']['cli_generate_report_ms']:.2f} ms | "
+          f"Streamlit rerun {results['report']['streamlit_report_rerun_ms']:.2f} ms")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Compare split turns (interviewer chain + separate evaluator call) with the
+combined single-call interview step: latency and LLM tokens per turn.
+
+Usage (from the project root, GROQ_API_KEY set):
+    python -m benchmarks.bench_turn_modes --turns 10
+"""
+import argparse
+import statistics
+import time
+import uuid
+from dotenv import load_dotenv
+from langchain_core.callbacks import get_usage_metadata_callback
+from interviewer.clients import require_api_key
+from interviewer.evaluator import evaluate_answer
+from interviewer.interview_chain import build_interview_chain
+from interviewer.interview_step import build_step_chain
+from interviewer.turns import run_turn, run_step_turn
+
+SCRIPT = [
+    ("What is the difference between supervised and unsupervised learning?",
+     "Supervised learning trains on labeled examples, unsupervised learning looks for structure like clusters in unlabeled data."),
+    ("What is prompt engineering and why is it important?",
+     "It is writing and iterating on prompts so the model does what you want; it matters because outputs are very sensitive to wording."),
+    ("How do you usually learn a new AI concept or tool?",
+     "I read the paper or docs, then build something small and compare it to what I already know."),
+]
+
+
+def run_mode(mode, args, api_key):
+    chain = build_interview_chain("Groq", api_key, args.model)
+    step_chain = build_step_chain("Groq", api_key, args.model) if mode == "combined" else None
+    session_id = f"bench-{mode}-{uuid.uuid4().hex}"
+    latencies = []
+    with get_usage_metadata_callback() as usage:
+        for i in range(args.turns):
+            question, answer = SCRIPT[i % len(SCRIPT)]
+            chain_input = {"input": answer, "role": "AI Engineer", "question": question}
+            start = time.perf_counter()
+            if step_chain is not None:
+                run_step_turn(step_chain, chain_input, session_id)
+            else:
+                run_turn(chain, chain_input, session_id,
+                         lambda: evaluate_answer(answer, api_key, question=question, use_cache=False))
+            latencies.append(time.perf_counter() - start)
+    input_tokens = sum(u.get("input_tokens", 0) for u in usage.usage_metadata.values())
+    output_tokens = sum(u.get("output_tokens", 0) for u in usage.usage_metadata.values())
+    return latencies, input_tokens, output_tokens
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=6)
+    parser.add_argument("--model", default="llama-3.1-8b-instant")
+    args = parser.parse_args()
+
+    load_dotenv()
+    api_key = require_api_key("Groq")
+
+    print(f"{'mode':<10}{'mean s':>10}{'p50 s':>10}{'in tok/turn':>14}{'out tok/turn':>14}")
+    for mode in ("split", "combined"):
+        latencies, input_tokens, output_tokens = run_mode(mode, args, api_key)
+        print(
+            f"{mode:<10}{statistics.mean(latencies):>10.2f}{statistics.median(latencies):>10.2f}"
+            f"{input_tokens / args.turns:>14.0f}{output_tokens / args.turns:>14.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
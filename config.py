@@ -10,9 +10,4 @@ GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 # OpenAI API Key
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
-# Validate that required API keys are set
-if not GROQ_API_KEY:
-    raise ValueError("GROQ_API_KEY environment variable is not set. Please add it to your .env file.")
-
-if not OPENAI_API_KEY:
-    raise ValueError("OPENAI_API_KEY environment variable is not set. Please add it to your .env file.")
+# Keys are checked when a provider is used (interviewer.clients.require_api_key)
@@ -0,0 +1,413 @@
+"""
+Cross-candidate analytics over archived interview reports.
+
+Reports (the JSON written by the app, the CLI and the replay runner) and
+logged sessions are loaded once into a ReportTable: one NumPy column per
+report field plus a (reports x dimensions) score matrix that holds NaN
+where a report has no score for a dimension. Every statistic is computed
+with array operations over those columns, so summarizing 100k reports
+takes a fraction of a second. Loading is the only per-report step; save
+the table to a compressed .npz file to skip it next time.
+
+Usage (from the project root):
+    python -m interviewer.analytics replay_reports --top 10
+    python -m interviewer.analytics replay_reports --session-log .cache/session_log --save reports.npz
+    python -m interviewer.analytics reports.npz --template AI_engineer.yaml --candidate "Ada Lovelace"
+"""
+import argparse
+import itertools
+import json
+import numpy as np
+from .export import iter_reports
+from .report import RECOMMENDATIONS, RECOMMENDATION_THRESHOLDS, generate_report
+from .templates import TemplateError, get_template_registry
+
+DEFAULT_PERCENTILES = (25, 50, 75, 90)
+SCORE_LEVELS = (1, 2, 3, 4, 5)
+
+# Per-report columns, in the order they are saved
+COLUMNS = (
+    "candidate", "position", "template_code", "date", "average_score", "total_turns",
+    "unscored_turns", "score_counts", "dimension_scores", "dimension_counts"
+)
+
+
+class ReportTable:
+    """
+    Columnar view of many reports, one row per report. `template_code`
+    indexes `templates` ("" when a report does not name its template) and
+    the columns of `dimension_scores` / `dimension_counts` follow
+    `dimensions`. `score_counts` holds each report's answers per score.
+    """
+
+    def __init__(self, columns, templates, dimensions):
+        for name in COLUMNS:
+            setattr(self, name, columns[name])
+        self.templates = templates
+        self.dimensions = dimensions
+
+    @classmethod
+    def from_reports(cls, reports):
+        """Build a table from an iterable of report dicts (consumed once)"""
+        builder = _TableBuilder()
+        for report in reports:
+            builder.add(report)
+        return builder.build()
+
+    def save(self, path):
+        """Write the table to a compressed .npz file"""
+        np.savez_compressed(path, templates=np.array(self.templates, dtype=str),
+                            dimensions=np.array(self.dimensions, dtype=str),
+                            **{name: getattr(self, name) for name in COLUMNS})
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls({name: data[name] for name in COLUMNS}, data["templates"].tolist(),
+                       data["dimensions"].tolist())
+
+    def __len__(self):
+        return len(self.average_score)
+
+    def rows(self, template=None):
+        """Boolean row mask for one template (all rows by default)"""
+        if template is None:
+            return np.ones(len(self), dtype=bool)
+        if template not in self.templates:
+            return np.zeros(len(self), dtype=bool)
+        return self.template_code == self.templates.index(template)
+
+    def find(self, name):
+        """Row indices of candidates whose name contains `name` (case-insensitive)"""
+        return np.flatnonzero(np.char.find(np.char.lower(self.candidate), name.lower()) >= 0)
+
+    def weighted_scores(self, registry=None):
+        """
+        Per-report score weighted by the `weight` of each template section.
+        Reports that do not name their template use the template for their
+        position; reports with no matching template, or no weighted
+        dimension, keep their plain average.
+        """
+        group, weights = self._weight_groups(registry or get_template_registry())
+        row_weights = weights[group]
+        scored = ~np.isnan(self.dimension_scores)
+        row_weights[~scored] = 0
+        total = row_weights.sum(axis=1)
+        weighted = (np.where(scored, self.dimension_scores, 0) * row_weights).sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(total > 0, weighted / total, self.average_score).astype(np.float32)
+
+    def _weight_groups(self, registry):
+        # One weight row per named template, then one per position of the unnamed ones
+        templates = [_load_template(registry, name) for name in self.templates]
+        group = self.template_code.copy()
+        unresolved = np.array([template is None for template in templates], dtype=bool)[group]
+        positions, inverse = np.unique(self.position[unresolved], return_inverse=True)
+        group[unresolved] = len(templates) + inverse
+        by_role = {}
+        for name in registry.list_templates():
+            template = _load_template(registry, name)
+            if template is not None:
+                by_role.setdefault(template.role, template)
+        templates.extend(by_role.get(position) for position in positions.tolist())
+        weights = np.zeros((len(templates), len(self.dimensions)), dtype=np.float32)
+        for i, template in enumerate(templates):
+            if template is not None:
+                weights[i] = [template.section_weight(dimension) for dimension in self.dimensions]
+        return group, weights
+
+    def percentile_ranks(self, values, by_template=True):
+        """
+        Percentile rank (0-100) of each report's value: the share of reports
+        of the same template (or of all reports) scoring lower, ties counted
+        as half
+        """
+        if not by_template:
+            return _percentile_ranks(values)
+        ranks = np.empty(len(values), dtype=np.float32)
+        for code in np.unique(self.template_code):
+            mask = self.template_code == code
+            ranks[mask] = _percentile_ranks(values[mask])
+        return ranks
+
+    def recommendations(self, values=None):
+        """Recommendation index into RECOMMENDATIONS for every report"""
+        values = self.average_score if values is None else values
+        return np.searchsorted(RECOMMENDATION_THRESHOLDS, values, side="right")
+
+    def dimension_percentiles(self, mask=None, percentiles=DEFAULT_PERCENTILES):
+        """Per dimension: number of reports, mean score and score percentiles"""
+        scores = self.dimension_scores if mask is None else self.dimension_scores[mask]
+        counts = (~np.isnan(scores)).sum(axis=0)
+        present = np.flatnonzero(counts)
+        if not len(present):
+            return {}
+        means = np.nanmean(scores[:, present], axis=0)
+        values = np.nanpercentile(scores[:, present], percentiles, axis=0)
+        result = {}
+        for j, column in enumerate(present):
+            stats = {"reports": int(counts[column]), "mean": round(float(means[j]), 2)}
+            for i, pct in enumerate(percentiles):
+                stats[f"p{pct:g}"] = round(float(values[i, j]), 2)
+            result[self.dimensions[column]] = stats
+        return result
+
+    def score_distribution(self, mask=None):
+        """Answers per score, summed over the reports"""
+        counts = self.score_counts if mask is None else self.score_counts[mask]
+        return dict(zip(SCORE_LEVELS, counts.sum(axis=0).tolist()))
+
+    def summary(self, mask=None, top=10, percentiles=DEFAULT_PERCENTILES, registry=None):
+        """Cohort statistics plus the `top` candidates by weighted score"""
+        mask = self.rows() if mask is None else mask
+        weighted = self.weighted_scores(registry)
+        ranks = self.percentile_ranks(weighted)
+        selected = np.flatnonzero(mask)
+        averages, selected_weighted = self.average_score[selected], weighted[selected]
+        recommendations = np.bincount(self.recommendations(averages), minlength=len(RECOMMENDATIONS))
+        best = selected[np.argsort(-selected_weighted, kind="stable")[:top]]
+
+        def spread(values):
+            if not len(values):
+                return {}
+            stats = {"mean": round(float(values.mean()), 2)}
+            for pct, value in zip(percentiles, np.percentile(values, percentiles)):
+                stats[f"p{pct:g}"] = round(float(value), 2)
+            return stats
+
+        return {
+            "reports": int(len(selected)),
+            "templates": {
+                (self.templates[code] or "(unknown)"): int(count)
+                for code, count in zip(*np.unique(self.template_code[selected], return_counts=True))
+            },
+            "average_score": spread(averages),
+            "weighted_score": spread(selected_weighted),
+            "recommendations": dict(zip(RECOMMENDATIONS, recommendations.tolist())),
+            "score_distribution": self.score_distribution(mask),
+            "unscored_turns": int(self.unscored_turns[selected].sum()),
+            "dimensions": self.dimension_percentiles(mask, percentiles),
+            "top_candidates": [self._candidate_row(row, weighted, ranks) for row in best.tolist()]
+        }
+
+    def _candidate_row(self, row, weighted, ranks):
+        return {
+            "name": str(self.candidate[row]),
+            "template": self.templates[self.template_code[row]] or None,
+            "date": str(self.date[row]),
+            "average_score": round(float(self.average_score[row]), 2),
+            "weighted_score": round(float(weighted[row]), 2),
+            "percentile_rank": round(float(ranks[row]), 1),
+            "recommendation": RECOMMENDATIONS[int(self.recommendations(self.average_score[row]))]
+        }
+
+    def compare(self, rows, registry=None):
+        """
+        Side-by-side profiles of the given rows: scores, weighted score and
+        percentile ranks within their template, overall and per dimension
+        """
+        weighted = self.weighted_scores(registry)
+        ranks = self.percentile_ranks(weighted)
+        profiles = []
+        for row in rows:
+            profile = self._candidate_row(row, weighted, ranks)
+            cohort = self.dimension_scores[self.template_code == self.template_code[row]]
+            scores = self.dimension_scores[row]
+            columns = np.flatnonzero(~np.isnan(scores))
+            # Rank each dimension score against the cohort's scores in that dimension
+            peers = cohort[:, columns]
+            counts = (~np.isnan(peers)).sum(axis=0)
+            below = (peers < scores[columns]).sum(axis=0)
+            equal = (peers == scores[columns]).sum(axis=0)
+            dimension_ranks = (below + 0.5 * equal) / counts * 100
+            profile["dimensions"] = {
+                self.dimensions[column]: {"score": round(float(scores[column]), 2),
+                                          "percentile_rank": round(float(rank), 1)}
+                for column, rank in zip(columns.tolist(), dimension_ranks.tolist())
+            }
+            profiles.append(profile)
+        return profiles
+
+
+class _TableBuilder:
+    """Accumulates reports row by row, then builds the column arrays once"""
+
+    def __init__(self):
+        self.columns = {name: [] for name in COLUMNS if name not in ("dimension_scores", "dimension_counts")}
+        self.templates = {}
+        self.dimensions = {}
+        # Sparse (row, dimension, score, count) entries of the dimension matrices
+        self.cells = ([], [], [], [])
+
+    def add(self, report):
+        summary = report["candidate_summary"]
+        stats = report.get("summary_statistics", {})
+        # JSON turns the integer score keys into strings
+        distribution = {int(level): count for level, count in stats.get("score_distribution", {}).items()}
+        row = len(self.columns["candidate"])
+        self.columns["candidate"].append(summary.get("name") or "Anonymous")
+        self.columns["position"].append(summary.get("position") or "")
+        self.columns["template_code"].append(_code(self.templates, summary.get("template") or ""))
+        self.columns["date"].append(summary.get("date") or "")
+        self.columns["average_score"].append(report.get("average_score") or 0)
+        self.columns["total_turns"].append(report.get("total_turns") or 0)
+        self.columns["unscored_turns"].append(stats.get("unscored_turns") or 0)
+        self.columns["score_counts"].append([distribution.get(level, 0) for level in SCORE_LEVELS])
+        for dimension, scores in report.get("dimension_scores", {}).items():
+            self.cells[0].append(row)
+            self.cells[1].append(_code(self.dimensions, dimension))
+            self.cells[2].append(scores["average_score"])
+            self.cells[3].append(scores.get("count", 1))
+
+    def build(self):
+        columns = self.columns
+        rows = len(columns["candidate"])
+        table = {
+            "candidate": np.array(columns["candidate"], dtype=str),
+            "position": np.array(columns["position"], dtype=str),
+            "template_code": np.array(columns["template_code"], dtype=np.int32),
+            "date": np.array(columns["date"], dtype=str),
+            "average_score": np.array(columns["average_score"], dtype=np.float32),
+            "total_turns": np.array(columns["total_turns"], dtype=np.int32),
+            "unscored_turns": np.array(columns["unscored_turns"], dtype=np.int32),
+            "score_counts": np.array(columns["score_counts"], dtype=np.int32).reshape(rows, len(SCORE_LEVELS)),
+            "dimension_scores": np.full((rows, len(self.dimensions)), np.nan, dtype=np.float32),
+            "dimension_counts": np.zeros((rows, len(self.dimensions)), dtype=np.int16)
+        }
+        cell_rows, cell_columns, scores, counts = (np.array(values) for values in self.cells)
+        if len(cell_rows):
+            table["dimension_scores"][cell_rows, cell_columns] = scores
+            table["dimension_counts"][cell_rows, cell_columns] = counts
+        return ReportTable(table, list(self.templates), list(self.dimensions))
+
+
+def _code(codes, value):
+    code = codes.get(value)
+    if code is None:
+        code = codes[value] = len(codes)
+    return code
+
+
+def _load_template(registry, name):
+    if not name:
+        return None
+    try:
+        return registry.get(name)
+    except TemplateError:
+        return None
+
+
+def _percentile_ranks(values):
+    if not len(values):
+        return np.zeros(0, dtype=np.float32)
+    ordered = np.sort(values)
+    below = np.searchsorted(ordered, values, side="left")
+    at_or_below = np.searchsorted(ordered, values, side="right")
+    return ((below + at_or_below) / 2 / len(values) * 100).astype(np.float32)
+
+
+def iter_logged_reports(session_log, include_incomplete=False):
+    """
+    Reports of the interviews in a SessionLog (finished ones by default).
+    The log is only read; no session is resumed.
+    """
+    for wal_path in sorted(session_log.directory.glob("*.wal")):
+        state = session_log.read(wal_path.stem)
+        if state is not None and (state.complete or include_incomplete):
+            yield _with_logged_times(generate_report(state.session, include_transcript=False), state)
+
+
+def _with_logged_times(report, state):
+    # generate_report stamps the current time; date and duration of a logged
+    # interview come from its logged start time and its last event
+    summary = report["candidate_summary"]
+    start = state.session.start_time
+    summary["date"] = start.strftime("%Y-%m-%d")
+    summary["time"] = start.strftime("%H:%M:%S")
+    if state.last_event_time is not None:
+        summary["duration_minutes"] = max(0, int((state.last_event_time - start.timestamp()) / 60))
+    return report
+
+
+def load_table(sources=(), session_log_dir=None, include_incomplete=False):
+    """
+    Build one table from report directories or archives (see
+    interviewer/export.py) and/or a session log directory. A single .npz
+    source is loaded directly.
+    """
+    sources = list(sources)
+    if len(sources) == 1 and str(sources[0]).endswith(".npz") and not session_log_dir:
+        return ReportTable.load(sources[0])
+    reports = [iter_reports(source) for source in sources]
+    if session_log_dir:
+        from .session_log import SessionLog
+        reports.append(iter_logged_reports(SessionLog(session_log_dir), include_incomplete))
+    return ReportTable.from_reports(itertools.chain(*reports))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("sources", nargs="*",
+                        help="Directories of report JSON files or report archives, or one saved .npz table")
+    parser.add_argument("--session-log", help="Also include interviews from this session log directory")
+    parser.add_argument("--include-incomplete", action="store_true", help="Include unfinished logged interviews")
+    parser.add_argument("--template", help="Only reports of this template file")
+    parser.add_argument("--candidate", action="append", default=[],
+                        help="Compare candidates whose name contains this (repeatable)")
+    parser.add_argument("--top", type=int, default=10, help="Top candidates to list by weighted score")
+    parser.add_argument("--save", help="Save the table as a compressed .npz file")
+    parser.add_argument("--output", help="Write the summary (and comparison) as JSON to this file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if not args.sources and not args.session_log:
+        raise ValueError("Give at least one report directory, a saved .npz table or --session-log")
+    table = load_table(args.sources, args.session_log, args.include_incomplete)
+    if args.save:
+        table.save(args.save)
+        print(f"Saved {len(table)} reports to {args.save}")
+
+    mask = table.rows(args.template)
+    summary = table.summary(mask, top=args.top)
+    print(f"{summary['reports']} reports | " +
+          ", ".join(f"{name}: {count}" for name, count in summary["templates"].items()))
+    if not summary["reports"]:
+        return
+    for label in ("average_score", "weighted_score"):
+        print(f"{label.replace('_', ' ').capitalize()}: " +
+              " | ".join(f"{key} {value}" for key, value in summary[label].items()))
+    print("Recommendations: " + ", ".join(f"{name} {count}" for name, count in summary["recommendations"].items()))
+    dist = summary["score_distribution"]
+    print(f"Score Distribution: 5★({dist[5]}) 4★({dist[4]}) 3★({dist[3]}) 2★({dist[2]}) 1★({dist[1]}) "
+          f"| {summary['unscored_turns']} unscored")
+
+    print("\nDIMENSIONS")
+    for dimension, stats in summary["dimensions"].items():
+        print(f"  {dimension}: " + " | ".join(f"{key} {value}" for key, value in stats.items()))
+
+    print(f"\nTOP {len(summary['top_candidates'])} BY WEIGHTED SCORE")
+    for i, candidate in enumerate(summary["top_candidates"], 1):
+        print(f"  {i}. {candidate['name']} ({candidate['date']}): weighted {candidate['weighted_score']}/5, "
+              f"average {candidate['average_score']}/5, p{candidate['percentile_rank']:g} - "
+              f"{candidate['recommendation']}")
+
+    comparison = []
+    if args.candidate:
+        rows = sorted({int(row) for name in args.candidate for row in table.find(name) if mask[row]})
+        comparison = table.compare(rows)
+        print("\nCOMPARISON")
+        for profile in comparison:
+            print(f"  {profile['name']} ({profile['template']}, {profile['date']}): weighted "
+                  f"{profile['weighted_score']}/5, p{profile['percentile_rank']:g}")
+            for dimension, stats in profile["dimensions"].items():
+                print(f"    {dimension}: {stats['score']}/5 (p{stats['percentile_rank']:g})")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"summary": summary, "comparison": comparison}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""
+Near-duplicate index of scored answers (MinHash + LSH).
+
+Each answer is reduced to a MinHash signature of its word shingles; the
+share of equal signature slots estimates the Jaccard similarity of two
+answers. Signatures are split into bands and bucketed per band, so a
+lookup only compares against answers sharing at least one band bucket
+(locality-sensitive hashing) instead of scanning every indexed answer.
+
+Answers are partitioned by question and scorer (evaluator model and prompt
+version), so a score is only reused for the same question under the same
+rubric. Scored turns are added as interviews finish and persisted to
+SQLite; the buckets are rebuilt from it at startup.
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import numpy as np
+from .score_cache import normalize_answer
+
+DEFAULT_INDEX_PATH = os.path.join(".cache", "answer_index.sqlite")
+# Answers at least this similar share a score; flagged from FLAG_THRESHOLD
+DEFAULT_REUSE_THRESHOLD = 0.85
+DEFAULT_FLAG_THRESHOLD = 0.9
+# reuse: score of the closest answer; blend: similarity-weighted mean of all
+# matches; flag: never skip the evaluator, only flag copies
+INDEX_MODES = ["reuse", "blend", "flag"]
+DEFAULT_INDEX_MODE = "blend"
+
+# 128 hash functions in 16 bands of 8 rows: answers ~70% similar or more
+# share a bucket with high probability, so matches above the thresholds
+# are rarely missed
+NUM_PERM = 128
+BANDS = 16
+SHINGLE_WORDS = 3
+# Answers kept per question; later ones are only looked up, not added
+DEFAULT_MAX_PER_PARTITION = 10_000
+
+_PRIME = (1 << 31) - 1
+_WORD = re.compile(r"\w+")
+
+
+class MinHasher:
+    """MinHash signatures over word shingles, with fixed random permutations"""
+
+    def __init__(self, num_perm=NUM_PERM, shingle_words=SHINGLE_WORDS, seed=1):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, _PRIME, size=(num_perm, 1), dtype=np.uint64)
+        self.b = rng.integers(0, _PRIME, size=(num_perm, 1), dtype=np.uint64)
+        self.shingle_words = shingle_words
+
+    def shingles(self, text):
+        words = _WORD.findall(normalize_answer(text))
+        if len(words) <= self.shingle_words:
+            return {" ".join(words)} if words else set()
+        return {" ".join(words[i:i + self.shingle_words]) for i in range(len(words) - self.shingle_words + 1)}
+
+    def signature(self, text):
+        """uint32 signature of `text`, or None when it has no words"""
+        shingles = self.shingles(text)
+        if not shingles:
+            return None
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little") % _PRIME
+             for s in shingles),
+            dtype=np.uint64, count=len(shingles)
+        )
+        return ((self.a * hashes + self.b) % _PRIME).min(axis=1).astype(np.uint32)
+
+
+class _Partition:
+    """Signatures, scores and LSH buckets of the answers to one question"""
+
+    def __init__(self):
+        self.signatures = []
+        self.scores = []
+        self.buckets = {}  # (band, band bytes) -> entry ids
+
+    def add(self, signature, score, bands):
+        entry = len(self.signatures)
+        self.signatures.append(signature)
+        self.scores.append(score)
+        for key in _band_keys(signature, bands):
+            self.buckets.setdefault(key, []).append(entry)
+
+    def candidates(self, signature, bands):
+        entries = set()
+        for key in _band_keys(signature, bands):
+            entries.update(self.buckets.get(key, ()))
+        return entries
+
+
+def _band_keys(signature, bands):
+    return [(band, rows.tobytes()) for band, rows in enumerate(np.split(signature, bands))]
+
+
+def partition_key(question, scorer):
+    payload = normalize_answer(question) + "\x1f" + scorer
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+class AnswerIndex:
+    """
+    Persistent near-duplicate index of scored answers per question.
+    `path=None` keeps it in memory only.
+    """
+
+    def __init__(self, path=None, reuse_threshold=DEFAULT_REUSE_THRESHOLD, flag_threshold=DEFAULT_FLAG_THRESHOLD,
+                 mode=DEFAULT_INDEX_MODE, max_per_partition=DEFAULT_MAX_PER_PARTITION):
+        if mode not in INDEX_MODES:
+            raise ValueError(f"Answer index mode must be one of {INDEX_MODES}, got '{mode}'")
+        self.path = path
+        self.reuse_threshold = reuse_threshold
+        self.flag_threshold = flag_threshold
+        self.mode = mode
+        self.max_per_partition = max_per_partition
+        self.hasher = MinHasher()
+        self.bands = BANDS
+        self._partitions = {}
+        self._sources = set()
+        self._lock = threading.Lock()
+        self._stats = {"lookups": 0, "reused": 0, "flagged": 0}
+        self._conn = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS answers ("
+                "partition TEXT NOT NULL, signature BLOB NOT NULL, score INTEGER NOT NULL, "
+                "source TEXT, created_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+            self._load()
+
+    def _load(self):
+        rows = self._conn.execute("SELECT partition, signature, score, source FROM answers ORDER BY rowid")
+        for partition, signature, score, source in rows:
+            signature = np.frombuffer(signature, dtype=np.uint32)
+            if len(signature) == NUM_PERM:
+                self._partitions.setdefault(partition, _Partition()).add(signature, score, self.bands)
+            if source:
+                self._sources.add(source)
+
+    def lookup(self, question, answer, scorer):
+        """
+        Indexed answers to the same question at least as similar as the
+        lower threshold: a list of (similarity, score), most similar first
+        """
+        signature = self.hasher.signature(answer)
+        if signature is None:
+            return []
+        with self._lock:
+            self._stats["lookups"] += 1
+            partition = self._partitions.get(partition_key(question, scorer))
+            if partition is None:
+                return []
+            entries = sorted(partition.candidates(signature, self.bands))
+            if not entries:
+                return []
+            signatures = np.stack([partition.signatures[entry] for entry in entries])
+            scores = [partition.scores[entry] for entry in entries]
+        similarities = (signatures == signature).mean(axis=1)
+        floor = min(self.reuse_threshold, self.flag_threshold)
+        matches = [(round(float(similarity), 3), score)
+                   for similarity, score in zip(similarities.tolist(), scores) if similarity >= floor]
+        return sorted(matches, key=lambda match: -match[0])
+
+    def reusable_score(self, matches):
+        """Score to use instead of calling the evaluator, or None"""
+        reusable = [(similarity, score) for similarity, score in matches if similarity >= self.reuse_threshold]
+        if not reusable or self.mode == "flag":
+            return None
+        if self.mode == "reuse":
+            score = reusable[0][1]
+        else:
+            score = round(sum(s * score for s, score in reusable) / sum(s for s, _ in reusable))
+        with self._lock:
+            self._stats["reused"] += 1
+        return score
+
+    def is_flagged(self, matches):
+        flagged = bool(matches) and matches[0][0] >= self.flag_threshold
+        if flagged:
+            with self._lock:
+                self._stats["flagged"] += 1
+        return flagged
+
+    def add_session(self, session, scorer, source=None):
+        """
+        Index the scored turns of a finished interview (once per `source`,
+        e.g. its session id). Returns the number of answers added.
+        """
+        rows = []
+        with self._lock:
+            if source is not None:
+                if source in self._sources:
+                    return 0
+                self._sources.add(source)
+            for index in range(len(session)):
+                turn, score = session.turns[index], session.score_at(index)
+                if score is None or not turn.question:
+                    continue
+                signature = self.hasher.signature(turn.answer)
+                if signature is None:
+                    continue
+                key = partition_key(turn.question, scorer)
+                partition = self._partitions.setdefault(key, _Partition())
+                if len(partition.scores) >= self.max_per_partition:
+                    continue
+                partition.add(signature, score, self.bands)
+                rows.append((key, signature.tobytes(), score, source, time.time()))
+            if rows and self._conn is not None:
+                self._conn.executemany(
+                    "INSERT INTO answers (partition, signature, score, source, created_at) VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+                self._conn.commit()
+        return len(rows)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, answers=sum(len(p.scores) for p in self._partitions.values()),
+                        questions=len(self._partitions))
+
+    def clear(self):
+        with self._lock:
+            self._partitions.clear()
+            self._sources.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM answers")
+                self._conn.commit()
+
+
+_default_index = None
+_default_lock = threading.Lock()
+
+
+def get_answer_index():
+    """
+    Process-wide answer index, configured by ANSWER_INDEX_PATH (empty keeps
+    it in memory), ANSWER_INDEX_THRESHOLD, ANSWER_INDEX_FLAG_THRESHOLD and
+    ANSWER_INDEX_MODE
+    """
+    global _default_index
+    with _default_lock:
+        if _default_index is None:
+            _default_index = AnswerIndex(
+                path=os.getenv("ANSWER_INDEX_PATH", DEFAULT_INDEX_PATH) or None,
+                reuse_threshold=float(os.getenv("ANSWER_INDEX_THRESHOLD", DEFAULT_REUSE_THRESHOLD)),
+                flag_threshold=float(os.getenv("ANSWER_INDEX_FLAG_THRESHOLD", DEFAULT_FLAG_THRESHOLD)),
+                mode=os.getenv("ANSWER_INDEX_MODE", DEFAULT_INDEX_MODE)
+            )
+        return _default_index
+
+
+def loaded_answer_index():
+    """The process-wide answer index if it has been created, else None"""
+    with _default_lock:
+        return _default_index
@@ -0,0 +1,179 @@
+import os
+import threading
+
+# Provider SDKs and httpx are imported on first use: one session only needs
+# one provider, and these imports dominate cold start
+
+# API roots used to pre-open connections for each provider
+PROVIDER_BASE_URLS = {
+    "Groq": "https://api.groq.com/openai/v1",
+    "OpenAI": "https://api.openai.com/v1"
+}
+
+# Offline provider and its models (see local_llm.py):
+#   fake       - deterministic offline responses with simulated latency
+#   fake-large - the same with a larger model's latency (the strong routing tier)
+#   replay     - responses recorded earlier from a real provider
+LOCAL_PROVIDER = "Local"
+LOCAL_MODELS = ["fake", "fake-large", "replay"]
+
+API_KEY_VARS = {
+    "Groq": "GROQ_API_KEY",
+    "OpenAI": "OPENAI_API_KEY"
+}
+
+# Keep-alive pool shared by every client of a provider
+POOL_LIMITS = {"max_connections": 50, "max_keepalive_connections": 20, "keepalive_expiry": 120}
+
+_lock = threading.Lock()
+_chat_models = {}
+_raw_models = {}
+_http_clients = {}
+_api_keys = {}
+
+
+def get_http_client(provider):
+    """Return the shared keep-alive HTTP client for a provider"""
+    import httpx
+
+    with _lock:
+        if provider not in _http_clients:
+            _http_clients[provider] = httpx.Client(
+                limits=httpx.Limits(**POOL_LIMITS),
+                timeout=httpx.Timeout(60.0, connect=10.0)
+            )
+        return _http_clients[provider]
+
+
+def register_api_key(provider, api_key):
+    """Remember a provider key so calls can fail over to that provider"""
+    if api_key:
+        with _lock:
+            _api_keys[provider] = api_key
+
+
+def get_api_key(provider):
+    """Key registered for a provider, else its environment variable"""
+    with _lock:
+        api_key = _api_keys.get(provider)
+    return api_key or os.getenv(API_KEY_VARS.get(provider, ""), "") or None
+
+
+def require_api_key(provider):
+    """
+    `get_api_key`, raising ValueError when a provider that needs a key has
+    none. Called when the provider is used, never at import time. The
+    Local provider needs no key (None).
+    """
+    if provider == LOCAL_PROVIDER:
+        return None
+    api_key = get_api_key(provider)
+    if not api_key:
+        raise ValueError(f"{API_KEY_VARS[provider]} environment variable is not set. Please add it to your .env file.")
+    return api_key
+
+
+def build_raw_model(provider, model, api_key, temperature=0.3):
+    """
+    Provider chat model without scheduling. Cached per key; clients reuse
+    the provider's connection pool.
+    """
+    key = (provider, model, api_key, temperature)
+    with _lock:
+        llm = _raw_models.get(key)
+    if llm is not None:
+        return llm
+
+    if provider == LOCAL_PROVIDER:
+        from .local_llm import build_local_model
+        llm = build_local_model(model)
+        with _lock:
+            return _raw_models.setdefault(key, llm)
+
+    # Validate the key when the provider is first used, not at import time
+    if not api_key:
+        raise ValueError(f"{provider} API key is required")
+
+    # Retries are done by the scheduler, which honours Retry-After across sessions
+    http_client = get_http_client(provider)
+    if provider == "Groq":
+        from langchain_groq import ChatGroq
+        llm = ChatGroq(model=model, groq_api_key=api_key, temperature=temperature, http_client=http_client,
+                       max_retries=0)
+    else:
+        from langchain_openai import ChatOpenAI
+        llm = ChatOpenAI(model=model, api_key=api_key, temperature=temperature, http_client=http_client,
+                         max_retries=0)
+
+    if os.getenv("LLM_RECORD"):
+        # Save real responses so they can be replayed offline with Local/replay
+        from .local_llm import recording
+        llm = recording(llm)
+
+    with _lock:
+        # Another thread may have built the same client meanwhile; keep the first
+        return _raw_models.setdefault(key, llm)
+
+
+def get_chat_model(provider, model, api_key, temperature=0.3):
+    """
+    Return a long-lived chat model for (provider, model, api_key).
+    Every call goes through the shared rate-limit scheduler and fails over
+    to a smaller model or the other provider when the budget runs out.
+    """
+    key = (provider, model, api_key, temperature)
+    with _lock:
+        llm = _chat_models.get(key)
+    if llm is not None:
+        return llm
+
+    from .scheduler import ScheduledChatModel
+
+    register_api_key(provider, api_key)
+    inner = build_raw_model(provider, model, api_key, temperature)
+
+    def resolve_route(route_provider, route_model):
+        route_key = api_key if route_provider == provider else get_api_key(route_provider)
+        if not route_key:
+            return None
+        return build_raw_model(route_provider, route_model, route_key, temperature)
+
+    llm = ScheduledChatModel(provider=provider, model_name=model, inner=inner,
+                             resolve_route=None if provider == LOCAL_PROVIDER else resolve_route)
+    with _lock:
+        return _chat_models.setdefault(key, llm)
+
+
+def warm_client(provider, api_key):
+    """
+    Open a pooled connection to the provider in the background so the first
+    interview turn does not pay for the TCP/TLS handshake.
+    """
+    base_url = PROVIDER_BASE_URLS.get(provider)
+    if not base_url or not api_key:
+        return None
+
+    def _warm():
+        import httpx
+
+        try:
+            get_http_client(provider).get(
+                f"{base_url}/models",
+                headers={"Authorization": f"Bearer {api_key}"}
+            )
+        except httpx.HTTPError as e:
+            print(f"Connection warm-up for {provider} failed: {e}")
+
+    thread = threading.Thread(target=_warm, name=f"warm-{provider}", daemon=True)
+    thread.start()
+    return thread
+
+
+def clear_clients():
+    """Drop all cached chat models and close the shared connection pools"""
+    with _lock:
+        _chat_models.clear()
+        _raw_models.clear()
+        for http_client in _http_clients.values():
+            http_client.close()
+        _http_clients.clear()
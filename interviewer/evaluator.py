@@ -1,24 +1,17 @@
-from langchain_groq import ChatGroq
 from langchain_core.prompts import PromptTemplate
+import asyncio
+import hashlib
 import re
+from .clients import LOCAL_PROVIDER, get_api_key, get_chat_model
+from .telemetry import SCORING_TAG, record_error, record_near_duplicate
+from .tokens import estimate_tokens
+from .score_cache import get_score_cache, make_cache_key
 
-def evaluate_answer(candidate_answer, api_key):
-    """
-    Use LLM to evaluate candidate answer on a scale of 1-5
-    1: Completely wrong
-    2: Partially correct/lacks depth
-    3: Adequate/acceptable
-    4: Good/clear explanation
-    5: Excellent/comprehensive
-    """
-    if not candidate_answer or candidate_answer.strip() == "":
-        return 1
-    
-    if not api_key:
-        raise ValueError("API key is required for evaluation")
-    
-    prompt = PromptTemplate(
-        template="""
+EVALUATOR_PROVIDER = "Groq"
+EVALUATOR_MODEL = "llama-3.1-8b-instant"
+
+EVALUATION_PROMPT = PromptTemplate(
+    template="""
 You are an expert technical interviewer. Evaluate the candidate's answer on a scale of 1-5:
 
 1 - Completely wrong or no understanding
@@ -32,23 +25,335 @@ Candidate's answer: {answer}
 Respond with ONLY a single number (1-5) and a one-sentence reasoning.
 Format: SCORE: [number] REASON: [reason]
 """,
-        input_variables=["answer"]
-    )
+    input_variables=["answer"]
+)
+
+BATCH_EVALUATION_PROMPT = PromptTemplate(
+    template="""
+You are an expert technical interviewer. Evaluate each numbered candidate answer independently on a scale of 1-5:
+
+1 - Completely wrong or no understanding
+2 - Partially correct but lacks depth or contains errors
+3 - Adequate/acceptable answer with basic understanding
+4 - Good answer with clear explanation and relevant details
+5 - Excellent/comprehensive answer with deep understanding and insightful details
+
+Candidate answers:
+{answers}
+
+Respond with exactly one line per answer, in the same order, and nothing else.
+Format: [index] SCORE: [number] REASON: [reason]
+""",
+    input_variables=["answers"]
+)
+
+# Fingerprint of the evaluator prompts; editing either one invalidates cached scores
+PROMPT_VERSION = hashlib.sha256(
+    (EVALUATION_PROMPT.template + BATCH_EVALUATION_PROMPT.template).encode("utf-8")
+).hexdigest()[:16]
+
+# Token budget for the answers packed into one batch request
+DEFAULT_BATCH_TOKENS = 3000
+DEFAULT_BATCH_SIZE = 20
+
+# Prompt and per-answer output overhead used when packing batches
+BATCH_PROMPT_TOKENS = estimate_tokens(BATCH_EVALUATION_PROMPT.template)
+BATCH_OUTPUT_TOKENS_PER_ANSWER = 30
+
+BATCH_LINE_PATTERN = re.compile(r'^\W*(\d+)\W*\s*SCORE:\s*(\d+)', re.MULTILINE | re.IGNORECASE)
+
+
+def scorer_id(model):
+    """The rubric a score was given under: evaluator model and prompt version"""
+    return f"{model}/{PROMPT_VERSION}"
+
+
+def evaluator_for(llm_provider, model):
+    """
+    (provider, model) used for scoring. The Local provider also scores
+    offline, and without a key for the evaluator's provider the interview's
+    own provider and model score.
+    """
+    if llm_provider == LOCAL_PROVIDER:
+        return LOCAL_PROVIDER, model
+    if llm_provider != EVALUATOR_PROVIDER and not get_api_key(EVALUATOR_PROVIDER):
+        return llm_provider, model
+    return EVALUATOR_PROVIDER, EVALUATOR_MODEL
+
+
+def evaluate_answer(candidate_answer, api_key, question=None, use_cache=True,
+                    provider=EVALUATOR_PROVIDER, model=EVALUATOR_MODEL, routing=None):
+    """
+    Use LLM to evaluate candidate answer on a scale of 1-5
+    1: Completely wrong
+    2: Partially correct/lacks depth
+    3: Adequate/acceptable
+    4: Good/clear explanation
+    5: Excellent/comprehensive
+    
+    Scores are cached by normalized answer, question, model and prompt version.
+    A near-copy of an answer already scored for the same question reuses
+    that score (see interviewer/answer_index.py) and is flagged in the
+    turn telemetry. With a `routing` policy (see interviewer/routing.py)
+    the answer picks the evaluator model, and a borderline score from the
+    fast model is re-evaluated with the strong one. Returns None when the
+    answer could not be scored.
+    """
+    score, cache_key = _known_score(candidate_answer, api_key, question, use_cache, provider, model)
+    if score is not None:
+        return score
+    
+    routed_model = routing.route(SCORING_TAG, candidate_answer, provider, model) if routing else model
+    try:
+        score = _call_evaluator(candidate_answer, api_key, provider, routed_model)
+    except Exception as e:
+        print(f"Error in evaluation: {e}")
+        record_error(SCORING_TAG, e)
+        return None  # Scoring failed; the turn is recorded as unscored
     
-    llm = ChatGroq(model="llama-3.1-8b-instant", groq_api_key=api_key, temperature=0.3)
-    chain = prompt | llm
+    review_model = routing.review_model(candidate_answer, provider, model, routed_model, score) if routing else None
+    if review_model:
+        try:
+            score = _call_evaluator(candidate_answer, api_key, provider, review_model) or score
+        except Exception as e:
+            print(f"Error in re-evaluation: {e}")
+            record_error(SCORING_TAG, e)
     
+    if score is not None and cache_key:
+        get_score_cache().set(cache_key, score)
+    return score
+
+
+async def aevaluate_answer(candidate_answer, api_key, question=None, use_cache=True,
+                           provider=EVALUATOR_PROVIDER, model=EVALUATOR_MODEL, routing=None):
+    """`evaluate_answer` with non-blocking LLM calls, for use on an event loop"""
+    # The cache's SQLite tier and the answer index lookup block; run them in a thread
+    score, cache_key = await asyncio.to_thread(_known_score, candidate_answer, api_key, question, use_cache,
+                                               provider, model)
+    if score is not None:
+        return score
+
+    routed_model = routing.route(SCORING_TAG, candidate_answer, provider, model) if routing else model
     try:
-        response = chain.invoke({"answer": candidate_answer})
-        response_text = response.content
-        
-        # Extract score from response
-        score_match = re.search(r'SCORE:\s*(\d+)', response_text)
-        if score_match:
-            score = int(score_match.group(1))
-            score = max(1, min(5, score))  # Clamp between 1-5
-            return score
+        score = await _acall_evaluator(candidate_answer, api_key, provider, routed_model)
     except Exception as e:
         print(f"Error in evaluation: {e}")
+        record_error(SCORING_TAG, e)
+        return None
+
+    review_model = routing.review_model(candidate_answer, provider, model, routed_model, score) if routing else None
+    if review_model:
+        try:
+            score = await _acall_evaluator(candidate_answer, api_key, provider, review_model) or score
+        except Exception as e:
+            print(f"Error in re-evaluation: {e}")
+            record_error(SCORING_TAG, e)
+
+    if score is not None and cache_key:
+        # The SQLite tier commits on every write; keep that off the event loop
+        await asyncio.to_thread(get_score_cache().set, cache_key, score)
+    return score
+
+
+def _known_score(candidate_answer, api_key, question, use_cache, provider, model):
+    """(score, cache key): the score when no evaluator call is needed, else None"""
+    if not candidate_answer or candidate_answer.strip() == "":
+        return 1, None
+    
+    if not api_key and provider != LOCAL_PROVIDER:
+        raise ValueError("API key is required for evaluation")
+    
+    if not use_cache:
+        return None, None
+    # Keyed on the default evaluator model also when routing picks another
+    # one, so a re-evaluated score is what the cache and the index keep
+    cache_key = make_cache_key(candidate_answer, question, model, PROMPT_VERSION)
+    cached = get_score_cache().get(cache_key)
+    if cached is not None:
+        if question:
+            # Exact copies are still flagged, without counting a reuse
+            _near_duplicate_score(candidate_answer, question, model, reuse=False)
+        return cached, cache_key
+    reused = _near_duplicate_score(candidate_answer, question, model) if question else None
+    return reused, cache_key
+
+
+def _call_evaluator(candidate_answer, api_key, provider, model):
+    chain = EVALUATION_PROMPT | get_chat_model(provider, model, api_key, temperature=0.3)
+    response = chain.invoke({"answer": candidate_answer}, config={"tags": [SCORING_TAG]})
+    return _score_response(response)
+
+
+async def _acall_evaluator(candidate_answer, api_key, provider, model):
+    chain = EVALUATION_PROMPT | get_chat_model(provider, model, api_key, temperature=0.3)
+    response = await chain.ainvoke({"answer": candidate_answer}, config={"tags": [SCORING_TAG]})
+    return _score_response(response)
+
+
+def _score_response(response):
+    score = parse_score(response.content)
+    if score is None:
+        record_error(SCORING_TAG, "unparseable evaluator reply")
+    return score
+
+
+def _near_duplicate_score(candidate_answer, question, model, record=True, reuse=True):
+    """
+    Score of near-identical indexed answers to the question, or None to call
+    the evaluator. With reuse=False the answer is only checked for a flag.
+    """
+    # Imported on first use so numpy stays out of cold start
+    from .answer_index import get_answer_index
+    index = get_answer_index()
+    try:
+        matches = index.lookup(question, candidate_answer, scorer_id(model))
+    except Exception as e:
+        print(f"Error in answer index lookup: {e}")
+        return None
+    if not matches:
+        return None
+    score = index.reusable_score(matches) if reuse else None
+    flagged = index.is_flagged(matches)
+    if record and (flagged or score is not None):
+        record_near_duplicate(matches[0][0], matches[0][1], score is not None, flagged)
+    return score
+
+
+def index_scored_answers(session, model=EVALUATOR_MODEL, source=None):
+    """
+    Add a finished interview's scored answers to the near-duplicate index
+    (once per `source`, e.g. the session id). Returns the number added.
+    """
+    from .answer_index import get_answer_index
+    try:
+        return get_answer_index().add_session(session, scorer_id(model), source=source)
+    except Exception as e:
+        print(f"Error indexing answers: {e}")
+        return 0
+
+
+def parse_score(response_text):
+    """Extract a clamped 1-5 score from an evaluator response"""
+    score_match = re.search(r'SCORE:\s*(\d+)', response_text)
+    if score_match:
+        score = int(score_match.group(1))
+        return max(1, min(5, score))  # Clamp between 1-5
+    return None
+
+
+def parse_batch_scores(response_text, count):
+    """
+    Parse an indexed multi-score response into {position: score}.
+    Indices are 1-based; out-of-range and repeated indices are ignored.
+    """
+    scores = {}
+    for match in BATCH_LINE_PATTERN.finditer(response_text):
+        index = int(match.group(1))
+        if 1 <= index <= count and index - 1 not in scores:
+            scores[index - 1] = max(1, min(5, int(match.group(2))))
+    return scores
+
+
+def pack_batches(answers, max_tokens=DEFAULT_BATCH_TOKENS, max_size=DEFAULT_BATCH_SIZE):
+    """
+    Split (position, answer) pairs into batches that fit the token budget.
+    An answer larger than the budget gets a batch of its own.
+    """
+    batches = []
+    current = []
+    current_tokens = 0
+    for position, answer in answers:
+        tokens = estimate_tokens(answer) + BATCH_OUTPUT_TOKENS_PER_ANSWER
+        if current and (current_tokens + tokens > max_tokens or len(current) >= max_size):
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append((position, answer))
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def evaluate_answers_batch(answers, api_key, max_batch_tokens=DEFAULT_BATCH_TOKENS,
+                           max_batch_size=DEFAULT_BATCH_SIZE, stats=None, questions=None,
+                           use_cache=True, provider=EVALUATOR_PROVIDER, model=EVALUATOR_MODEL):
+    """
+    Score many answers with as few evaluator requests as possible.
+    Answers are packed into indexed prompts; any answer whose score cannot be
+    parsed from a packed response is re-scored with concurrent single calls.
+    Returns scores in the same order as `answers`, None where scoring
+    failed. If a `stats` dict is given it is filled with request counts.
+    """
+    if not api_key and provider != LOCAL_PROVIDER:
+        raise ValueError("API key is required for evaluation")
+    
+    stats = stats if stats is not None else {}
+    stats.update({"answers": len(answers), "batch_requests": 0, "single_requests": 0, "cache_hits": 0,
+                  "near_duplicates": 0})
+    questions = questions or [None] * len(answers)
+    cache = get_score_cache() if use_cache else None
+    scores = [None] * len(answers)
+    cache_keys = [None] * len(answers)
+    pending = []
+    for position, answer in enumerate(answers):
+        if not answer or answer.strip() == "":
+            scores[position] = 1
+            continue
+        if cache is not None:
+            cache_keys[position] = make_cache_key(answer, questions[position], model, PROMPT_VERSION)
+            cached = cache.get(cache_keys[position])
+            if cached is not None:
+                scores[position] = cached
+                stats["cache_hits"] += 1
+                continue
+            if questions[position]:
+                reused = _near_duplicate_score(answer, questions[position], model, record=False)
+                if reused is not None:
+                    scores[position] = reused
+                    stats["near_duplicates"] += 1
+                    continue
+        pending.append((position, answer))
+    
+    llm = get_chat_model(provider, model, api_key, temperature=0.3)
+    batch_chain = BATCH_EVALUATION_PROMPT | llm
+    budget = max(1, max_batch_tokens - BATCH_PROMPT_TOKENS)
+    
+    unparsed = []
+    for batch in pack_batches(pending, budget, max_batch_size):
+        packed = "\n\n".join(f"[{i}] {answer}" for i, (_, answer) in enumerate(batch, 1))
+        try:
+            stats["batch_requests"] += 1
+            response = batch_chain.invoke({"answers": packed}, config={"tags": [SCORING_TAG]})
+            parsed = parse_batch_scores(response.content, len(batch))
+        except Exception as e:
+            print(f"Error in batch evaluation: {e}")
+            parsed = {}
+        for i, (position, answer) in enumerate(batch):
+            if i in parsed:
+                scores[position] = parsed[i]
+                if cache_keys[position]:
+                    cache.set(cache_keys[position], parsed[i])
+            else:
+                unparsed.append((position, answer))
+    
+    if unparsed:
+        # Fall back to concurrent single-answer requests
+        chain = EVALUATION_PROMPT | llm
+        stats["single_requests"] += len(unparsed)
+        responses = chain.batch(
+            [{"answer": answer} for _, answer in unparsed],
+            config={"max_concurrency": 8, "tags": [SCORING_TAG]},
+            return_exceptions=True
+        )
+        for (position, _), response in zip(unparsed, responses):
+            score = None
+            if isinstance(response, Exception):
+                print(f"Error in evaluation: {response}")
+            else:
+                score = parse_score(response.content)
+            if score is not None and cache_keys[position]:
+                cache.set(cache_keys[position], score)
+            scores[position] = score
     
-    return 3  # Default if evaluation fails
+    return scores
@@ -0,0 +1,521 @@
+"""
+Report export and archiving.
+
+Formats:
+    json     one indented JSON document per report (the app's download)
+    ndjson   an archive with one compact JSON report per line, appended as
+             reports arrive. With gzip or zstd, records are compressed in
+             blocks of `block_records`, each an independent gzip member or
+             zstd frame, so the file is still a valid .gz / .zst stream.
+    parquet  a columnar archive, one row per report with the transcript as a
+             nested column, written in row groups (zstd or gzip inside
+             the file)
+
+NDJSON archives keep a sidecar index (`<archive>.index`, one JSON line per
+report with its name and block offset), so a reader decompresses one block
+to load one candidate. Parquet readers scan only the `name` column and
+then read the one row group holding the candidate.
+
+Usage (from the project root):
+    python -m interviewer.export replay_reports --output reports.ndjson.zst
+    python -m interviewer.export replay_reports --output reports.parquet --compression gzip
+    python -m interviewer.export reports.ndjson.zst --get "Ada Lovelace"
+"""
+import argparse
+import gzip
+import io
+import json
+import os
+import threading
+from pathlib import Path
+
+EXPORT_FORMATS = ["json", "ndjson", "parquet"]
+COMPRESSIONS = ["none", "gzip", "zstd"]
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+# Records per compressed NDJSON block: larger blocks compress better, smaller
+# ones make single-candidate reads cheaper
+DEFAULT_BLOCK_RECORDS = 32
+# Reports per Parquet row group; a single-candidate read decodes one group
+DEFAULT_ROW_GROUP_REPORTS = 64
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+# Report keys stored as Parquet columns; everything else goes into `details`
+PARQUET_SUMMARY_FIELDS = ("name", "position", "template", "date", "time", "duration_minutes")
+PARQUET_REPORT_FIELDS = ("candidate_summary", "overall_recommendation", "average_score", "total_turns",
+                         "dimension_scores", "transcript")
+
+
+def archive_format(path):
+    """(format, compression) implied by a file name"""
+    suffixes = Path(path).suffixes
+    compression = None
+    if suffixes and suffixes[-1] in (".gz", ".zst"):
+        compression = "gzip" if suffixes[-1] == ".gz" else "zstd"
+        suffixes = suffixes[:-1]
+    suffix = suffixes[-1] if suffixes else ""
+    if suffix == ".parquet":
+        return "parquet", compression
+    if suffix in (".ndjson", ".jsonl"):
+        return "ndjson", compression
+    if suffix == ".json":
+        return "json", compression
+    raise ValueError(f"Cannot tell the export format of '{path}' (use .json, .ndjson[.gz|.zst] or .parquet)")
+
+
+def _compression(compression):
+    if compression in (None, "none"):
+        return None
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Compression must be one of {COMPRESSIONS}, got '{compression}'")
+    return compression
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError("zstd compression needs the 'zstandard' package (pip install zstandard)")
+    return zstandard
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ValueError("Parquet export needs the 'pyarrow' package (pip install pyarrow)")
+    return pyarrow, pyarrow.parquet
+
+
+def _compress(data, compression):
+    if compression == "gzip":
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    if compression == "zstd":
+        return _zstandard().ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return data
+
+
+def _decompress(data, compression):
+    if compression == "gzip":
+        return gzip.decompress(data)
+    if compression == "zstd":
+        return _zstandard().ZstdDecompressor().decompress(data)
+    return data
+
+
+def index_path(path):
+    return Path(f"{path}.index")
+
+
+class NDJSONArchiveWriter:
+    """
+    Appends reports to an NDJSON archive. Uncompressed records are written
+    as they arrive; compressed ones once a block is full (and on close).
+    """
+
+    def __init__(self, path, compression=None, block_records=DEFAULT_BLOCK_RECORDS, append=False):
+        self.path = Path(path)
+        self.compression = _compression(compression)
+        self.block_records = block_records if self.compression else 1
+        mode = "ab" if append else "wb"
+        self._file = open(self.path, mode)
+        self._index = open(index_path(self.path), mode)
+        self._offset = os.path.getsize(self.path)
+        self._block = []  # (index entry, encoded line)
+        self._lock = threading.Lock()
+        self.reports = 0
+
+    def write(self, report):
+        line = json.dumps(report, separators=(",", ":"), default=str).encode("utf-8") + b"\n"
+        summary = report.get("candidate_summary", {})
+        entry = {"name": summary.get("name"), "date": summary.get("date"), "template": summary.get("template")}
+        with self._lock:
+            self._block.append((entry, line))
+            self.reports += 1
+            if len(self._block) >= self.block_records:
+                self._write_block()
+
+    def _write_block(self):
+        if not self._block:
+            return
+        payload = _compress(b"".join(line for _, line in self._block), self.compression)
+        self._file.write(payload)
+        start = 0
+        for entry, line in self._block:
+            entry.update(block=self._offset, length=len(payload), start=start, size=len(line))
+            self._index.write(json.dumps(entry).encode("utf-8") + b"\n")
+            start += len(line)
+        self._offset += len(payload)
+        self._block = []
+
+    def flush(self):
+        with self._lock:
+            self._write_block()
+            self._file.flush()
+            self._index.flush()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+        self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class NDJSONArchive:
+    """Reads an NDJSON archive: all reports in order, or one by name or position"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.compression = archive_format(path)[1]
+        self._entries = None
+        self._block_cache = (None, None)  # (offset, decompressed block)
+
+    @property
+    def entries(self):
+        """Index entries (name, date, template, block offset), one per report"""
+        if self._entries is None:
+            try:
+                with open(index_path(self.path), "rb") as f:
+                    # A torn last line (crash mid-write) is ignored
+                    self._entries = [json.loads(line) for line in f if line.endswith(b"\n")]
+            except FileNotFoundError:
+                raise ValueError(f"{self.path} has no index; read it sequentially instead")
+        return self._entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def names(self):
+        return [entry["name"] for entry in self.entries]
+
+    def read(self, position):
+        """The report at `position`, decompressing only its block"""
+        return self._read_entry(self.entries[position])
+
+    def _read_entry(self, entry):
+        offset, block = self._block_cache
+        if offset != entry["block"]:
+            with open(self.path, "rb") as f:
+                f.seek(entry["block"])
+                block = _decompress(f.read(entry["length"]), self.compression)
+            self._block_cache = (entry["block"], block)
+        return json.loads(block[entry["start"]:entry["start"] + entry["size"]])
+
+    def get(self, name):
+        """The first report for a candidate name, or None"""
+        if self._entries is None:
+            return self._scan_index(name)
+        for position, entry in enumerate(self.entries):
+            if entry["name"] == name:
+                return self.read(position)
+        return None
+
+    def _scan_index(self, name):
+        # Only index lines containing the name are parsed
+        needle = json.dumps(name).encode("utf-8")
+        try:
+            with open(index_path(self.path), "rb") as f:
+                for line in f:
+                    if needle in line and line.endswith(b"\n"):
+                        entry = json.loads(line)
+                        if entry["name"] == name:
+                            return self._read_entry(entry)
+        except FileNotFoundError:
+            raise ValueError(f"{self.path} has no index; read it sequentially instead")
+        return None
+
+    def __iter__(self):
+        if self.compression == "zstd":
+            with open(self.path, "rb") as raw:
+                reader = _zstandard().ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+                yield from _json_lines(io.BufferedReader(reader))
+        else:
+            opener = gzip.open if self.compression == "gzip" else open
+            with opener(self.path, "rb") as f:
+                yield from _json_lines(f)
+
+
+def _json_lines(f):
+    for line in f:
+        if line.endswith(b"\n"):
+            yield json.loads(line)
+
+
+def _parquet_schema(pa):
+    return pa.schema([
+        ("name", pa.string()),
+        ("position", pa.string()),
+        ("template", pa.string()),
+        ("date", pa.string()),
+        ("time", pa.string()),
+        ("duration_minutes", pa.int32()),
+        ("overall_recommendation", pa.string()),
+        ("average_score", pa.float64()),
+        ("total_turns", pa.int32()),
+        ("dimension_scores", pa.list_(pa.struct([
+            ("dimension", pa.string()), ("average_score", pa.float64()), ("count", pa.int32()),
+            ("justification", pa.string())
+        ]))),
+        ("transcript", pa.list_(pa.struct([
+            ("question", pa.string()), ("answer", pa.string()), ("score", pa.int8()),
+            ("dimension", pa.string()), ("telemetry", pa.string())
+        ]))),
+        # JSON of the remaining report sections (strengths, quotes, statistics, ...)
+        ("details", pa.string())
+    ])
+
+
+def _parquet_row(report):
+    summary = report.get("candidate_summary", {})
+    row = {field: summary.get(field) for field in PARQUET_SUMMARY_FIELDS}
+    row.update(
+        overall_recommendation=report.get("overall_recommendation"),
+        average_score=report.get("average_score"),
+        total_turns=report.get("total_turns"),
+        dimension_scores=[dict(stats, dimension=dimension)
+                          for dimension, stats in report.get("dimension_scores", {}).items()],
+        transcript=[
+            dict(turn, telemetry=json.dumps(turn["telemetry"]) if turn.get("telemetry") else None)
+            for turn in report.get("transcript", [])
+        ],
+    )
+    details = {key: value for key, value in report.items() if key not in PARQUET_REPORT_FIELDS}
+    extra = {key: value for key, value in summary.items() if key not in PARQUET_SUMMARY_FIELDS}
+    if extra:
+        details["candidate_summary"] = extra
+    row["details"] = json.dumps(details, default=str)
+    return row
+
+
+def _report_from_row(row):
+    details = json.loads(row["details"])
+    summary = {field: row[field] for field in PARQUET_SUMMARY_FIELDS}
+    summary.update(details.pop("candidate_summary", {}))
+    transcript = []
+    for turn in row["transcript"]:
+        telemetry = turn.pop("telemetry")
+        if telemetry:
+            turn["telemetry"] = json.loads(telemetry)
+        transcript.append(turn)
+    report = {
+        "candidate_summary": summary,
+        "overall_recommendation": row["overall_recommendation"],
+        "average_score": row["average_score"],
+        "dimension_scores": {stats.pop("dimension"): stats for stats in row["dimension_scores"]},
+        "transcript": transcript,
+        "total_turns": row["total_turns"]
+    }
+    report.update(details)
+    return report
+
+
+class ParquetArchiveWriter:
+    """Writes reports to a Parquet file, one row group per `row_group_reports` reports"""
+
+    def __init__(self, path, compression="zstd", row_group_reports=DEFAULT_ROW_GROUP_REPORTS):
+        pa, pq = _pyarrow()
+        self._pa = pa
+        self.path = path
+        self.compression = _compression(compression)
+        self.row_group_reports = row_group_reports
+        self._schema = _parquet_schema(pa)
+        self._writer = pq.ParquetWriter(path, self._schema, compression=self.compression or "none")
+        self._rows = []
+        self._lock = threading.Lock()
+        self.reports = 0
+
+    def write(self, report):
+        with self._lock:
+            self._rows.append(_parquet_row(report))
+            self.reports += 1
+            if len(self._rows) >= self.row_group_reports:
+                self._write_row_group()
+
+    def _write_row_group(self):
+        if self._rows:
+            self._writer.write_table(self._pa.Table.from_pylist(self._rows, schema=self._schema))
+            self._rows = []
+
+    def close(self):
+        with self._lock:
+            self._write_row_group()
+            self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ParquetArchive:
+    """Reads a Parquet archive: all reports in order, or one by name or position"""
+
+    def __init__(self, path):
+        _, pq = _pyarrow()
+        self.path = path
+        self._file = pq.ParquetFile(path)
+        metadata = self._file.metadata
+        self._group_starts = []
+        start = 0
+        for i in range(metadata.num_row_groups):
+            self._group_starts.append(start)
+            start += metadata.row_group(i).num_rows
+        self._names = None
+
+    def __len__(self):
+        return self._file.metadata.num_rows
+
+    def names(self):
+        if self._names is None:
+            self._names = self._file.read(columns=["name"]).column("name").to_pylist()
+        return self._names
+
+    def read(self, position):
+        """The report at `position`, reading only its row group"""
+        if not 0 <= position < len(self):
+            raise IndexError(f"No report at position {position}")
+        group = max(i for i, start in enumerate(self._group_starts) if start <= position)
+        table = self._file.read_row_group(group)
+        return _report_from_row(table.slice(position - self._group_starts[group], 1).to_pylist()[0])
+
+    def get(self, name):
+        """The first report for a candidate name, or None"""
+        names = self.names()
+        return self.read(names.index(name)) if name in names else None
+
+    def __iter__(self):
+        for batch in self._file.iter_batches():
+            for row in batch.to_pylist():
+                yield _report_from_row(row)
+
+
+def open_archive(path):
+    """Reader for an NDJSON or Parquet archive, chosen by file name"""
+    fmt, _ = archive_format(path)
+    if fmt == "parquet":
+        return ParquetArchive(path)
+    if fmt == "ndjson":
+        return NDJSONArchive(path)
+    raise ValueError(f"'{path}' is not an archive (use .ndjson[.gz|.zst] or .parquet)")
+
+
+def open_archive_writer(path, compression=None, append=False):
+    """
+    Writer for an NDJSON or Parquet archive, chosen by file name. NDJSON
+    archives are compressed by their suffix (.gz / .zst) and can be
+    appended to; Parquet archives use `compression` (zstd by default).
+    """
+    fmt, suffix_compression = archive_format(path)
+    if fmt == "parquet":
+        if append:
+            raise ValueError("Parquet archives cannot be appended to; use an .ndjson archive")
+        return ParquetArchiveWriter(path, compression=compression or "zstd")
+    if fmt == "ndjson":
+        if _compression(compression) not in (None, suffix_compression):
+            raise ValueError(f"Name the archive '{path}{COMPRESSION_SUFFIXES[compression]}' for {compression}")
+        return NDJSONArchiveWriter(path, compression=suffix_compression, append=append)
+    raise ValueError(f"'{path}' is not an archive (use .ndjson[.gz|.zst] or .parquet)")
+
+
+def export_report(report, fmt="json", compression=None):
+    """One report as bytes: indented JSON (as before), an NDJSON line or a Parquet file"""
+    compression = _compression(compression)
+    if fmt == "json":
+        data = json.dumps(report, indent=2, default=str).encode("utf-8")
+    elif fmt == "ndjson":
+        data = json.dumps(report, separators=(",", ":"), default=str).encode("utf-8") + b"\n"
+    elif fmt == "parquet":
+        pa, pq = _pyarrow()
+        buffer = io.BytesIO()
+        pq.write_table(pa.Table.from_pylist([_parquet_row(report)], schema=_parquet_schema(pa)), buffer,
+                       compression=compression or "none")
+        return buffer.getvalue()
+    else:
+        raise ValueError(f"Export format must be one of {EXPORT_FORMATS}, got '{fmt}'")
+    return _compress(data, compression)
+
+
+def export_file_name(stem, fmt, compression=None):
+    compression = _compression(compression)
+    suffix = COMPRESSION_SUFFIXES.get(compression, "") if fmt != "parquet" else ""
+    return f"{stem}.{fmt}{suffix}"
+
+
+def save_report(report, path):
+    """
+    Save one report by file name: .json is written indented, .ndjson[.gz|.zst]
+    is appended to an archive and .parquet is (over)written
+    """
+    fmt, compression = archive_format(path)
+    if fmt == "ndjson":
+        with open_archive_writer(path, append=True) as writer:
+            writer.write(report)
+        return
+    with open(path, "wb") as f:
+        f.write(export_report(report, fmt, compression))
+
+
+def iter_report_files(directory):
+    """Reports from the *.json files of a directory (other JSON files are skipped)"""
+    for path in sorted(Path(directory).glob("*.json")):
+        try:
+            with open(path, "r") as f:
+                report = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Skipping {path}: {e}")
+            continue
+        if isinstance(report, dict) and "candidate_summary" in report:
+            yield report
+
+
+def iter_reports(source):
+    """Reports from a directory of report JSON files or from an archive"""
+    if Path(source).is_dir():
+        return iter_report_files(source)
+    return iter(open_archive(source))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("sources", nargs="+", help="Directories of report JSON files and/or archives")
+    parser.add_argument("--output", help="Archive to write: .ndjson[.gz|.zst] or .parquet")
+    parser.add_argument("--compression", choices=COMPRESSIONS,
+                        help="Compression inside a Parquet archive (NDJSON archives follow their .gz / .zst suffix)")
+    parser.add_argument("--append", action="store_true", help="Append to an existing NDJSON archive")
+    parser.add_argument("--get", metavar="NAME", help="Print one candidate's report from an archive")
+    parser.add_argument("--list", action="store_true", help="List the candidates in an archive")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.get or args.list:
+        archive = open_archive(args.sources[0])
+        if args.list:
+            for position, name in enumerate(archive.names()):
+                print(f"{position}: {name}")
+        if args.get:
+            report = archive.get(args.get)
+            if report is None:
+                raise ValueError(f"No report for '{args.get}' in {args.sources[0]}")
+            print(json.dumps(report, indent=2))
+        return
+    if not args.output:
+        raise ValueError("Give --output to write an archive, or --get / --list to read one")
+
+    with open_archive_writer(args.output, compression=args.compression, append=args.append) as writer:
+        for source in args.sources:
+            for report in iter_reports(source):
+                writer.write(report)
+    print(f"Wrote {writer.reports} reports to {args.output} ({os.path.getsize(args.output) / 1024:.1f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,380 @@
+import asyncio
+import contextvars
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from .telemetry import percentile, record_hedge
+
+# Hard cap (seconds) on one LLM call made outside a turn deadline
+DEFAULT_CALL_TIMEOUT = 30.0
+
+# A duplicate request is sent once the primary is slower than this
+# percentile of recent latencies of the same model (0 disables hedging)
+DEFAULT_HEDGE_PERCENTILE = 95
+# At most this share of calls may be hedged, so hedges cannot double the load
+DEFAULT_HEDGE_MAX_RATE = 0.1
+# Latencies kept per model, and needed before hedging starts
+HEDGE_WINDOW = 200
+HEDGE_MIN_SAMPLES = 20
+HEDGE_MIN_DELAY_SECONDS = 0.05
+# "same" hedges to the same model, "alternate" to its first failover route
+HEDGE_TARGETS = ["same", "alternate"]
+# Threads running sync LLM calls. Time queued for one counts against the
+# call deadline, so the pool grows with the turn pool (see set_call_workers)
+DEFAULT_CALL_WORKERS = 32
+
+_deadline = contextvars.ContextVar("llm_deadline", default=None)
+
+
+class DeadlineExceededError(TimeoutError):
+    """Raised when an LLM call does not finish before its deadline"""
+
+
+@contextmanager
+def deadline_at(when):
+    """
+    Give every LLM call in the block (and in worker threads that copy the
+    context) the absolute `time.monotonic()` deadline `when`. A tighter
+    enclosing deadline wins.
+    """
+    current = _deadline.get()
+    token = _deadline.set(when if current is None else min(current, when))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def deadline_after(seconds):
+    return deadline_at(time.monotonic() + seconds)
+
+
+def remaining():
+    """Seconds left before the current deadline, or None without one"""
+    when = _deadline.get()
+    return None if when is None else when - time.monotonic()
+
+
+class LatencyTracker:
+    """Recent call latencies per key, used to pick the hedging delay"""
+
+    def __init__(self, window=HEDGE_WINDOW, min_samples=HEDGE_MIN_SAMPLES):
+        self.window = window
+        self.min_samples = min_samples
+        self._latencies = {}
+        self._lock = threading.Lock()
+
+    def observe(self, key, seconds):
+        with self._lock:
+            self._latencies.setdefault(key, deque(maxlen=self.window)).append(seconds)
+
+    def threshold(self, key, pct):
+        """pct-th percentile of the recent latencies (None until enough samples)"""
+        with self._lock:
+            values = list(self._latencies.get(key, ()))
+        if len(values) < self.min_samples:
+            return None
+        return max(HEDGE_MIN_DELAY_SECONDS, percentile(values, pct))
+
+
+class Hedger:
+    """
+    Runs LLM calls under a deadline and hedges slow ones: when the primary
+    has not answered after the hedge delay, a duplicate is sent and the
+    first successful result wins. The loser is cancelled if it has not
+    started yet; otherwise its result is discarded when it arrives (and
+    passed to `discard`, e.g. to close a stream).
+    """
+
+    def __init__(self, hedge_percentile=DEFAULT_HEDGE_PERCENTILE, max_hedge_rate=DEFAULT_HEDGE_MAX_RATE,
+                 call_timeout=DEFAULT_CALL_TIMEOUT, max_workers=DEFAULT_CALL_WORKERS):
+        self.hedge_percentile = hedge_percentile
+        self.max_hedge_rate = max_hedge_rate
+        self.call_timeout = call_timeout
+        self.latencies = LatencyTracker()
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-call")
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "hedged": 0, "hedge_wins": 0, "latency_saved_seconds": 0.0,
+                       "deadline_exceeded": 0}
+
+    def _submit(self, func):
+        # Each call gets its own copy so the deadline and telemetry follow it
+        with self._lock:
+            executor = self._executor
+        return executor.submit(contextvars.copy_context().run, func)
+
+    def set_call_workers(self, concurrent_calls):
+        """
+        Grow the call pool so `concurrent_calls` primaries and their hedges
+        never wait for a thread. Calls already running finish on the old pool.
+        """
+        max_workers = concurrent_calls + max(1, int(concurrent_calls * self.max_hedge_rate) + 1)
+        with self._lock:
+            if max_workers <= self.max_workers:
+                return
+            previous = self._executor
+            self.max_workers = max_workers
+            self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-call")
+        previous.shutdown(wait=False)
+
+    def _should_hedge(self):
+        with self._lock:
+            return self._stats["hedged"] < self.max_hedge_rate * max(1, self._stats["calls"])
+
+    def _add(self, name, value=1):
+        with self._lock:
+            self._stats[name] += value
+
+    def _begin(self):
+        # (timeout, start) of a call under the current deadline
+        left = remaining()
+        timeout = self.call_timeout if left is None else min(left, self.call_timeout)
+        if timeout <= 0:
+            self._add("deadline_exceeded")
+            raise DeadlineExceededError("deadline passed before the LLM call started")
+        self._add("calls")
+        return timeout, time.monotonic()
+
+    def _observe_primary(self, key, start):
+        # Done callback (future or task) that records the primary's latency
+        def observe(call):
+            if not call.cancelled() and call.exception() is None:
+                self.latencies.observe(key, time.monotonic() - start)
+        return observe
+
+    def _hedge_delay(self, key, hedge, timeout):
+        # Seconds to wait for the primary before hedging, or None not to hedge
+        if hedge is None or not self.hedge_percentile:
+            return None
+        delay = self.latencies.threshold(key, self.hedge_percentile)
+        return delay if delay is not None and delay < timeout else None
+
+    def _start_hedge(self):
+        if not self._should_hedge():
+            return False
+        self._add("hedged")
+        return True
+
+    def _winner(self, done, primary, hedged, errors):
+        # First successful call in `done` (a hedge win is recorded), or None;
+        # failures are collected in `errors`, keyed by "is the primary"
+        for call in done:
+            if call.exception() is not None:
+                errors[call is primary] = call.exception()
+                continue
+            won = call is not primary
+            if hedged:
+                record_hedge(won)
+            if won:
+                self._add("hedge_wins")
+            return call
+        return None
+
+    def _timed_out(self, timeout):
+        self._add("deadline_exceeded")
+        return DeadlineExceededError(f"LLM call did not finish within {timeout:.1f}s")
+
+    def run(self, key, primary, hedge=None, discard=None):
+        """
+        Call `primary()` within the current deadline (or `call_timeout`).
+        `hedge` is an optional zero-argument callable sent as the duplicate;
+        it may raise to decline (e.g. no rate-limit budget). Returns the
+        first successful result; raises DeadlineExceededError on timeout.
+        """
+        timeout, start = self._begin()
+        primary_future = self._submit(primary)
+        primary_future.add_done_callback(self._observe_primary(key, start))
+        pending = {primary_future}
+
+        delay = self._hedge_delay(key, hedge, timeout)
+        if delay is not None:
+            done, _ = wait(pending, timeout=delay)
+            if not done and self._start_hedge():
+                pending.add(self._submit(hedge))
+
+        hedged = len(pending) > 1
+        errors = {}
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, start + timeout - time.monotonic()),
+                                 return_when=FIRST_COMPLETED)
+            if not done:
+                self._abandon(pending, discard)
+                raise self._timed_out(timeout)
+            winner = self._winner(done, primary_future, hedged, errors)
+            if winner is not None:
+                if winner is not primary_future:
+                    self._track_saving(primary_future, time.monotonic() - start, start)
+                self._abandon(pending, discard)
+                return winner.result()
+        # Every attempt failed: the primary's error is the meaningful one
+        raise errors.get(True) or errors[False]
+
+    async def arun(self, key, primary, hedge=None, discard=None):
+        """
+        Async `run` for calls made on an event loop: `primary` and `hedge`
+        are zero-argument coroutine functions, awaited as tasks instead of
+        occupying worker threads. A losing or timed-out task is cancelled;
+        `discard` (may be a coroutine function) gets a result that arrived
+        too late to be cancelled. The primary is cancelled when a hedge
+        wins, so the latency saved is not measured.
+        """
+        timeout, start = self._begin()
+        primary_task = asyncio.ensure_future(primary())
+        primary_task.add_done_callback(self._observe_primary(key, start))
+        pending = {primary_task}
+        try:
+            delay = self._hedge_delay(key, hedge, timeout)
+            if delay is not None:
+                done, _ = await asyncio.wait(pending, timeout=delay)
+                if not done and self._start_hedge():
+                    pending.add(asyncio.ensure_future(hedge()))
+
+            hedged = len(pending) > 1
+            errors = {}
+            while pending:
+                done, pending = await asyncio.wait(pending, timeout=max(0.0, start + timeout - time.monotonic()),
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    raise self._timed_out(timeout)
+                winner = self._winner(done, primary_task, hedged, errors)
+                if winner is not None:
+                    pending |= done - {winner}
+                    return winner.result()
+            raise errors.get(True) or errors[False]
+        finally:
+            self._abandon_tasks(pending, discard)
+
+    def _abandon_tasks(self, tasks, discard):
+        for task in tasks:
+            if task.cancel() or discard is None:
+                continue
+            # Finished between the wait and the cancel
+            if not task.cancelled() and task.exception() is None:
+                result = discard(task.result())
+                if asyncio.iscoroutine(result):
+                    asyncio.ensure_future(result)
+
+    def _track_saving(self, primary_future, winner_seconds, start):
+        # Measured when the abandoned primary eventually completes
+        def saved(future):
+            if not future.cancelled():
+                self._add("latency_saved_seconds", max(0.0, time.monotonic() - start - winner_seconds))
+
+        primary_future.add_done_callback(saved)
+
+    def _abandon(self, futures, discard):
+        for future in futures:
+            if future.cancel() or discard is None:
+                continue
+            future.add_done_callback(
+                lambda f: discard(f.result()) if not f.cancelled() and f.exception() is None else None
+            )
+
+    def _stream_until(self):
+        # Absolute time by which a stream must be done
+        left = remaining()
+        return time.monotonic() + (self.call_timeout if left is None else min(left, self.call_timeout))
+
+    def _stalled(self):
+        self._add("deadline_exceeded")
+        return DeadlineExceededError("LLM stream stalled past its deadline")
+
+    def stream(self, iterator):
+        """
+        Iterate `iterator` in a worker thread, raising DeadlineExceededError
+        if the next item does not arrive before the current deadline (or
+        `call_timeout`). Closing the returned generator stops the worker.
+        """
+        items = queue.Queue()
+        stop = threading.Event()
+        end = object()
+
+        def pump():
+            try:
+                for item in iterator:
+                    if stop.is_set():
+                        break
+                    items.put((item, None))
+                items.put((end, None))
+            except BaseException as e:
+                items.put((end, e))
+            finally:
+                close = getattr(iterator, "close", None)
+                if close:
+                    close()
+
+        until = self._stream_until()
+        threading.Thread(target=contextvars.copy_context().run, args=(pump,), daemon=True,
+                         name="llm-stream").start()
+        try:
+            while True:
+                try:
+                    item, error = items.get(timeout=max(0.0, until - time.monotonic()))
+                except queue.Empty:
+                    raise self._stalled()
+                if error is not None:
+                    raise error
+                if item is end:
+                    return
+                yield item
+        finally:
+            stop.set()
+
+    async def astream(self, iterator):
+        """
+        Async `stream`: awaits each item of the async `iterator`, raising
+        DeadlineExceededError if one does not arrive before the current
+        deadline (or `call_timeout`). Closing the generator closes `iterator`.
+        """
+        until = self._stream_until()
+        try:
+            while True:
+                try:
+                    item = await asyncio.wait_for(anext(iterator), max(0.0, until - time.monotonic()))
+                except StopAsyncIteration:
+                    return
+                except asyncio.TimeoutError:
+                    raise self._stalled()
+                yield item
+        finally:
+            await iterator.aclose()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats, latency_saved_seconds=round(self._stats["latency_saved_seconds"], 3))
+        stats["hedge_rate"] = round(stats["hedged"] / stats["calls"], 4) if stats["calls"] else 0.0
+        return stats
+
+
+_default_hedger = None
+_default_lock = threading.Lock()
+
+
+def get_hedger():
+    """
+    Process-wide hedger, configured with LLM_CALL_TIMEOUT,
+    LLM_HEDGE_PERCENTILE (0 disables hedging), LLM_HEDGE_MAX_RATE and
+    LLM_CALL_WORKERS
+    """
+    global _default_hedger
+    with _default_lock:
+        if _default_hedger is None:
+            _default_hedger = Hedger(
+                hedge_percentile=float(os.getenv("LLM_HEDGE_PERCENTILE", DEFAULT_HEDGE_PERCENTILE)),
+                max_hedge_rate=float(os.getenv("LLM_HEDGE_MAX_RATE", DEFAULT_HEDGE_MAX_RATE)),
+                call_timeout=float(os.getenv("LLM_CALL_TIMEOUT", DEFAULT_CALL_TIMEOUT)),
+                max_workers=int(os.getenv("LLM_CALL_WORKERS", DEFAULT_CALL_WORKERS))
+            )
+        return _default_hedger
+
+
+def hedge_target():
+    target = os.getenv("LLM_HEDGE_TARGET", "same")
+    if target not in HEDGE_TARGETS:
+        raise ValueError(f"LLM_HEDGE_TARGET must be one of {HEDGE_TARGETS}, got '{target}'")
+    return target
@@ -1,15 +1,17 @@
 from langchain_core.prompts import PromptTemplate
-from langchain_openai import ChatOpenAI
-from langchain_core.runnables.history import RunnableWithMessageHistory
-from langchain_groq import ChatGroq
-from langchain_community.chat_message_histories import ChatMessageHistory
+from .memory import HistoryStrategy
+from .parsing import STOP_SEQUENCES
+from .routing import routed_model_step
+from .session_store import get_session_store
+from .telemetry import PROMPT_BUILD_RUN
+from .tokens import estimate_tokens
 
-# Session storage for conversation history
-session_store = {}
+# Session storage for conversation history (bounded, evicts idle sessions)
+session_store = get_session_store()
 
-def build_interview_chain(llm_provider, api_key, model):
-    prompt = PromptTemplate(
-        template="""
+# Built once per process and shared by every chain
+INTERVIEW_PROMPT = PromptTemplate(
+    template="""
 You are a technical interviewer conducting a {role} interview.
 
 Rules:
@@ -27,21 +29,48 @@ Conversation history:
 Candidate response:
 {input}
 """,
-        input_variables=["history", "input", "role"]
-    )
+    input_variables=["history", "input", "role"]
+)
+INTERVIEW_PROMPT_TOKENS = estimate_tokens(INTERVIEW_PROMPT.template)
+
+
+def build_interview_chain(llm_provider, api_key, model, history_strategy=None, store=None,
+                          stop_after_question=True):
+    """
+    Interviewer chain for `model`. A "routing" policy in the chain input
+    may send a turn to the provider's faster model (see routing.py).
+    """
+    # Imported here: the runnables/tracing stack is slow to import and only
+    # needed once an interview starts
+    from langchain_core.runnables import RunnableLambda
+    from langchain_core.runnables.history import RunnableWithMessageHistory
+
+    # The evaluation text is never used, so stop generating once the question is out
+    stop = STOP_SEQUENCES if stop_after_question else None
 
-    if llm_provider == "Groq":
-        llm = ChatGroq(model=model, groq_api_key=api_key, temperature=0.3)
-    else:
-        llm = ChatOpenAI(model=model, api_key=api_key, temperature=0.3)
+    # Trim the replayed history to the strategy's token budget
+    history_strategy = history_strategy or HistoryStrategy()
+
+    store = store if store is not None else session_store
+    store.on_evict(history_strategy.forget)
 
     def get_session_history(session_id):
-        if session_id not in session_store:
-            session_store[session_id] = ChatMessageHistory()
-        return session_store[session_id]
+        return store.get_history(session_id)
+
+    # The strategy may be shared with the step chain, so the overhead of this
+    # prompt is passed per call
+    def trim_history(inputs, config):
+        return history_strategy(inputs, config, INTERVIEW_PROMPT_TOKENS)
 
+    async def atrim_history(inputs, config):
+        return await history_strategy.acall(inputs, config, INTERVIEW_PROMPT_TOKENS)
+
+    # The named prompt step lets telemetry time prompt building separately
+    prompt_step = (RunnableLambda(trim_history, afunc=atrim_history) | INTERVIEW_PROMPT).with_config(
+        run_name=PROMPT_BUILD_RUN
+    )
     chain = RunnableWithMessageHistory(
-        runnable=prompt | llm,
+        runnable=routed_model_step(prompt_step, llm_provider, api_key, model, stop=stop),
         get_session_history=get_session_history,
         input_messages_key="input",
         history_messages_key="history"
@@ -0,0 +1,141 @@
+import json
+import re
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.prompts import PromptTemplate
+from pydantic import BaseModel, Field, ValidationError
+from .clients import get_chat_model
+from .routing import FOLLOWUP
+from .memory import HistoryStrategy
+from .session_store import get_session_store
+from .telemetry import record_retry, span
+from .tokens import estimate_tokens
+
+# Turn modes: "split" asks the interviewer chain and the evaluator separately,
+# "combined" gets follow-up, evaluation and score from one call
+TURN_MODES = ["split", "combined"]
+DEFAULT_TURN_MODE = "split"
+
+# Extra attempts when the model returns output that fails the schema
+DEFAULT_STEP_RETRIES = 2
+
+STEP_PROMPT = PromptTemplate(
+    template="""
+You are a technical interviewer conducting a {role} interview.
+
+Rules:
+- Ask ONE follow-up question at a time
+- Ask follow-up questions if the answer lacks depth
+- Stay professional and neutral
+- Do not reveal scores or feedback in the question
+- Score the candidate's latest answer on a scale of 1-5:
+  1 - Completely wrong or no understanding
+  2 - Partially correct but lacks depth or contains errors
+  3 - Adequate/acceptable answer with basic understanding
+  4 - Good answer with clear explanation and relevant details
+  5 - Excellent/comprehensive answer with deep understanding and insightful details
+
+Conversation history:
+{history}
+
+Candidate response:
+{input}
+
+Respond with ONLY a JSON object in this format:
+{{"question": "<your follow-up question>", "evaluation": "<one-sentence evaluation>", "score": <1-5>}}
+{retry_note}""",
+    input_variables=["history", "input", "role", "retry_note"]
+)
+STEP_PROMPT_TOKENS = estimate_tokens(STEP_PROMPT.template)
+
+JSON_OBJECT = re.compile(r"\{.*\}", re.DOTALL)
+
+
+class InterviewStep(BaseModel):
+    """Validated output of a combined interview step"""
+    question: str = Field(min_length=1)
+    evaluation: str = ""
+    score: int = Field(ge=1, le=5)
+
+
+class InvalidStepOutput(ValueError):
+    """Raised when the model keeps returning output that fails the step schema"""
+
+
+def parse_step(response_text):
+    """Validate a step reply; raises ValueError with the reason if it is invalid"""
+    match = JSON_OBJECT.search(response_text)
+    if not match:
+        raise ValueError("no JSON object found")
+    try:
+        return InterviewStep.model_validate(json.loads(match.group(0)))
+    except (json.JSONDecodeError, ValidationError) as e:
+        raise ValueError(str(e).splitlines()[0])
+
+
+class InterviewStepChain:
+    """
+    One-call interview step: returns the follow-up question, a short
+    evaluation and a 1-5 score for the candidate's answer.
+
+    Uses the same session store and history strategy as the split chain;
+    only the question is written back to the history so both modes keep
+    the same conversation format.
+    """
+
+    def __init__(self, llm, store, history_strategy, max_retries=DEFAULT_STEP_RETRIES, route=None):
+        self.llm = llm
+        # (provider, api_key, model) the chain input's routing policy chooses from
+        self.route = route
+        self.store = store
+        self.history_strategy = history_strategy
+        self.max_retries = max_retries
+
+    def invoke(self, chain_input, config=None):
+        """
+        Run one step for `chain_input` ({"input", "role", optional "question"
+        and "routing"}). Returns (InterviewStep, raw response message, attempts).
+        """
+        config = config or {}
+        session_id = config["configurable"]["session_id"]
+        llm = self.llm
+        routing = chain_input.get("routing")
+        if routing is not None and self.route is not None:
+            provider, api_key, model = self.route
+            routed = routing.route(FOLLOWUP, chain_input["input"], provider, model)
+            if routed != model:
+                llm = get_chat_model(provider, routed, api_key, temperature=0.3)
+        with span("prompt_build"):
+            history = self.store.get_history(session_id)
+            inputs = self.history_strategy(dict(chain_input, history=history.messages), config, STEP_PROMPT_TOKENS)
+
+        retry_note = ""
+        for attempt in range(1, self.max_retries + 2):
+            if attempt > 1:
+                record_retry()
+            with span("prompt_build"):
+                prompt = STEP_PROMPT.invoke(dict(inputs, retry_note=retry_note))
+            response = llm.invoke(prompt, config=config)
+            try:
+                with span("parse"):
+                    step = parse_step(response.content)
+            except ValueError as e:
+                retry_note = f"\nYour previous reply was invalid ({e}). Respond with ONLY the JSON object."
+                continue
+            history.add_messages([
+                HumanMessage(content=chain_input["input"]),
+                AIMessage(content=f"QUESTION: {step.question}")
+            ])
+            return step, response, attempt
+
+        raise InvalidStepOutput(f"No valid interview step after {self.max_retries + 1} attempts")
+
+
+def build_step_chain(llm_provider, api_key, model, history_strategy=None, store=None,
+                     max_retries=DEFAULT_STEP_RETRIES):
+    """Build the combined follow-up + evaluation + score chain"""
+    llm = get_chat_model(llm_provider, model, api_key, temperature=0.3)
+    history_strategy = history_strategy if history_strategy is not None else HistoryStrategy()
+    store = store if store is not None else get_session_store()
+    store.on_evict(history_strategy.forget)
+    return InterviewStepChain(llm, store, history_strategy, max_retries=max_retries,
+                              route=(llm_provider, api_key, model))
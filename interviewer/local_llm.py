@@ -0,0 +1,355 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from pathlib import Path
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from .clients import LOCAL_MODELS
+from .scheduler import astream_chunks, stream_chunks
+from .tokens import estimate_tokens
+
+# Simulated latency of the fake model (override with env vars)
+DEFAULT_FIRST_TOKEN_SECONDS = 0.3
+DEFAULT_TOKENS_PER_SECOND = 200
+# Share of calls that stall before the first token, and for how long
+DEFAULT_SLOW_CALL_RATE = 0.0
+DEFAULT_SLOW_CALL_SECONDS = 2.0
+# fake-large: slower to first token and to generate, like a larger model
+LARGE_MODEL_SLOWDOWN = 3.0
+
+DEFAULT_CASSETTE_PATH = ".cache/llm_cassette.jsonl"
+
+FOLLOWUPS = [
+    "Can you walk me through a concrete example of that?",
+    "What trade-offs would you consider with that approach?",
+    "How would you measure whether that works in practice?",
+    "What could go wrong with that in production, and how would you handle it?",
+    "How would you explain that to a non-technical stakeholder?"
+]
+
+WORD = re.compile(r"\S+\s*|\s+")
+
+
+def _section(text, start, end):
+    # Text between two prompt labels, or "" if the start label is missing
+    begin = text.find(start)
+    if begin == -1:
+        return ""
+    begin += len(start)
+    finish = text.find(end, begin)
+    return text[begin:finish if finish != -1 else len(text)].strip()
+
+
+def _score(answer):
+    # Longer answers score higher: 1 for a few words, 5 from ~32 words on
+    return max(1, min(5, 1 + len(answer.split()) // 8))
+
+
+def _prompt_text(messages):
+    return "\n".join(str(message.content) for message in messages)
+
+
+def _apply_stop(text, stop):
+    for sequence in stop or []:
+        idx = text.find(sequence)
+        if idx != -1:
+            text = text[:idx]
+    return text
+
+
+def _usage(prompt, text):
+    input_tokens = estimate_tokens(prompt)
+    output_tokens = estimate_tokens(text)
+    return {"input_tokens": input_tokens, "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens}
+
+
+def fake_response(prompt):
+    """
+    Deterministic reply for one of the app's prompts, recognised by its
+    output format instructions. The same prompt always gets the same reply.
+    """
+    digest = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest(), 16)
+    followup = FOLLOWUPS[digest % len(FOLLOWUPS)]
+
+    if "Format: [index] SCORE:" in prompt:
+        answers = _section(prompt, "Candidate answers:", "Respond with exactly")
+        items = re.split(r"^\[\d+\] ", answers, flags=re.MULTILINE)[1:]
+        return "\n".join(
+            f"[{i}] SCORE: {_score(answer)} REASON: Scored offline by the local fake model."
+            for i, answer in enumerate(items, 1)
+        )
+    if "Format: SCORE:" in prompt:
+        answer = _section(prompt, "Candidate's answer:", "Respond with ONLY")
+        return f"SCORE: {_score(answer)} REASON: Scored offline by the local fake model."
+    if '"score": <1-5>' in prompt:
+        answer = _section(prompt, "Candidate response:", "Respond with ONLY")
+        return json.dumps({
+            "question": followup,
+            "evaluation": "Scored offline by the local fake model.",
+            "score": _score(answer)
+        })
+    if "Summarize this technical interview" in prompt:
+        return "The candidate answered the questions so far; depth varied between topics."
+    return f"QUESTION: {followup}\nEVALUATION: Answer noted by the local fake model."
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Offline chat model with deterministic replies, simulated time to first
+    token and generation speed, token-by-token streaming and usage metadata.
+    A `slow_call_rate` share of calls stalls for `slow_call_seconds` more,
+    to reproduce a provider's latency tail. The async methods wait with
+    asyncio.sleep, like a network call, so they never hold a thread.
+    """
+
+    model_name: str = "fake"
+    first_token_seconds: float = DEFAULT_FIRST_TOKEN_SECONDS
+    tokens_per_second: float = DEFAULT_TOKENS_PER_SECOND
+    slow_call_rate: float = DEFAULT_SLOW_CALL_RATE
+    slow_call_seconds: float = DEFAULT_SLOW_CALL_SECONDS
+
+    @property
+    def _llm_type(self):
+        return "local-fake"
+
+    def _first_token_delay(self):
+        if self.slow_call_rate and random.random() < self.slow_call_rate:
+            return self.first_token_seconds + self.slow_call_seconds
+        return self.first_token_seconds
+
+    def _generation_delay(self, text):
+        delay = self._first_token_delay()
+        if self.tokens_per_second:
+            delay += estimate_tokens(text) / self.tokens_per_second
+        return delay
+
+    def _piece_delay(self, piece):
+        return estimate_tokens(piece) / self.tokens_per_second if self.tokens_per_second else 0
+
+    def _result(self, prompt, text):
+        message = AIMessage(content=text, usage_metadata=_usage(prompt, text),
+                            response_metadata={"model_name": self.model_name})
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _final_chunk(self, prompt, text):
+        # Usage is reported once, on the final chunk
+        return ChatGenerationChunk(message=AIMessageChunk(
+            content="", usage_metadata=_usage(prompt, text), response_metadata={"model_name": self.model_name}
+        ))
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        prompt = _prompt_text(messages)
+        text = _apply_stop(fake_response(prompt), stop)
+        time.sleep(self._generation_delay(text))
+        return self._result(prompt, text)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        prompt = _prompt_text(messages)
+        text = _apply_stop(fake_response(prompt), stop)
+        await asyncio.sleep(self._generation_delay(text))
+        return self._result(prompt, text)
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        prompt = _prompt_text(messages)
+        text = _apply_stop(fake_response(prompt), stop)
+        time.sleep(self._first_token_delay())
+        for piece in WORD.findall(text):
+            time.sleep(self._piece_delay(piece))
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=piece))
+            if run_manager:
+                run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+        yield self._final_chunk(prompt, text)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        prompt = _prompt_text(messages)
+        text = _apply_stop(fake_response(prompt), stop)
+        await asyncio.sleep(self._first_token_delay())
+        for piece in WORD.findall(text):
+            await asyncio.sleep(self._piece_delay(piece))
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=piece))
+            if run_manager:
+                await run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+        yield self._final_chunk(prompt, text)
+
+
+class Cassette:
+    """
+    Recorded LLM responses keyed by a hash of the prompt messages and stop
+    sequences, stored as JSONL so recordings can be appended and diffed.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._entries = {}
+        if self.path.exists():
+            with open(self.path, "r") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[entry["key"]] = entry
+
+    @staticmethod
+    def make_key(messages, stop=None):
+        payload = json.dumps({
+            "messages": [[message.type, message.content] for message in messages],
+            "stop": list(stop or [])
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            return self._entries.get(key)
+
+    def record(self, key, message):
+        entry = {"key": key, "content": message.content, "usage_metadata": message.usage_metadata}
+        with self._lock:
+            self._entries[key] = entry
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+_cassettes = {}
+_cassettes_lock = threading.Lock()
+
+
+def get_cassette(path=None):
+    """Shared cassette for a path (LLM_CASSETTE_PATH by default)"""
+    path = path or os.getenv("LLM_CASSETTE_PATH", DEFAULT_CASSETTE_PATH)
+    with _cassettes_lock:
+        if path not in _cassettes:
+            _cassettes[path] = Cassette(path)
+        return _cassettes[path]
+
+
+class RecordReplayChatModel(BaseChatModel):
+    """
+    Records the responses of `inner` to a cassette, or (without `inner`)
+    replays them. Streamed responses are recorded as their concatenated
+    chunks and replayed word by word. Replaying a prompt that was never
+    recorded raises ValueError.
+    """
+
+    model_name: str = "replay"
+    cassette_path: str = DEFAULT_CASSETTE_PATH
+    inner: BaseChatModel = None
+
+    @property
+    def _llm_type(self):
+        return "local-record" if self.inner is not None else "local-replay"
+
+    def _entry(self, key):
+        entry = get_cassette(self.cassette_path).get(key)
+        if entry is None:
+            raise ValueError(f"No recorded response for prompt {key[:12]} in {self.cassette_path}")
+        return entry
+
+    def _replay_chunks(self, entry):
+        for piece in WORD.findall(entry["content"]):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=piece))
+        yield ChatGenerationChunk(message=AIMessageChunk(
+            content="", usage_metadata=entry.get("usage_metadata"), response_metadata={"model_name": self.model_name}
+        ))
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        key = Cassette.make_key(messages, stop)
+        if self.inner is not None:
+            # Called directly so callbacks see a single run
+            message = self.inner._generate(messages, stop=stop, **kwargs).generations[0].message
+            get_cassette(self.cassette_path).record(key, message)
+        else:
+            entry = self._entry(key)
+            message = AIMessage(content=entry["content"], usage_metadata=entry.get("usage_metadata"),
+                                response_metadata={"model_name": self.model_name})
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        key = Cassette.make_key(messages, stop)
+        if self.inner is None:
+            for chunk in self._replay_chunks(self._entry(key)):
+                if run_manager and chunk.message.content:
+                    run_manager.on_llm_new_token(chunk.message.content, chunk=chunk)
+                yield chunk
+            return
+        # A stream closed early (once the question is in) is recorded as far
+        # as it was read, which is all a replay of it needs
+        streamed = None
+        stream = iter(stream_chunks(self.inner, messages, stop=stop, **kwargs))
+        try:
+            for chunk in stream:
+                streamed = chunk if streamed is None else streamed + chunk
+                if run_manager and chunk.message.content:
+                    run_manager.on_llm_new_token(chunk.message.content, chunk=chunk)
+                yield chunk
+        except Exception:
+            streamed = None
+            raise
+        finally:
+            close = getattr(stream, "close", None)
+            if close:
+                close()
+            if streamed is not None:
+                get_cassette(self.cassette_path).record(key, streamed.message)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        key = Cassette.make_key(messages, stop)
+        if self.inner is None:
+            for chunk in self._replay_chunks(self._entry(key)):
+                if run_manager and chunk.message.content:
+                    await run_manager.on_llm_new_token(chunk.message.content, chunk=chunk)
+                yield chunk
+            return
+        streamed = None
+        stream = astream_chunks(self.inner, messages, stop=stop, **kwargs)
+        try:
+            async for chunk in stream:
+                streamed = chunk if streamed is None else streamed + chunk
+                if run_manager and chunk.message.content:
+                    await run_manager.on_llm_new_token(chunk.message.content, chunk=chunk)
+                yield chunk
+        except Exception:
+            streamed = None
+            raise
+        finally:
+            await stream.aclose()
+            if streamed is not None:
+                get_cassette(self.cassette_path).record(key, streamed.message)
+
+
+def build_local_model(model):
+    """Chat model for the "Local" provider"""
+    if model in ("fake", "fake-large"):
+        slowdown = LARGE_MODEL_SLOWDOWN if model == "fake-large" else 1.0
+        return FakeChatModel(
+            model_name=model,
+            first_token_seconds=float(os.getenv("LOCAL_LLM_FIRST_TOKEN_SECONDS", DEFAULT_FIRST_TOKEN_SECONDS)) * slowdown,
+            tokens_per_second=float(os.getenv("LOCAL_LLM_TOKENS_PER_SECOND", DEFAULT_TOKENS_PER_SECOND)) / slowdown,
+            slow_call_rate=float(os.getenv("LOCAL_LLM_SLOW_CALL_RATE", DEFAULT_SLOW_CALL_RATE)),
+            slow_call_seconds=float(os.getenv("LOCAL_LLM_SLOW_CALL_SECONDS", DEFAULT_SLOW_CALL_SECONDS))
+        )
+    if model == "replay":
+        return RecordReplayChatModel(cassette_path=os.getenv("LLM_CASSETTE_PATH", DEFAULT_CASSETTE_PATH))
+    raise ValueError(f"Unknown local model '{model}', expected one of {LOCAL_MODELS}")
+
+
+def recording(llm):
+    """Wrap a provider model so its responses are saved to the cassette"""
+    return RecordReplayChatModel(
+        model_name=getattr(llm, "model_name", "record"),
+        cassette_path=os.getenv("LLM_CASSETTE_PATH", DEFAULT_CASSETTE_PATH),
+        inner=llm
+    )
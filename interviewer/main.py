@@ -1,103 +1,216 @@
-import yaml
-import os
+import argparse
+import uuid
 from dotenv import load_dotenv
-from interview_chain import build_interview_chain
-from evaluator import evaluate_answer
-from sessions import InterviewSession
-from report import generate_report
+from .interview_chain import build_interview_chain
+from .clients import require_api_key
+from .evaluator import EVALUATOR_MODEL, evaluate_answer, index_scored_answers
+from .sessions import InterviewSession
+from .report import generate_report
+from .turns import TurnTimeoutError, run_turn, run_step_turn
+from .interview_step import TURN_MODES, DEFAULT_TURN_MODE, build_step_chain
+from .parsing import get_parse_stats
+from .telemetry import export_telemetry
+from .templates import DEFAULT_TEMPLATE, get_template_registry
+from .session_log import get_session_log, resume_history
+from .export import save_report
+from .hedging import DeadlineExceededError
+from .scheduler import BudgetExhaustedError
+from .memory import HISTORY_STRATEGIES, DEFAULT_HISTORY_STRATEGY, DEFAULT_HISTORY_BUDGET, build_history_strategy
 
 # Load environment variables
 load_dotenv()
 
-def load_template():
-    with open("templates/AI_engineer.yaml", "r") as f:
-        return yaml.safe_load(f)
+def load_template(name=DEFAULT_TEMPLATE):
+    return get_template_registry().get(name)
 
 
-def parse_llm_response(response_text):
-    """Parse LLM response to extract question and evaluation"""
-    lines = response_text.split('\n')
-    question = ""
-    evaluation = ""
-    
-    for i, line in enumerate(lines):
-        if line.startswith("QUESTION:"):
-            question = line.replace("QUESTION:", "").strip()
-        elif line.startswith("EVALUATION:"):
-            evaluation = line.replace("EVALUATION:", "").strip()
-    
-    return question, evaluation
+def parse_args():
+    parser = argparse.ArgumentParser(description="AI-assisted technical interviewer (CLI)")
+    parser.add_argument(
+        "--template",
+        choices=get_template_registry().list_templates(),
+        default=DEFAULT_TEMPLATE,
+        help="Interview template file in templates/"
+    )
+    parser.add_argument(
+        "--history-strategy",
+        choices=HISTORY_STRATEGIES,
+        default=DEFAULT_HISTORY_STRATEGY,
+        help="How much conversation history is replayed to the interviewer each turn"
+    )
+    parser.add_argument(
+        "--history-budget",
+        type=int,
+        default=DEFAULT_HISTORY_BUDGET,
+        help="Token budget for replayed history (window and summary strategies)"
+    )
+    parser.add_argument(
+        "--turn-mode",
+        choices=TURN_MODES,
+        default=DEFAULT_TURN_MODE,
+        help="split: separate follow-up and scoring calls; combined: one structured call per turn"
+    )
+    parser.add_argument(
+        "--telemetry-jsonl",
+        help="Write per-turn spans and token counts to this JSONL file"
+    )
+    parser.add_argument(
+        "--metrics-file",
+        help="Write turn telemetry in Prometheus text format to this file"
+    )
+    parser.add_argument(
+        "--report-file",
+        help="Save the report: .json (indented), .ndjson[.gz|.zst] (appended to an archive) or .parquet"
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="SESSION_ID",
+        help="Continue an interrupted interview from the session log"
+    )
+    return parser.parse_args()
+
+
+def format_score(score):
+    return "unscored (evaluator failed)" if score is None else f"{score}/5"
+
+
+def format_prompt_stats(stats):
+    if not stats:
+        return ""
+    return (f" | prompt ~{stats['prompt_tokens']} tokens "
+            f"(history {stats['history_tokens_sent']} of {stats['history_tokens_full']})")
 
 
 def main():
-    template = load_template()
+    args = parse_args()
+    session_log = get_session_log()
+    recovered = None
+    if args.resume:
+        recovered = session_log.recover(args.resume) if session_log is not None else None
+        if recovered is None:
+            raise ValueError(f"No logged interview '{args.resume}' to resume (is SESSION_LOG_DIR set?)")
+        if recovered.complete:
+            raise ValueError(f"Interview '{args.resume}' is already complete")
+    template = load_template(recovered.meta.get("template", args.template) if recovered else args.template)
     
     # Get API keys from environment
-    groq_api_key = os.getenv("GROQ_API_KEY")
-    if not groq_api_key:
-        raise ValueError("GROQ_API_KEY environment variable is not set. Please add it to your .env file.")
+    groq_api_key = require_api_key("Groq")
     
-    chain = build_interview_chain("Groq", groq_api_key, "llama-3.1-8b-instant")
+    history_strategy = build_history_strategy(
+        args.history_strategy, args.history_budget, "Groq", groq_api_key, "llama-3.1-8b-instant"
+    )
+    chain = build_interview_chain("Groq", groq_api_key, "llama-3.1-8b-instant", history_strategy=history_strategy)
+    step_chain = None
+    if args.turn_mode == "combined":
+        step_chain = build_step_chain("Groq", groq_api_key, "llama-3.1-8b-instant", history_strategy=history_strategy)
     
-    # Collect candidate information
-    print("="*50)
-    print("Interview Setup")
-    print("="*50)
-    candidate_name = input("Enter candidate name: ").strip() or "Anonymous"
-    
-    session = InterviewSession(role=template["role"], candidate_name=candidate_name)
-
-    session_id = "demo-session"
     max_followups = 1  # Max follow-ups per question
 
-    print(f"\nStarting {session.role} interview for {candidate_name}\n")
+    if recovered:
+        session = recovered.session
+        session_id = args.resume
+        resume_history(session_id, recovered)
+        print(f"\nResuming {session.role} interview for {session.candidate_name} "
+              f"at question {recovered.question_idx + 1}/{template.total_questions}\n")
+    else:
+        # Collect candidate information
+        print("="*50)
+        print("Interview Setup")
+        print("="*50)
+        candidate_name = input("Enter candidate name: ").strip() or "Anonymous"
+
+        session = InterviewSession(role=template.role, candidate_name=candidate_name, template=template.name)
+        session_id = f"cli-{uuid.uuid4().hex}"
+        if session_log is not None:
+            session_log.start(session_id, role=template.role, candidate_name=candidate_name,
+                              template=template.name, start_time=session.start_time.isoformat(),
+                              provider="Groq", model="llama-3.1-8b-instant")
+            print(f"Session {session_id} (continue later with --resume {session_id})")
+
+        print(f"\nStarting {session.role} interview for {candidate_name}\n")
+
+    def log_event(event_type, **fields):
+        if session_log is not None:
+            session_log.append(session_id, event_type, **fields)
+
+    def take_turn(answer, asked_question, template_question):
+        """Get the follow-up question and the score for an answer"""
+        chain_input = {"input": answer, "role": template.role, "question": template_question,
+                       "routing": template.routing}
+        split_turn = lambda: run_turn(
+            chain, chain_input, session_id,
+            lambda: evaluate_answer(answer, groq_api_key, question=asked_question, routing=template.routing)
+        )
+        if step_chain is not None:
+            return run_step_turn(step_chain, chain_input, session_id, fallback=split_turn)
+        return split_turn()
 
-    for section_idx, section in enumerate(template["sections"]):
-        section_name = section.get("name", f"Section {section_idx + 1}")
-        print(f"\n--- {section_name} ---\n")
-        
-        for question in section["questions"]:
+    def answer_turn(asked_question, template_question):
+        """
+        Read an answer and take its turn. A turn that times out or runs out
+        of LLM budget keeps the answer: Enter resends it, any other input
+        replaces it.
+        """
+        answer = input("Candidate: ")
+        while True:
+            try:
+                return answer, take_turn(answer, asked_question, template_question)
+            except (TurnTimeoutError, BudgetExhaustedError, DeadlineExceededError) as e:
+                print(f"Error: {e}. Your answer was kept; press Enter to retry it or type a new one.")
+                answer = input("Candidate: ") or answer
+
+    start_idx = recovered.question_idx if recovered else 0
+    current_section = None
+    for question_idx in range(start_idx, template.total_questions):
+        question, section_name = template.question_at(question_idx)
+        if section_name != current_section:
+            current_section = section_name
+            print(f"\n--- {section_name} ---\n")
+
+        # A resumed interview first asks the follow-up it was waiting on
+        resumed_followup = recovered and question_idx == start_idx and recovered.pending_followup
+        if resumed_followup:
+            followup_question = recovered.pending_followup
+            followup_count = recovered.followup_count - 1
+        else:
             print("Interviewer:", question)
-            answer = input("Candidate: ")
-            
-            # Evaluate the initial answer
-            response = chain.invoke(
-                {"input": answer, "role": template["role"]},
-                config={"configurable": {"session_id": session_id}}
-            )
-            
-            response_text = response.content
-            followup_question, _ = parse_llm_response(response_text)
-            
-            # Evaluate candidate's answer using LLM
-            score = evaluate_answer(answer, groq_api_key)
-            print(f"✓ Evaluation Score: {score}/5\n")
-            session.add_turn(question, answer, score, dimension=section_name)
-            
-            # Ask follow-up questions
+            answer, turn = answer_turn(question, question)
+
+            followup_question = turn.question
+            score = turn.score
+            prompt_stats = format_prompt_stats(history_strategy.last_turn_stats(session_id))
+            print(f"✓ Evaluation Score: {format_score(score)} ({turn.format_timings()}{prompt_stats})\n")
+            session.add_turn(question, answer, score, dimension=section_name, telemetry=turn.telemetry)
+            log_event("turn", question=question, answer=answer, score=score, dimension=section_name,
+                      telemetry=turn.telemetry)
             followup_count = 0
-            while followup_question and followup_count < max_followups:
-                print(f"Interviewer: {followup_question}")
-                followup_answer = input("Candidate: ")
-                
-                # Get next response (question or follow-up evaluation)
-                response = chain.invoke(
-                    {"input": followup_answer, "role": template["role"]},
-                    config={"configurable": {"session_id": session_id}}
-                )
-                
-                response_text = response.content
-                next_question, _ = parse_llm_response(response_text)
-                
-                # Evaluate follow-up answer using LLM
-                followup_score = evaluate_answer(followup_answer, groq_api_key)
-                print(f"✓ Evaluation Score: {followup_score}/5\n")
-                session.add_turn(followup_question, followup_answer, followup_score, dimension=section_name)
-                
-                followup_question = next_question
-                followup_count += 1
-            
-            print()
+
+        # Ask follow-up questions
+        while followup_question and followup_count < max_followups:
+            if resumed_followup:
+                resumed_followup = None  # already in the log
+            else:
+                log_event("followup", question=followup_question)
+            print(f"Interviewer: {followup_question}")
+            followup_answer, turn = answer_turn(followup_question, question)
+
+            next_question = turn.question
+            followup_score = turn.score
+            prompt_stats = format_prompt_stats(history_strategy.last_turn_stats(session_id))
+            print(f"✓ Evaluation Score: {format_score(followup_score)} ({turn.format_timings()}{prompt_stats})\n")
+            session.add_turn(followup_question, followup_answer, followup_score, dimension=section_name,
+                             telemetry=turn.telemetry)
+            log_event("turn", question=followup_question, answer=followup_answer, score=followup_score,
+                      dimension=section_name, telemetry=turn.telemetry)
+
+            followup_question = next_question
+            followup_count += 1
+
+        log_event("advance", question_idx=question_idx + 1)
+        print()
+
+    log_event("complete")
+    index_scored_answers(session, EVALUATOR_MODEL, source=session_id)
 
     report = generate_report(session)
 
@@ -151,6 +264,15 @@ def main():
             print(f"     A: {quote['quote'][:80]}...")
             print(f"     Score: {quote['score']}/5 - {quote['significance']}")
     
+    # Near-Duplicate Answers
+    if report.get("similar_answers"):
+        print(f"\nNEAR-DUPLICATE ANSWERS")
+        print("-" * 70)
+        for i, similar in enumerate(report["similar_answers"], 1):
+            print(f"  {i}. Q: {similar['question'][:60]}...")
+            print(f"     {similar['similarity']:.0%} similar to an earlier answer scored {similar['matched_score']}/5"
+                  + (" (score reused)" if similar["score_reused"] else ""))
+    
     # Summary Statistics
     stats = report["summary_statistics"]
     print(f"\nSUMMARY STATISTICS")
@@ -158,8 +280,35 @@ def main():
     print(f"Highest Score: {stats['highest_score']}/5")
     print(f"Lowest Score: {stats['lowest_score']}/5")
     print(f"Total Q&A Turns: {report['total_turns']}")
+    if stats["unscored_turns"]:
+        print(f"Unscored Turns: {stats['unscored_turns']} (evaluator failed)")
     dist = stats['score_distribution']
     print(f"Score Distribution: 5★({dist[5]}) 4★({dist[4]}) 3★({dist[3]}) 2★({dist[2]}) 1★({dist[1]})")
+    # Performance
+    performance = report["performance"]
+    if performance:
+        print(f"\nPERFORMANCE")
+        print("-" * 70)
+        for span_name, span_stats in performance["spans_seconds"].items():
+            print(f"  {span_name}: p50 {span_stats['p50']:.3f}s | p95 {span_stats['p95']:.3f}s")
+        print(f"  Tokens per turn: {performance['tokens_per_turn']} "
+              f"({performance['llm_calls']} LLM calls, {performance['retries']} retries, "
+              f"{performance['rate_limit_retries']} rate-limit retries, {performance['failovers']} failovers, "
+              f"{performance['hedges']} hedged ({performance['hedge_wins']} won), {performance['errors']} errors)")
+        routing = performance.get("routing")
+        if routing:
+            reasons = ", ".join(f"{reason} {count}" for reason, count in routing["by_reason"].items())
+            print(f"  Model routing: {routing['fast']} fast / {routing['strong']} strong calls "
+                  f"({reasons}), {routing['re_evaluations']} re-evaluated | "
+                  f"${routing['cost_usd']:.4f} vs ${routing['baseline_usd']:.4f} on the strong model")
+    export_telemetry([report], jsonl_path=args.telemetry_jsonl, prometheus_path=args.metrics_file)
+    if args.report_file:
+        save_report(report, args.report_file)
+        print(f"Report saved to {args.report_file}")
+    
+    parse_stats = get_parse_stats()
+    print(f"Interviewer Replies Parsed: {parse_stats['responses']} "
+          f"({parse_stats['recovered']} recovered, {parse_stats['failures']} failed)")
     
     print("\n" + "="*70)
 
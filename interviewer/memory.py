@@ -0,0 +1,213 @@
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from langchain_core.messages import SystemMessage
+from langchain_core.prompts import PromptTemplate
+from .clients import get_chat_model
+from .tokens import estimate_tokens
+
+# Available history strategies:
+#   full    - replay the whole conversation every turn
+#   window  - keep only the most recent messages that fit the token budget
+#   summary - rolling summary of earlier questions + recent messages within budget
+HISTORY_STRATEGIES = ["full", "window", "summary"]
+DEFAULT_HISTORY_STRATEGY = "full"
+DEFAULT_HISTORY_BUDGET = 1500
+DEFAULT_MAX_PROMPT_TOKENS = 4000
+
+# Per-message framing overhead when the history list is rendered into the prompt
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Prompt token counts kept per session, most recent turns only
+MAX_TURN_STATS = 50
+
+SUMMARY_PROMPT = PromptTemplate(
+    template="""
+Summarize this technical interview so far in at most 120 words.
+Keep the topics covered, how well the candidate answered and any gaps worth probing.
+
+Previous summary:
+{summary}
+
+New conversation:
+{conversation}
+
+Summary:
+""",
+    input_variables=["summary", "conversation"]
+)
+
+# Summaries are produced off the critical path of a turn
+_summary_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="history-summary")
+
+
+def count_message_tokens(messages):
+    """Estimate the prompt tokens taken by a list of chat messages"""
+    return sum(estimate_tokens(str(message.content)) + MESSAGE_OVERHEAD_TOKENS for message in messages)
+
+
+class HistoryStrategy:
+    """
+    Shrinks the replayed conversation history before it reaches the prompt.
+
+    Used as the first step of the interview runnable; reads the session id
+    from the runnable config. Callers may pass the current template question
+    as `question` in the chain input so the strategy knows where the current
+    question's exchange begins, and the tokens taken by their prompt template
+    in the `prompt_overhead` argument (defaults to the one given at
+    construction).
+    """
+
+    def __init__(self, name=DEFAULT_HISTORY_STRATEGY, budget=DEFAULT_HISTORY_BUDGET,
+                 max_prompt_tokens=DEFAULT_MAX_PROMPT_TOKENS, summarizer=None, prompt_overhead=0):
+        if name not in HISTORY_STRATEGIES:
+            raise ValueError(f"Unknown history strategy '{name}'. Choose from {HISTORY_STRATEGIES}")
+        if name == "summary" and summarizer is None:
+            raise ValueError("The summary history strategy needs a summarizer LLM")
+        self.name = name
+        self.budget = budget
+        self.max_prompt_tokens = max_prompt_tokens
+        self.summarizer = summarizer
+        self.prompt_overhead = prompt_overhead
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, inputs, config, prompt_overhead=None):
+        session_id = (config.get("configurable") or {}).get("session_id", "default")
+        inputs = dict(inputs)
+        question = inputs.pop("question", None)
+        history = list(inputs.get("history") or [])
+        if prompt_overhead is None:
+            prompt_overhead = self.prompt_overhead
+        input_tokens = estimate_tokens(str(inputs.get("input", ""))) + prompt_overhead
+
+        with self._lock:
+            state = self._sessions.setdefault(session_id, {
+                "question": None,
+                "question_start": 0,
+                "summary": "",
+                "summarized_upto": 0,
+                "summarizing": False,
+                "turns": deque(maxlen=MAX_TURN_STATS)
+            })
+            if question is not None and question != state["question"]:
+                # A new template question starts after the messages seen so far
+                state["question"] = question
+                state["question_start"] = len(history)
+                if self.name == "summary":
+                    self._schedule_summary(state, history)
+            summary = state["summary"]
+            summarized_upto = state["summarized_upto"]
+            current = max(0, len(history) - state["question_start"])
+
+        if self.name == "full":
+            kept = history
+        elif self.name == "window":
+            kept = self._fit(history, self.budget)
+        else:
+            kept = self._fit(history[summarized_upto:], self.budget)
+
+        summary_message = None
+        if self.name == "summary" and summary:
+            summary_message = SystemMessage(content=f"Summary of earlier questions: {summary}")
+        kept = self._enforce_cap(kept, input_tokens, current, summary_message)
+        inputs["history"] = kept
+
+        with self._lock:
+            state["turns"].append({
+                "history_tokens_full": count_message_tokens(history),
+                "history_tokens_sent": count_message_tokens(kept),
+                "prompt_tokens": count_message_tokens(kept) + input_tokens
+            })
+        return inputs
+
+    async def acall(self, inputs, config, prompt_overhead=None):
+        # Summaries run in the background, so trimming is cheap enough to run
+        # on the event loop instead of in an executor thread
+        return self(inputs, config, prompt_overhead)
+
+    def _fit(self, messages, budget):
+        # Walk back from the newest message so the current exchange is kept verbatim
+        kept = []
+        used = 0
+        for message in reversed(messages):
+            tokens = count_message_tokens([message])
+            if used + tokens > budget:
+                break
+            kept.append(message)
+            used += tokens
+        kept.reverse()
+        return kept
+
+    def _enforce_cap(self, messages, input_tokens, current=0, summary_message=None):
+        # Hard cap on the whole prompt: drop the oldest messages before the
+        # current exchange first. The summary goes only when the last
+        # `current` messages (the current exchange) alone are over the cap,
+        # then the exchange is trimmed from its oldest message.
+        available = self.max_prompt_tokens - input_tokens
+        messages = list(messages)
+        pinned = [summary_message] if summary_message is not None else []
+        while len(messages) > current and count_message_tokens(pinned + messages) > available:
+            messages.pop(0)
+        if pinned and count_message_tokens(messages) > available:
+            pinned = []
+        while messages and count_message_tokens(pinned + messages) > available:
+            messages.pop(0)
+        if pinned and count_message_tokens(pinned) > available:
+            pinned = []
+        return pinned + messages
+
+    def _schedule_summary(self, state, history):
+        pending = history[state["summarized_upto"]:state["question_start"]]
+        if not pending or state["summarizing"]:
+            return
+        state["summarizing"] = True
+        upto = state["question_start"]
+        previous = state["summary"]
+        conversation = "\n".join(f"{message.type}: {message.content}" for message in pending)
+
+        def _summarize():
+            try:
+                response = (SUMMARY_PROMPT | self.summarizer).invoke({
+                    "summary": previous or "(none)",
+                    "conversation": conversation
+                })
+                with self._lock:
+                    state["summary"] = response.content.strip()
+                    state["summarized_upto"] = upto
+            except Exception as e:
+                print(f"Error summarizing history: {e}")
+            finally:
+                with self._lock:
+                    state["summarizing"] = False
+
+        _summary_executor.submit(_summarize)
+
+    def turn_stats(self, session_id):
+        """
+        Prompt token counts (full history vs. sent) of a session's last
+        MAX_TURN_STATS turns
+        """
+        with self._lock:
+            state = self._sessions.get(session_id)
+            return list(state["turns"]) if state else []
+
+    def last_turn_stats(self, session_id):
+        """Prompt token counts of the most recent turn, or None"""
+        with self._lock:
+            state = self._sessions.get(session_id)
+            return state["turns"][-1] if state and state["turns"] else None
+
+    def forget(self, session_id):
+        """Drop the summary and stats kept for a session"""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+
+def build_history_strategy(name, budget, llm_provider, api_key, model,
+                           max_prompt_tokens=DEFAULT_MAX_PROMPT_TOKENS):
+    """Create a history strategy; the summary strategy reuses the interview model"""
+    summarizer = None
+    if name == "summary":
+        summarizer = get_chat_model(llm_provider, model, api_key, temperature=0)
+    return HistoryStrategy(name, budget=budget, max_prompt_tokens=max_prompt_tokens, summarizer=summarizer)
@@ -0,0 +1,138 @@
+import re
+import threading
+
+# Field labels at the start of a line, tolerating markdown like "**QUESTION:**"
+QUESTION_LABEL = re.compile(r"^[ \t*#_>-]*question[ \t*_]*:[ \t*_]*", re.IGNORECASE | re.MULTILINE)
+EVALUATION_LABEL = re.compile(r"^[ \t*#_>-]*evaluation[ \t*_]*:[ \t*_]*", re.IGNORECASE | re.MULTILINE)
+BLANK_LINE = re.compile(r"\n[ \t]*\n")
+
+# Generation can stop once the question is out; callers never use the evaluation
+STOP_SEQUENCES = ["\nEVALUATION:"]
+
+_stats_lock = threading.Lock()
+_parse_stats = {"responses": 0, "recovered": 0, "failures": 0}
+
+
+def get_parse_stats():
+    """Counters for parsed responses, recovered malformed ones and failures"""
+    with _stats_lock:
+        return dict(_parse_stats)
+
+
+def _record(outcome):
+    with _stats_lock:
+        _parse_stats["responses"] += 1
+        if outcome:
+            _parse_stats[outcome] += 1
+
+
+def _could_be_evaluation_label(line):
+    # True while an unfinished last line may still turn into "EVALUATION:"
+    return "evaluation:".startswith(line.lstrip(" \t*#_>-").lower())
+
+
+class ResponseParser:
+    """
+    Incremental parser for "QUESTION: ... EVALUATION: ..." responses.
+
+    `feed()` takes raw chunks and returns question text that became visible.
+    The question may span several lines and ends at the EVALUATION label, at
+    a blank line, or at the end of the output; `question_complete` turns True
+    as soon as that boundary is seen so callers can stop generation early.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.question_start = None
+        self.question_end = None
+        self.emitted = None
+        self.closed = False
+        self.recovered_question = None
+
+    @property
+    def question_complete(self):
+        return self.question_end is not None
+
+    def feed(self, text):
+        """Consume a chunk and return newly visible question text"""
+        self.buffer += text
+        if self.question_start is None:
+            match = QUESTION_LABEL.search(self.buffer)
+            if not match or (match.end() == len(self.buffer) and not self.closed):
+                return ""
+            self.question_start = match.end()
+        if self.question_end is None:
+            self._find_question_end()
+        return self._release()
+
+    def _find_question_end(self):
+        evaluation = EVALUATION_LABEL.search(self.buffer, self.question_start)
+        blank = None
+        body = self.buffer[self.question_start:]
+        if body.strip():
+            first_text = self.question_start + len(body) - len(body.lstrip())
+            blank = BLANK_LINE.search(self.buffer, first_text)
+        ends = [m.start() for m in (evaluation, blank) if m]
+        if ends:
+            self.question_end = min(ends)
+        elif self.closed:
+            self.question_end = len(self.buffer)
+
+    def _release(self):
+        end = self.question_end
+        if end is None:
+            end = len(self.buffer)
+            last_newline = self.buffer.rfind("\n", self.question_start)
+            if last_newline != -1 and _could_be_evaluation_label(self.buffer[last_newline + 1:]):
+                end = last_newline
+        # Trailing whitespace is only released once more text follows it
+        body = self.buffer[self.question_start:end].rstrip()
+        if self.emitted is None:
+            if not body.strip():
+                return ""
+            self.emitted = len(body) - len(body.lstrip())
+        chunk = body[self.emitted:]
+        self.emitted = max(self.emitted, len(body))
+        return chunk
+
+    def finish(self):
+        """
+        Mark the end of the output and return any question text held back.
+        Output without a QUESTION label falls back to its first line that
+        contains a '?'.
+        """
+        self.closed = True
+        chunk = self.feed("")
+        if self.question_start is None and self.recovered_question is None:
+            evaluation_match = EVALUATION_LABEL.search(self.buffer)
+            text = self.buffer[:evaluation_match.start()] if evaluation_match else self.buffer
+            self.recovered_question = ""
+            for line in text.splitlines():
+                if "?" in line:
+                    self.recovered_question = line.strip(" \t*#_>-")
+                    break
+            return self.recovered_question
+        return chunk
+
+    def close(self):
+        """Finish parsing and return (question, evaluation)"""
+        if not self.closed:
+            self.finish()
+
+        evaluation_match = EVALUATION_LABEL.search(self.buffer)
+        evaluation = self.buffer[evaluation_match.end():].strip() if evaluation_match else ""
+
+        if self.question_start is not None:
+            question = self.buffer[self.question_start:self.question_end].strip()
+            _record(None if question else "failures")
+        else:
+            question = self.recovered_question
+            _record("recovered" if question else "failures")
+        return question, evaluation
+
+
+def parse_llm_response(response_text):
+    """Parse LLM response to extract question and evaluation"""
+    parser = ResponseParser()
+    parser.feed(response_text)
+    return parser.close()
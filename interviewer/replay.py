@@ -0,0 +1,259 @@
+"""
+Headless replay of scripted interviews.
+
+Reads a JSONL file with one candidate per line:
+
+    {"candidate_name": "Ada", "answers": ["...", "..."], "template": "AI_engineer.yaml"}
+
+`answers` are given in order to every question the interviewer asks
+(template questions and follow-ups); the interview ends when they run out.
+`template` and `max_followups` are optional per candidate.
+
+Usage (from the project root):
+    python -m interviewer.replay candidates.jsonl --concurrency 16 --output-dir replay_reports
+    python -m interviewer.replay candidates.jsonl --archive replay_reports/reports.ndjson.zst
+"""
+import argparse
+import asyncio
+import json
+import re
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from dotenv import load_dotenv
+from .interview_chain import build_interview_chain
+from .clients import API_KEY_VARS, LOCAL_PROVIDER, require_api_key
+from .evaluator import evaluate_answer, evaluator_for
+from .hedging import get_hedger
+from .sessions import InterviewSession
+from .report import generate_report
+from .export import open_archive_writer
+from .telemetry import export_telemetry, percentile
+from .turns import DEFAULT_TURN_TIMEOUT, run_turn, run_step_turn, set_turn_workers
+from .interview_step import TURN_MODES, DEFAULT_TURN_MODE, build_step_chain
+from .session_store import get_session_store
+from .templates import DEFAULT_TEMPLATE, get_template_registry
+from .memory import HISTORY_STRATEGIES, DEFAULT_HISTORY_STRATEGY, DEFAULT_HISTORY_BUDGET, build_history_strategy
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_MAX_FOLLOWUPS = 1
+DEFAULT_OUTPUT_DIR = "replay_reports"
+
+
+def load_candidates(path):
+    """Read and validate the candidates JSONL file"""
+    candidates = []
+    with open(path, "r") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                candidate = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_no}: invalid JSON ({e})")
+            answers = candidate.get("answers") if isinstance(candidate, dict) else None
+            if not isinstance(answers, list) or not all(isinstance(a, str) for a in answers):
+                raise ValueError(f"{path}:{line_no}: 'answers' must be a list of strings")
+            candidates.append(candidate)
+    return candidates
+
+
+def _file_name(index, candidate_name):
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", candidate_name).strip("_") or "candidate"
+    return f"{index:04d}_{slug}.json"
+
+
+class ReplayRunner:
+    """
+    Runs scripted interviews against shared chains. Every interview gets its
+    own session id, so histories never mix, and is cleared from the session
+    store when it ends.
+    """
+
+    def __init__(self, llm_provider, api_key, model, evaluator_api_key,
+                 history_strategy=DEFAULT_HISTORY_STRATEGY, history_budget=DEFAULT_HISTORY_BUDGET,
+                 turn_mode=DEFAULT_TURN_MODE, max_followups=DEFAULT_MAX_FOLLOWUPS,
+                 template=DEFAULT_TEMPLATE, timeout=DEFAULT_TURN_TIMEOUT):
+        self.evaluator_api_key = evaluator_api_key
+        self.evaluator_provider, self.evaluator_model = evaluator_for(llm_provider, model)
+        self.max_followups = max_followups
+        self.template = template
+        self.timeout = timeout
+        self.store = get_session_store()
+        self.history_strategy = build_history_strategy(history_strategy, history_budget, llm_provider, api_key, model)
+        self.chain = build_interview_chain(llm_provider, api_key, model, history_strategy=self.history_strategy)
+        self.step_chain = None
+        if turn_mode == "combined":
+            self.step_chain = build_step_chain(llm_provider, api_key, model, history_strategy=self.history_strategy)
+
+    def take_turn(self, session_id, template, answer, asked_question, template_question):
+        """Follow-up question and score for one scripted answer"""
+        chain_input = {"input": answer, "role": template.role, "question": template_question,
+                       "routing": template.routing}
+        split_turn = lambda: run_turn(
+            self.chain, chain_input, session_id,
+            lambda: evaluate_answer(answer, self.evaluator_api_key, question=asked_question,
+                                    provider=self.evaluator_provider, model=self.evaluator_model,
+                                    routing=template.routing),
+            timeout=self.timeout
+        )
+        if self.step_chain is not None:
+            return run_step_turn(self.step_chain, chain_input, session_id, timeout=self.timeout, fallback=split_turn)
+        return split_turn()
+
+    def run_interview(self, candidate):
+        """Run one scripted interview; returns (report, per-turn timings)"""
+        template = get_template_registry().get(candidate.get("template", self.template))
+        max_followups = candidate.get("max_followups", self.max_followups)
+        session = InterviewSession(role=template.role, candidate_name=candidate.get("candidate_name"),
+                                   template=template.name)
+        session_id = f"replay-{uuid.uuid4().hex}"
+        answers = iter(candidate["answers"])
+        timings = []
+
+        try:
+            for section_idx, section in enumerate(template.sections):
+                for question in template.section_questions(section_idx):
+                    asked_question = question
+                    followup_count = 0
+                    while asked_question:
+                        answer = next(answers, None)
+                        if answer is None:
+                            return generate_report(session), timings
+                        turn = self.take_turn(session_id, template, answer, asked_question, question)
+                        timings.append(turn.timings)
+                        session.add_turn(asked_question, answer, turn.score, dimension=section["name"],
+                                         telemetry=turn.telemetry)
+                        if followup_count >= max_followups:
+                            break
+                        asked_question = turn.question
+                        followup_count += 1
+            return generate_report(session), timings
+        finally:
+            self.store.clear(session_id)
+
+    async def run_all(self, candidates, concurrency=DEFAULT_CONCURRENCY, output_dir=DEFAULT_OUTPUT_DIR,
+                      archive_path=None):
+        """
+        Replay all candidates with at most `concurrency` interviews in flight.
+        Writes one report per candidate, summary.json and the turn telemetry
+        (telemetry.jsonl, metrics.prom) to `output_dir`; returns the summary.
+        With `archive_path` the reports are streamed into that archive (see
+        interviewer/export.py) instead of one JSON file each.
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        # Each split turn occupies two turn workers (follow-up and scoring)
+        set_turn_workers(max(8, concurrency * 2))
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="replay")
+        )
+        semaphore = asyncio.Semaphore(concurrency)
+        turn_seconds = []
+        reports = []
+        errors = []
+        completed = 0
+
+        async def replay(index, candidate):
+            nonlocal completed
+            name = candidate.get("candidate_name") or "Anonymous"
+            async with semaphore:
+                try:
+                    report, timings = await asyncio.to_thread(self.run_interview, candidate)
+                except Exception as e:
+                    print(f"Interview {index} ({name}) failed: {e}")
+                    errors.append({"index": index, "candidate_name": name, "error": str(e)})
+                    return
+            report["turn_timings"] = timings
+            if archive is not None:
+                archive.write(report)
+            else:
+                with open(output_dir / _file_name(index, name), "w") as f:
+                    json.dump(report, f, indent=2, default=str)
+            turn_seconds.extend(t["total_seconds"] for t in timings)
+            reports.append(report)
+            completed += 1
+
+        archive = open_archive_writer(archive_path) if archive_path else None
+        start = time.perf_counter()
+        try:
+            await asyncio.gather(*(replay(i, c) for i, c in enumerate(candidates, 1)))
+        finally:
+            if archive is not None:
+                archive.close()
+        wall_seconds = time.perf_counter() - start
+
+        summary = {
+            "interviews": len(candidates),
+            "completed": completed,
+            "failed": len(errors),
+            "turns": len(turn_seconds),
+            "concurrency": concurrency,
+            "wall_seconds": round(wall_seconds, 3),
+            "interviews_per_minute": round(completed / wall_seconds * 60, 2) if wall_seconds else 0,
+            "turn_latency_seconds": {
+                "p50": percentile(turn_seconds, 50),
+                "p95": percentile(turn_seconds, 95),
+                "p99": percentile(turn_seconds, 99),
+                "max": max(turn_seconds) if turn_seconds else None
+            },
+            "llm_calls": get_hedger().stats(),
+            "errors": errors
+        }
+        with open(output_dir / "summary.json", "w") as f:
+            json.dump(summary, f, indent=2)
+        export_telemetry(reports, jsonl_path=output_dir / "telemetry.jsonl",
+                         prometheus_path=output_dir / "metrics.prom")
+        return summary
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("candidates", help="JSONL file with one scripted candidate per line")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument("--archive", help="Stream reports into this .ndjson[.gz|.zst] or .parquet archive")
+    parser.add_argument("--provider", choices=list(API_KEY_VARS) + [LOCAL_PROVIDER], default="Groq")
+    parser.add_argument("--model", default="llama-3.1-8b-instant", help="Model name (fake or replay for Local)")
+    parser.add_argument("--template", default=DEFAULT_TEMPLATE)
+    parser.add_argument("--max-followups", type=int, default=DEFAULT_MAX_FOLLOWUPS)
+    parser.add_argument("--history-strategy", choices=HISTORY_STRATEGIES, default=DEFAULT_HISTORY_STRATEGY)
+    parser.add_argument("--history-budget", type=int, default=DEFAULT_HISTORY_BUDGET)
+    parser.add_argument("--turn-mode", choices=TURN_MODES, default=DEFAULT_TURN_MODE)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TURN_TIMEOUT, help="Seconds allowed per turn")
+    return parser.parse_args()
+
+
+def main():
+    load_dotenv()
+    args = parse_args()
+
+    evaluator_provider, _ = evaluator_for(args.provider, args.model)
+    api_keys = {provider: require_api_key(provider) for provider in {args.provider, evaluator_provider}}
+
+    candidates = load_candidates(args.candidates)
+    runner = ReplayRunner(
+        args.provider, api_keys[args.provider], args.model, api_keys[evaluator_provider],
+        history_strategy=args.history_strategy, history_budget=args.history_budget,
+        turn_mode=args.turn_mode, max_followups=args.max_followups,
+        template=args.template, timeout=args.timeout
+    )
+    summary = asyncio.run(runner.run_all(candidates, args.concurrency, args.output_dir, args.archive))
+
+    latency = summary["turn_latency_seconds"]
+    print(f"Interviews: {summary['completed']}/{summary['interviews']} completed "
+          f"({summary['failed']} failed) in {summary['wall_seconds']:.1f}s "
+          f"-> {summary['interviews_per_minute']} interviews/min")
+    if summary["turns"]:
+        print(f"Turn latency over {summary['turns']} turns: p50 {latency['p50']:.2f}s | "
+              f"p95 {latency['p95']:.2f}s | p99 {latency['p99']:.2f}s")
+    llm_calls = summary["llm_calls"]
+    print(f"LLM calls: {llm_calls['calls']} | hedged {llm_calls['hedge_rate']:.1%} "
+          f"({llm_calls['hedge_wins']} won, ~{llm_calls['latency_saved_seconds']:.1f}s saved) | "
+          f"{llm_calls['deadline_exceeded']} deadline misses")
+    print(f"Reports written to {args.archive or args.output_dir + '/'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,56 +1,38 @@
+from bisect import bisect_right
 from datetime import datetime
 
+# Average-score thresholds between recommendations, lowest first
+RECOMMENDATION_THRESHOLDS = (2, 3, 4)
+RECOMMENDATIONS = ("Strong No Hire", "No Hire", "Hire", "Strong Hire")
 
-def generate_report(session):
+
+def generate_report(session, include_transcript=True):
     """
-    Generate a comprehensive interview report with all required sections
+    Generate a comprehensive interview report with all required sections.
+    Built from the session's running aggregates, so it is cheap enough to
+    call on every rerun for a live scoreboard; pass include_transcript=False
+    there to skip materializing the transcript.
     """
-    avg_score = sum(session.evaluations) / len(session.evaluations) if session.evaluations else 0
+    avg_score = session.average_score
     
     # Determine recommendation
-    if avg_score >= 4:
-        recommendation = "Strong Hire"
-    elif avg_score >= 3:
-        recommendation = "Hire"
-    elif avg_score >= 2:
-        recommendation = "No Hire"
-    else:
-        recommendation = "Strong No Hire"
-    
-    # Extract key strengths (answers with score >= 4)
-    key_strengths = []
-    areas_of_concern = []
-    
-    for item in session.transcript:
-        if item.get("score", 0) >= 4:
-            key_strengths.append({
-                "question": item["question"],
-                "answer": item["answer"],
-                "score": item["score"]
-            })
-        elif item.get("score", 0) <= 2:
-            areas_of_concern.append({
-                "question": item["question"],
-                "answer": item["answer"],
-                "score": item["score"]
-            })
+    recommendation = get_recommendation(avg_score)
     
     # Calculate dimension scores with justification
     dimension_summaries = {}
-    if session.dimension_scores:
-        for dimension, scores in session.dimension_scores.items():
-            avg_dim_score = sum(scores) / len(scores)
-            dimension_summaries[dimension] = {
-                "average_score": round(avg_dim_score, 2),
-                "count": len(scores),
-                "justification": f"Based on {len(scores)} question(s) in this dimension"
-            }
+    for dimension, stats in session.dimension_stats.items():
+        dimension_summaries[dimension] = {
+            "average_score": round(stats["sum"] / stats["count"], 2),
+            "count": stats["count"],
+            "justification": f"Based on {stats['count']} question(s) in this dimension"
+        }
     
     # Build comprehensive report
     report = {
         "candidate_summary": {
             "name": session.candidate_name,
             "position": session.role,
+            "template": session.template,
             "date": datetime.now().strftime("%Y-%m-%d"),
             "time": datetime.now().strftime("%H:%M:%S"),
             "duration_minutes": session.get_duration()
@@ -64,7 +46,7 @@ def generate_report(session):
                 "evidence": strength["answer"][:150] + "...",
                 "score": strength["score"]
             }
-            for strength in key_strengths[:3]  # Top 3 strengths
+            for strength in session.top_strengths()  # Top 3 strengths
         ],
         "areas_of_concern": [
             {
@@ -72,7 +54,7 @@ def generate_report(session):
                 "evidence": concern["answer"][:150] + "...",
                 "score": concern["score"]
             }
-            for concern in areas_of_concern[:3]  # Top 3 concerns
+            for concern in session.top_concerns()  # Top 3 concerns
         ],
         "notable_quotes": [
             {
@@ -81,20 +63,37 @@ def generate_report(session):
                 "score": quote["score"],
                 "significance": "Strong response" if quote["score"] >= 4 else "Needs improvement"
             }
-            for quote in session.notable_quotes[:5]  # Top 5 notable quotes
+            for quote in (session.turn_at(i) for i in session.notable_quotes)  # First 5 notable quotes
+        ],
+        "similar_answers": [
+            {
+                "question": turn["question"],
+                "excerpt": turn["answer"][:150] + "...",
+                "similarity": turn["telemetry"]["near_duplicate"]["similarity"],
+                "matched_score": turn["telemetry"]["near_duplicate"]["matched_score"],
+                "score_reused": turn["telemetry"]["near_duplicate"]["reused"]
+            }
+            for turn in (session.turn_at(i) for i in session.similar_answers)  # Near-copies of earlier answers
         ],
-        "transcript": session.transcript,
-        "total_turns": len(session.transcript),
+        "transcript": session.transcript if include_transcript else [],
+        "total_turns": len(session),
         "summary_statistics": {
-            "highest_score": max(session.evaluations) if session.evaluations else 0,
-            "lowest_score": min(session.evaluations) if session.evaluations else 0,
-            "score_distribution": get_score_distribution(session.evaluations)
-        }
+            "highest_score": session.highest_score or 0,
+            "lowest_score": session.lowest_score or 0,
+            "score_distribution": dict(session.score_distribution),
+            "unscored_turns": session.unscored_turns
+        },
+        "performance": session.telemetry.summary()
     }
     
     return report
 
 
+def get_recommendation(avg_score):
+    """Hiring recommendation for an average score"""
+    return RECOMMENDATIONS[bisect_right(RECOMMENDATION_THRESHOLDS, avg_score)]
+
+
 def get_score_distribution(evaluations):
     """
     Calculate distribution of scores
@@ -0,0 +1,273 @@
+"""
+Adaptive model routing by answer complexity.
+
+Before each LLM call the candidate's answer is sized up: its token count,
+whether it contains code, and its technical density (share of words that
+look like identifiers, numbers, acronyms or jargon). Easy answers go to
+the provider's fast model; long, code-heavy or dense ones go to the
+strong model. A fast evaluator score in the borderline band (or one that
+could not be parsed) is re-evaluated with the strong model.
+
+Follow-ups route between the fast model and the model chosen for the
+interview, which is never exceeded. Scoring routes between the fast and
+strong model of the evaluator's provider.
+
+Routing is off unless a template opts in with a `routing` mapping:
+
+    routing:
+      enabled: true             # required; every other key is optional
+      short_tokens: 40          # at most this long and no code: fast model
+      escalate_tokens: 250      # at least this long: strong model
+      escalate_density: 0.25    # technical share of a longer answer for the strong model
+      escalate_code: true
+      borderline_scores: [3]    # fast scores re-evaluated with the strong model
+      route_followups: true
+      models:                   # (fast, strong) per provider
+        Groq: [llama-3.1-8b-instant, llama-3.3-70b-versatile]
+
+Every routed call is recorded in the turn's telemetry with its latency,
+tokens and cost against always using the strong model.
+"""
+import json
+import os
+import re
+import threading
+from .clients import LOCAL_PROVIDER, get_chat_model
+from .telemetry import SCORING_TAG, record_route
+from .tokens import estimate_tokens
+
+FOLLOWUP = "followup"
+
+# (fast, strong) model per provider
+MODEL_TIERS = {
+    "Groq": ("llama-3.1-8b-instant", "llama-3.3-70b-versatile"),
+    "OpenAI": ("gpt-4o-mini", "gpt-4o"),
+    LOCAL_PROVIDER: ("fake", "fake-large")
+}
+
+# USD per million (input, output) tokens. Override or extend with the
+# MODEL_PRICES env var (JSON with the same shape). The local fakes are
+# priced as the Groq models they stand in for.
+DEFAULT_MODEL_PRICES = {
+    "llama-3.1-8b-instant": (0.05, 0.08),
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+    "Gemma2-9b-It": (0.20, 0.20),
+    "mixtral-8x7b-32768": (0.24, 0.24),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4": (30.00, 60.00),
+    "gpt-3.5-turbo": (0.50, 1.50),
+    "fake": (0.05, 0.08),
+    "fake-large": (0.59, 0.79)
+}
+
+DEFAULT_SHORT_TOKENS = 40
+DEFAULT_ESCALATE_TOKENS = 250
+DEFAULT_ESCALATE_DENSITY = 0.25
+DEFAULT_BORDERLINE_SCORES = (3,)
+
+# Fenced or inline code, or lines that read like code
+CODE_MARKERS = re.compile(r"```|`[^`\n]+`")
+CODE_LINE = re.compile(
+    r"^\s*(?:def |class |import |from \S+ import |return\b|SELECT\b|#include|function\b|const |let |var )"
+    r"|[;{}]\s*$|=>|\b\w+\([^()\n]*\)\s*[:;]?\s*$",
+    re.MULTILINE
+)
+# Identifiers (snake_case, camelCase, dotted, calls), numbers and acronyms
+TECHNICAL_WORD = re.compile(r"^(?:[A-Z]{2,}s?|\w*\d\w*|\w+_\w+|[a-z]+[A-Z]\w*|\w+\.\w+|\w+\(\))$")
+TECHNICAL_TERMS = frozenset("""
+    algorithm api architecture async backpropagation backend batch benchmark bias cache classifier
+    cluster clustering compiler concurrency container convolution database deployment distributed
+    embedding embeddings encoder decoder endpoint gradient hash heap histogram hyperparameter index
+    inference kernel latency logits loss matrix microservice microservices mutex normalization
+    optimizer overfitting partition pipeline precision protocol quantization queue recall
+    regression regularization replica schema serialization shard sharding softmax tensor thread
+    throughput token tokenizer tokens transformer variance vector
+""".split())
+_STRIP = ",.;:!?\"'()[]"
+
+
+def assess_answer(answer):
+    """Routing signals of an answer: tokens, code and technical density"""
+    words = [word.strip(_STRIP) for word in answer.split()]
+    words = [word for word in words if word]
+    technical = sum(1 for word in words if TECHNICAL_WORD.match(word) or word.lower() in TECHNICAL_TERMS)
+    return {
+        "tokens": estimate_tokens(answer),
+        "code": bool(CODE_MARKERS.search(answer)) or len(CODE_LINE.findall(answer)) >= 2,
+        "technical_density": round(technical / len(words), 3) if words else 0.0
+    }
+
+
+def model_prices():
+    prices = dict(DEFAULT_MODEL_PRICES)
+    override = os.getenv("MODEL_PRICES")
+    if override:
+        try:
+            prices.update({model: tuple(price) for model, price in json.loads(override).items()})
+        except (ValueError, TypeError) as e:
+            print(f"Ignoring invalid MODEL_PRICES: {e}")
+    return prices
+
+
+def routing_enabled():
+    """MODEL_ROUTING=0 turns routing off for every template"""
+    return os.getenv("MODEL_ROUTING", "1") != "0"
+
+
+_stats_lock = threading.Lock()
+_stats = {"fast": 0, "strong": 0, "re_evaluated": 0}
+
+
+def get_routing_stats():
+    """Routed calls of this process by tier, and borderline re-evaluations"""
+    with _stats_lock:
+        return dict(_stats)
+
+
+class RoutingPolicy:
+    """Per-template routing thresholds and model tiers"""
+
+    def __init__(self, enabled=False, short_tokens=DEFAULT_SHORT_TOKENS, escalate_tokens=DEFAULT_ESCALATE_TOKENS,
+                 escalate_density=DEFAULT_ESCALATE_DENSITY, escalate_code=True,
+                 borderline_scores=DEFAULT_BORDERLINE_SCORES, route_followups=True, models=None):
+        self.enabled = enabled
+        self.short_tokens = short_tokens
+        self.escalate_tokens = escalate_tokens
+        self.escalate_density = escalate_density
+        self.escalate_code = escalate_code
+        self.borderline_scores = frozenset(borderline_scores)
+        self.route_followups = route_followups
+        self.models = dict(MODEL_TIERS, **(models or {}))
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Policy from a template's `routing` mapping. Routing stays off
+        without one or unless it sets `enabled: true`.
+        """
+        if config is None:
+            return cls()
+        if not isinstance(config, dict):
+            raise ValueError("'routing' must be a mapping")
+        unknown = set(config) - {"enabled", "short_tokens", "escalate_tokens", "escalate_density", "escalate_code",
+                                 "borderline_scores", "route_followups", "models"}
+        if unknown:
+            raise ValueError(f"unknown routing setting(s): {', '.join(sorted(unknown))}")
+        for key in ("short_tokens", "escalate_tokens"):
+            if not isinstance(config.get(key, 0), int) or config.get(key, 0) < 0:
+                raise ValueError(f"routing '{key}' must be a non-negative integer")
+        density = config.get("escalate_density", DEFAULT_ESCALATE_DENSITY)
+        if not isinstance(density, (int, float)) or not 0 <= density <= 1:
+            raise ValueError("routing 'escalate_density' must be between 0 and 1")
+        borderline = config.get("borderline_scores", list(DEFAULT_BORDERLINE_SCORES))
+        if not isinstance(borderline, list) or not all(isinstance(s, int) and 1 <= s <= 5 for s in borderline):
+            raise ValueError("routing 'borderline_scores' must be a list of scores 1-5")
+        models = config.get("models") or {}
+        if not isinstance(models, dict) or not all(
+            isinstance(tiers, list) and len(tiers) == 2 and all(isinstance(m, str) for m in tiers)
+            for tiers in models.values()
+        ):
+            raise ValueError("routing 'models' must map providers to [fast, strong] model names")
+        return cls(
+            enabled=bool(config.get("enabled", False)),
+            short_tokens=config.get("short_tokens", DEFAULT_SHORT_TOKENS),
+            escalate_tokens=config.get("escalate_tokens", DEFAULT_ESCALATE_TOKENS),
+            escalate_density=float(density),
+            escalate_code=bool(config.get("escalate_code", True)),
+            borderline_scores=borderline,
+            route_followups=bool(config.get("route_followups", True)),
+            models={provider: tuple(tiers) for provider, tiers in models.items()}
+        )
+
+    def tiers(self, component, provider, model):
+        """(fast, strong) for a call, or None when it is not routed"""
+        if not self.enabled or not routing_enabled() or provider not in self.models:
+            return None
+        fast, strong = self.models[provider]
+        if component == FOLLOWUP:
+            if not self.route_followups:
+                return None
+            # The interview's model is the ceiling; recorded replies are never swapped
+            if provider == LOCAL_PROVIDER and model not in self.models[provider]:
+                return None
+            strong = model
+        elif model not in (fast, strong):
+            return None
+        return None if fast == strong else (fast, strong)
+
+    def classify(self, signals):
+        """(tier, reason) for an answer's signals"""
+        if signals["code"] and self.escalate_code:
+            return "strong", "code"
+        if signals["tokens"] >= self.escalate_tokens:
+            return "strong", "long"
+        if signals["tokens"] <= self.short_tokens:
+            return "fast", "short"
+        if signals["technical_density"] >= self.escalate_density:
+            return "strong", "technical"
+        return "fast", "standard"
+
+    def route(self, component, answer, provider, model):
+        """
+        Model for one call about `answer` (`model` is the interview's model for
+        follow-ups, the default evaluator for scoring). The decision is
+        recorded in the current turn's telemetry.
+        """
+        tiers = self.tiers(component, provider, model)
+        if tiers is None:
+            return model
+        signals = assess_answer(answer)
+        tier, reason = self.classify(signals)
+        routed = tiers[0] if tier == "fast" else tiers[1]
+        self._record(component, routed, tier, reason, tiers[1], signals)
+        return routed
+
+    def review_model(self, answer, provider, model, routed_model, score):
+        """Strong model to re-evaluate a borderline or unparsed fast score with, or None"""
+        tiers = self.tiers(SCORING_TAG, provider, model)
+        if tiers is None or routed_model != tiers[0]:
+            return None
+        if score is not None and score not in self.borderline_scores:
+            return None
+        self._record(SCORING_TAG, tiers[1], "strong", "borderline" if score is not None else "unparsed",
+                     tiers[1], assess_answer(answer), re_evaluation=True)
+        return tiers[1]
+
+    def _record(self, component, model, tier, reason, baseline_model, signals, re_evaluation=False):
+        with _stats_lock:
+            _stats["re_evaluated" if re_evaluation else tier] += 1
+        prices = model_prices()
+        # A re-evaluation is extra: always using the strong model would not have made it
+        baseline = (0, 0) if re_evaluation else prices.get(baseline_model, (0, 0))
+        record_route(dict(signals, component=component, model=model, tier=tier, reason=reason,
+                          re_evaluation=re_evaluation),
+                     prices.get(model, (0, 0)), baseline)
+
+
+def routed_model_step(prompt_step, llm_provider, api_key, model, stop=None):
+    """
+    `prompt_step | llm` that picks the llm per call from the chain input's
+    "routing" policy and answer (the interview's model when there is none)
+    """
+    # Imported here with the rest of the runnables stack (see interview_chain.py)
+    from langchain_core.runnables import RunnableLambda
+
+    steps = {}
+
+    def select(inputs):
+        routing = inputs.get("routing")
+        routed = routing.route(FOLLOWUP, inputs["input"], llm_provider, model) if routing else model
+        if routed not in steps:
+            steps[routed] = prompt_step | bind_model(llm_provider, api_key, routed, stop)
+        return steps[routed]
+
+    async def aselect(inputs):
+        return select(inputs)
+
+    return RunnableLambda(select, afunc=aselect)
+
+
+def bind_model(llm_provider, api_key, model, stop=None):
+    llm = get_chat_model(llm_provider, model, api_key, temperature=0.3)
+    return llm.bind(stop=stop) if stop else llm
@@ -0,0 +1,544 @@
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from .hedging import DeadlineExceededError, get_hedger, hedge_target, remaining
+from .telemetry import record_call, record_error
+from .tokens import estimate_tokens
+
+# Default limits per provider, and optionally per "provider/model". Override
+# or extend with the LLM_RATE_LIMITS env var (JSON with the same shape).
+DEFAULT_RATE_LIMITS = {
+    "Groq": {"requests_per_minute": 30, "tokens_per_minute": 15000},
+    "OpenAI": {"requests_per_minute": 500, "tokens_per_minute": 200000}
+}
+
+# Output tokens reserved per call when charging the token bucket
+OUTPUT_TOKEN_ESTIMATE = 256
+
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_MAX_QUEUE_SECONDS = 5.0
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 8.0
+
+# Where to go when a model's budget is exhausted: a smaller model of the same
+# provider first, then the other provider's default model
+SMALLER_MODELS = {
+    "llama-3.3-70b-versatile": "llama-3.1-8b-instant",
+    "mixtral-8x7b-32768": "llama-3.1-8b-instant",
+    "Gemma2-9b-It": "llama-3.1-8b-instant",
+    "gpt-4o": "gpt-4o-mini",
+    "gpt-4": "gpt-4o-mini",
+    "gpt-3.5-turbo": "gpt-4o-mini"
+}
+FAILOVER_PROVIDERS = {
+    "Groq": ("OpenAI", "gpt-4o-mini"),
+    "OpenAI": ("Groq", "llama-3.1-8b-instant")
+}
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+RETRYABLE_ERRORS = {"APIConnectionError", "APITimeoutError", "ConnectError", "ConnectTimeout",
+                    "ReadTimeout", "RemoteProtocolError"}
+
+
+class BudgetExhaustedError(RuntimeError):
+    """Raised when a call cannot be made within the rate limits and retry budget"""
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `per_minute` units"""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._cond = threading.Condition()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount, max_wait):
+        """Take `amount` units, waiting at most `max_wait` seconds; returns the wait"""
+        amount = min(amount, self.capacity)
+        start = time.monotonic()
+        with self._cond:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return time.monotonic() - start
+                needed = (amount - self.tokens) / self.rate
+                waited = time.monotonic() - start
+                if waited + needed > max_wait:
+                    raise BudgetExhaustedError(f"rate limit: would wait {waited + needed:.1f}s")
+                self._cond.wait(needed)
+
+    def try_acquire(self, amount):
+        """Take `amount` units if they are there now (returns 0), else return the seconds until they are"""
+        amount = min(amount, self.capacity)
+        with self._cond:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return 0.0
+            return (amount - self.tokens) / self.rate
+
+    def refund(self, amount):
+        with self._cond:
+            self.tokens = min(self.capacity, self.tokens + amount)
+            self._cond.notify_all()
+
+
+def _status_code(error):
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+def _retry_after(error):
+    # Seconds requested by the server, if any
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+def is_retryable(error):
+    if _status_code(error) in RETRYABLE_STATUS:
+        return True
+    return any(cls.__name__ in RETRYABLE_ERRORS for cls in type(error).__mro__)
+
+
+class RequestScheduler:
+    """
+    Shared gate for every LLM call in the process. Calls take a request and
+    an estimated token count from the per-provider and per-model buckets,
+    and rate-limit / transient errors are retried with jittered exponential
+    backoff that honours Retry-After.
+    """
+
+    def __init__(self, limits=None, max_retries=DEFAULT_MAX_RETRIES, max_queue_seconds=DEFAULT_MAX_QUEUE_SECONDS):
+        self.limits = dict(DEFAULT_RATE_LIMITS if limits is None else limits)
+        self.max_retries = max_retries
+        self.max_queue_seconds = max_queue_seconds
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "queue_seconds": 0.0, "retries": 0, "failovers": 0, "exhausted": 0}
+
+    def _buckets_for(self, provider, model):
+        buckets = []
+        with self._lock:
+            for scope in (provider, f"{provider}/{model}"):
+                limits = self.limits.get(scope) or {}
+                for kind in ("requests_per_minute", "tokens_per_minute"):
+                    if limits.get(kind):
+                        key = (scope, kind)
+                        if key not in self._buckets:
+                            self._buckets[key] = TokenBucket(limits[kind])
+                        buckets.append((kind, self._buckets[key]))
+        return buckets
+
+    def _acquire(self, provider, model, tokens, max_wait):
+        taken = []
+        waited = 0.0
+        try:
+            for kind, bucket in self._buckets_for(provider, model):
+                amount = 1 if kind == "requests_per_minute" else tokens
+                waited += bucket.acquire(amount, max(0.0, max_wait - waited))
+                taken.append((bucket, amount))
+        except BudgetExhaustedError:
+            for bucket, amount in taken:
+                bucket.refund(amount)
+            raise
+        return waited
+
+    async def _aacquire(self, provider, model, tokens, max_wait):
+        taken = []
+        start = time.monotonic()
+        try:
+            for kind, bucket in self._buckets_for(provider, model):
+                amount = 1 if kind == "requests_per_minute" else tokens
+                needed = bucket.try_acquire(amount)
+                while needed:
+                    if time.monotonic() - start + needed > max_wait:
+                        raise BudgetExhaustedError(f"rate limit: would wait {time.monotonic() - start + needed:.1f}s")
+                    await asyncio.sleep(needed)
+                    needed = bucket.try_acquire(amount)
+                taken.append((bucket, amount))
+        except (BudgetExhaustedError, asyncio.CancelledError):
+            for bucket, amount in taken:
+                bucket.refund(amount)
+            raise
+        return time.monotonic() - start
+
+    def _limits(self, max_wait, max_retries):
+        return (self.max_queue_seconds if max_wait is None else max_wait,
+                self.max_retries if max_retries is None else max_retries)
+
+    @staticmethod
+    def _budget_wait(max_wait):
+        # (longest wait for budget now, seconds left before the deadline)
+        left = remaining()
+        return (max_wait if left is None else max(0.0, min(max_wait, left))), left
+
+    @staticmethod
+    def _no_budget(provider, model, error, left, max_wait):
+        # A budget wait cut short by the deadline is a deadline miss
+        if left is not None and left < max_wait:
+            return DeadlineExceededError(f"{provider}/{model}: rate limit wait would pass the deadline")
+        return error
+
+    @staticmethod
+    def _retry_delay(provider, model, error, retries, max_wait, max_retries):
+        """Backoff before retrying `error`; raises instead when the call should give up"""
+        if not is_retryable(error):
+            raise error
+        if retries >= max_retries:
+            raise BudgetExhaustedError(f"{provider}/{model}: gave up after {retries} retries ({error})")
+        delay = _retry_after(error)
+        if delay is None:
+            delay = random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** retries))
+        if delay > max_wait:
+            raise BudgetExhaustedError(f"{provider}/{model}: asked to retry after {delay:.1f}s")
+        left = remaining()
+        if left is not None and delay >= left:
+            raise DeadlineExceededError(f"{provider}/{model}: retry backoff would pass the deadline")
+        return delay
+
+    def _record(self, queue_seconds, retries, exhausted):
+        with self._lock:
+            self._stats["calls"] += 1
+            self._stats["queue_seconds"] += queue_seconds
+            self._stats["retries"] += retries
+            if exhausted:
+                self._stats["exhausted"] += 1
+
+    def call(self, provider, model, tokens, func, max_wait=None, max_retries=None):
+        """
+        Run `func()` under the limits of provider/model.
+        Returns (result, {"queue_seconds", "retries"}); raises
+        BudgetExhaustedError when the limits or retries are exhausted and
+        DeadlineExceededError when waiting would pass the current deadline.
+        """
+        max_wait, max_retries = self._limits(max_wait, max_retries)
+        queue_seconds = 0.0
+        retries = 0
+        exhausted = False
+        try:
+            while True:
+                bound, left = self._budget_wait(max_wait)
+                try:
+                    queue_seconds += self._acquire(provider, model, tokens, bound)
+                except BudgetExhaustedError as e:
+                    raise self._no_budget(provider, model, e, left, max_wait)
+                try:
+                    return func(), {"queue_seconds": round(queue_seconds, 4), "retries": retries}
+                except Exception as e:
+                    delay = self._retry_delay(provider, model, e, retries, max_wait, max_retries)
+                retries += 1
+                queue_seconds += delay
+                time.sleep(delay)
+        except BudgetExhaustedError:
+            exhausted = True
+            raise
+        finally:
+            self._record(queue_seconds, retries, exhausted)
+
+    async def acall(self, provider, model, tokens, func, max_wait=None, max_retries=None):
+        """
+        Async `call` for calls made on an event loop: `func` is a
+        zero-argument coroutine function, and waiting for budget or a retry
+        backoff sleeps without blocking the loop.
+        """
+        max_wait, max_retries = self._limits(max_wait, max_retries)
+        queue_seconds = 0.0
+        retries = 0
+        exhausted = False
+        try:
+            while True:
+                bound, left = self._budget_wait(max_wait)
+                try:
+                    queue_seconds += await self._aacquire(provider, model, tokens, bound)
+                except BudgetExhaustedError as e:
+                    raise self._no_budget(provider, model, e, left, max_wait)
+                try:
+                    return await func(), {"queue_seconds": round(queue_seconds, 4), "retries": retries}
+                except Exception as e:
+                    delay = self._retry_delay(provider, model, e, retries, max_wait, max_retries)
+                retries += 1
+                queue_seconds += delay
+                await asyncio.sleep(delay)
+        except BudgetExhaustedError:
+            exhausted = True
+            raise
+        finally:
+            self._record(queue_seconds, retries, exhausted)
+
+    def record_failover(self):
+        with self._lock:
+            self._stats["failovers"] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, queue_seconds=round(self._stats["queue_seconds"], 3))
+
+
+_default_scheduler = None
+_default_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Process-wide scheduler; limits can be overridden with LLM_RATE_LIMITS (JSON)"""
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            limits = dict(DEFAULT_RATE_LIMITS)
+            if os.getenv("LLM_RATE_LIMITS"):
+                limits.update(json.loads(os.getenv("LLM_RATE_LIMITS")))
+            _default_scheduler = RequestScheduler(limits)
+        return _default_scheduler
+
+
+def failover_routes(provider, model):
+    """(provider, model) pairs to try, in order, after provider/model"""
+    routes = []
+    if model in SMALLER_MODELS:
+        routes.append((provider, SMALLER_MODELS[model]))
+    if provider in FAILOVER_PROVIDERS:
+        routes.append(FAILOVER_PROVIDERS[provider])
+    return routes
+
+
+def _as_chunk(result):
+    message = result.generations[0].message
+    return ChatGenerationChunk(message=AIMessageChunk(content=message.content, usage_metadata=message.usage_metadata,
+                                                      response_metadata=message.response_metadata))
+
+
+def stream_chunks(llm, messages, stop=None, **kwargs):
+    """`llm._stream`, or the whole reply as one chunk for a model that does not stream"""
+    if type(llm)._stream is not BaseChatModel._stream:
+        return llm._stream(messages, stop=stop, **kwargs)
+    return iter([_as_chunk(llm._generate(messages, stop=stop, **kwargs))])
+
+
+async def _agenerated_chunks(llm, messages, stop=None, **kwargs):
+    yield _as_chunk(await llm._agenerate(messages, stop=stop, **kwargs))
+
+
+def astream_chunks(llm, messages, stop=None, **kwargs):
+    """Async `stream_chunks` (BaseChatModel runs a sync-only `_stream` in a thread)"""
+    if type(llm)._astream is not BaseChatModel._astream or type(llm)._stream is not BaseChatModel._stream:
+        return llm._astream(messages, stop=stop, **kwargs)
+    return _agenerated_chunks(llm, messages, stop=stop, **kwargs)
+
+
+def _hedge_call(scheduler, route, tokens, func):
+    """
+    Duplicate call of `func` on `route` for the hedger. Bound per route: a
+    hedge can still be running after its route was given up. It only goes
+    out if the route's rate limit has room now.
+    """
+    provider, model, llm = route
+
+    def hedge():
+        return scheduler.call(provider, model, tokens, lambda: func(llm), max_wait=0, max_retries=0)[0]
+
+    return hedge
+
+
+def _ahedge_call(scheduler, route, tokens, func):
+    """Async `_hedge_call`: `func(llm)` returns a coroutine"""
+    provider, model, llm = route
+
+    async def hedge():
+        return (await scheduler.acall(provider, model, tokens, lambda: func(llm), max_wait=0, max_retries=0))[0]
+
+    return hedge
+
+
+class ScheduledChatModel(BaseChatModel):
+    """
+    Chat model that sends every call through the shared scheduler and fails
+    over to the routes from `failover_routes` when the budget of a model is
+    exhausted. Calls run under the current deadline and slow ones are
+    hedged (see `hedging.Hedger`). Per-call queueing delay, retries and the
+    model that answered are added to the response metadata under "scheduler".
+    The async methods do the same on the event loop (`acall` / `arun`).
+    """
+
+    provider: str
+    model_name: str
+    inner: BaseChatModel
+    resolve_route: object = None  # (provider, model) -> chat model or None
+
+    @property
+    def _llm_type(self):
+        return f"scheduled-{getattr(self.inner, '_llm_type', 'chat')}"
+
+    def _routes(self):
+        yield self.provider, self.model_name, self.inner
+        if self.resolve_route is None:
+            return
+        for provider, model in failover_routes(self.provider, self.model_name):
+            llm = self.resolve_route(provider, model)
+            if llm is not None:
+                yield provider, model, llm
+
+    def _plan(self, messages):
+        """
+        (tokens, attempts): the call's token estimate and, per route in
+        failover order, (failovers, route, hedge route). The duplicate goes
+        to the same model or the next route, and only if its rate limit has
+        room right now.
+        """
+        tokens = estimate_tokens("\n".join(str(m.content) for m in messages)) + OUTPUT_TOKEN_ESTIMATE
+        routes = list(self._routes())
+        same = hedge_target() == "same"
+
+        def attempts():
+            for failovers, route in enumerate(routes):
+                if failovers:
+                    get_scheduler().record_failover()
+                yield failovers, route, route if same else next(iter(routes[failovers + 1:]), None)
+
+        return tokens, attempts()
+
+    @staticmethod
+    def _answered(call_stats, provider, model, failovers):
+        call_stats.update(provider=provider, model=model, failovers=failovers)
+        record_call(call_stats["queue_seconds"], call_stats["retries"], failovers)
+        return call_stats
+
+    @staticmethod
+    def _exhausted(provider, model, error):
+        # Counted with the turn's errors, so it reaches telemetry and Prometheus
+        record_error("scheduler", f"budget exhausted for {provider}/{model}: {error}")
+        return error
+
+    def _schedule(self, messages, func, kind, discard=None):
+        scheduler = get_scheduler()
+        hedger = get_hedger()
+        tokens, attempts = self._plan(messages)
+        last_error = None
+        for failovers, (provider, model, llm), hedge_route in attempts:
+            hedge = _hedge_call(scheduler, hedge_route, tokens, func) if hedge_route else None
+            attempt = lambda llm=llm, key=(provider, model, kind), hedge=hedge: hedger.run(
+                key, lambda: func(llm), hedge=hedge, discard=discard
+            )
+            try:
+                result, call_stats = scheduler.call(provider, model, tokens, attempt)
+            except BudgetExhaustedError as e:
+                last_error = self._exhausted(provider, model, e)
+                continue
+            return result, self._answered(call_stats, provider, model, failovers)
+        raise last_error
+
+    async def _aschedule(self, messages, func, kind, discard=None):
+        # Async _schedule: `func(llm)` returns a coroutine
+        scheduler = get_scheduler()
+        hedger = get_hedger()
+        tokens, attempts = self._plan(messages)
+        last_error = None
+        for failovers, (provider, model, llm), hedge_route in attempts:
+            hedge = _ahedge_call(scheduler, hedge_route, tokens, func) if hedge_route else None
+            attempt = lambda llm=llm, key=(provider, model, kind), hedge=hedge: hedger.arun(
+                key, lambda: func(llm), hedge=hedge, discard=discard
+            )
+            try:
+                result, call_stats = await scheduler.acall(provider, model, tokens, attempt)
+            except BudgetExhaustedError as e:
+                last_error = self._exhausted(provider, model, e)
+                continue
+            return result, self._answered(call_stats, provider, model, failovers)
+        raise last_error
+
+    def _with_stats(self, result, call_stats):
+        generations = []
+        for generation in result.generations:
+            generation.message.response_metadata["scheduler"] = call_stats
+            generations.append(ChatGeneration(message=generation.message, generation_info=generation.generation_info))
+        return ChatResult(generations=generations, llm_output=result.llm_output)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        # The inner model is called directly so callbacks see a single run
+        result, call_stats = self._schedule(messages, lambda llm: llm._generate(messages, stop=stop, **kwargs),
+                                            "generate")
+        return self._with_stats(result, call_stats)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        result, call_stats = await self._aschedule(messages, lambda llm: llm._agenerate(messages, stop=stop, **kwargs),
+                                                   "generate")
+        return self._with_stats(result, call_stats)
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        def open_stream(llm):
+            # Errors before the first chunk are retried / failed over, and a
+            # slow first chunk is hedged
+            stream = iter(stream_chunks(llm, messages, stop=stop, **kwargs))
+            return stream, next(stream, None)
+
+        def close_stream(opened):
+            close = getattr(opened[0], "close", None)
+            if close:
+                close()
+
+        (stream, first), call_stats = self._schedule(messages, open_stream, "first_chunk", discard=close_stream)
+        rest = None
+        try:
+            chunk = first
+            while chunk is not None:
+                if run_manager and chunk.message.content:
+                    run_manager.on_llm_new_token(chunk.message.content, chunk=chunk)
+                yield ChatGenerationChunk(message=chunk.message, generation_info=chunk.generation_info)
+                if rest is None:
+                    # Later chunks are read under the deadline as well
+                    rest = get_hedger().stream(stream)
+                chunk = next(rest, None)
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", response_metadata={"scheduler": call_stats}))
+        finally:
+            if rest is not None:
+                rest.close()
+            else:
+                close_stream((stream, first))
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        async def open_stream(llm):
+            stream = astream_chunks(llm, messages, stop=stop, **kwargs)
+            return stream, await anext(stream, None)
+
+        async def close_stream(opened):
+            await opened[0].aclose()
+
+        (stream, first), call_stats = await self._aschedule(messages, open_stream, "first_chunk",
+                                                            discard=close_stream)
+        rest = None
+        try:
+            chunk = first
+            while chunk is not None:
+                if run_manager and chunk.message.content:
+                    await run_manager.on_llm_new_token(chunk.message.content, chunk=chunk)
+                yield ChatGenerationChunk(message=chunk.message, generation_info=chunk.generation_info)
+                if rest is None:
+                    rest = get_hedger().astream(stream)
+                chunk = await anext(rest, None)
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", response_metadata={"scheduler": call_stats}))
+        finally:
+            if rest is not None:
+                await rest.aclose()
+            else:
+                await close_stream((stream, first))
@@ -0,0 +1,161 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Default on-disk location; set SCORE_CACHE_PATH="" to keep the cache in memory only
+DEFAULT_CACHE_PATH = os.path.join(".cache", "score_cache.sqlite")
+DEFAULT_MEMORY_ENTRIES = 2048
+DEFAULT_DISK_ENTRIES = 100_000
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+
+# Run disk eviction once every N writes
+EVICTION_INTERVAL = 256
+
+
+def normalize_answer(text):
+    """Normalize answer text so trivially different copies share a cache key"""
+    text = re.sub(r"\s+", " ", (text or "").strip().lower())
+    return text.rstrip(".!? ")
+
+
+def make_cache_key(answer, question, model, prompt_version):
+    """Content-addressed key for a scored answer"""
+    payload = "\x1f".join([
+        normalize_answer(answer),
+        (question or "").strip(),
+        model,
+        prompt_version
+    ])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ScoreCache:
+    """
+    Two-tier evaluator score cache: an in-memory LRU in front of an optional
+    SQLite file with TTL and size-based eviction.
+    """
+
+    def __init__(self, path=None, max_memory_entries=DEFAULT_MEMORY_ENTRIES,
+                 max_disk_entries=DEFAULT_DISK_ENTRIES, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._conn = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS scores ("
+                "key TEXT PRIMARY KEY, score INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS scores_accessed ON scores(accessed_at)")
+            self._conn.commit()
+
+    def get(self, key):
+        """Return the cached score for `key`, or None on a miss"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                score, created_at = entry
+                if now - created_at <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return score
+                del self._memory[key]
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT score, created_at FROM scores WHERE key = ?", (key,)
+                ).fetchone()
+                if row and now - row[1] <= self.ttl_seconds:
+                    self._conn.execute("UPDATE scores SET accessed_at = ? WHERE key = ?", (now, key))
+                    self._conn.commit()
+                    self._remember(key, row[0], row[1])
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return row[0]
+
+            self.misses += 1
+            return None
+
+    def set(self, key, score):
+        """Store a score in both tiers"""
+        now = time.time()
+        with self._lock:
+            self._remember(key, score, now)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO scores (key, score, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, score, now, now)
+                )
+                self._writes += 1
+                if self._writes % EVICTION_INTERVAL == 0:
+                    self._evict_disk(now)
+                self._conn.commit()
+
+    def _remember(self, key, score, created_at):
+        self._memory[key] = (score, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self, now):
+        # Drop expired rows, then the least recently used beyond the size cap
+        self._conn.execute("DELETE FROM scores WHERE created_at < ?", (now - self.ttl_seconds,))
+        self._conn.execute(
+            "DELETE FROM scores WHERE key IN ("
+            "SELECT key FROM scores ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,)
+        )
+
+    def stats(self):
+        """Hit/miss counters and tier sizes"""
+        with self._lock:
+            disk_entries = 0
+            if self._conn is not None:
+                disk_entries = self._conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_entries
+            }
+
+    def clear(self):
+        """Remove every cached score"""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM scores")
+                self._conn.commit()
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_score_cache():
+    """Process-wide score cache, configured by SCORE_CACHE_PATH"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ScoreCache(path=os.getenv("SCORE_CACHE_PATH", DEFAULT_CACHE_PATH) or None)
+        return _default_cache
@@ -0,0 +1,462 @@
+"""
+Async interview service: many concurrent interviews in one process, over
+HTTP and WebSocket.
+
+Every interview gets its own session id, so chat histories, transcripts
+and scores are never shared. All LLM calls are awaited on the event loop
+(`ainvoke` / `astream`), so an interview waiting on the provider holds
+no thread.
+
+Endpoints:
+    POST   /sessions                 {"candidate_name", "template"} -> session id and first question
+    POST   /sessions/{id}/answers    {"answer"} -> score and next question
+    GET    /sessions/{id}            progress
+    GET    /sessions/{id}/report     report so far
+    DELETE /sessions/{id}            end the interview; returns the report
+    GET    /sessions/{id}/ws         WebSocket: send {"answer"}, receive a follow-up
+                                     question as "token" messages, then a "turn" message
+    GET    /health                   load, limits and CPU time
+
+Backpressure:
+- New interviews get 503 once `max_sessions` are live.
+- At most `max_inflight_turns` turns call the LLM at once. A turn waits
+  up to `queue_seconds` for a slot, then gets 503 with Retry-After.
+- Each interview runs one turn at a time (409) and holds at most
+  `session_max_bytes` of answers, questions and replies (413).
+- An exhausted LLM rate-limit budget is 503 with Retry-After, a missed
+  deadline 504. Over WebSocket, errors come back as "error" messages and
+  the connection stays open for the next answer.
+
+Usage (from the project root):
+    python -m interviewer.service --provider Local --model fake --port 8080
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from functools import partial
+from aiohttp import WSMsgType, web
+from dotenv import load_dotenv
+from .clients import API_KEY_VARS, LOCAL_PROVIDER, require_api_key
+from .evaluator import aevaluate_answer, evaluator_for, index_scored_answers
+from .hedging import DeadlineExceededError
+from .interview_chain import build_interview_chain
+from .memory import HISTORY_STRATEGIES, DEFAULT_HISTORY_STRATEGY, DEFAULT_HISTORY_BUDGET, build_history_strategy
+from .report import generate_report
+from .scheduler import BudgetExhaustedError
+from .session_log import get_session_log
+from .session_store import get_session_store
+from .sessions import InterviewSession
+from .templates import DEFAULT_TEMPLATE, get_template_registry
+from .turns import DEFAULT_TURN_TIMEOUT, TurnTimeoutError, arun_turn, astream_turn
+
+DEFAULT_PORT = 8080
+DEFAULT_MAX_SESSIONS = 2000
+DEFAULT_MAX_INFLIGHT_TURNS = 500
+DEFAULT_QUEUE_SECONDS = 5.0
+DEFAULT_SESSION_MAX_BYTES = 256 * 1024
+DEFAULT_MAX_ANSWER_CHARS = 8000
+DEFAULT_IDLE_TTL_SECONDS = 30 * 60
+DEFAULT_MAX_FOLLOWUPS = 1
+REAP_INTERVAL_SECONDS = 60
+# Retry-After sent when the LLM rate-limit budget ran out
+BUDGET_RETRY_AFTER_SECONDS = 10
+
+_dumps = partial(json.dumps, default=str)
+
+
+class ServiceError(Exception):
+    """A request the service refuses, with the HTTP status to answer it with"""
+
+    def __init__(self, status, message, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class LiveInterview:
+    """Progress of one hosted interview"""
+
+    def __init__(self, session_id, template, candidate_name):
+        self.session_id = session_id
+        self.template = template
+        self.session = InterviewSession(role=template.role, candidate_name=candidate_name, template=template.name)
+        self.question_idx = 0
+        self.asked_question = template.question_at(0)[0]
+        self.followup_count = 0
+        self.complete = False
+        self.bytes_used = 0
+        self.last_active = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def state(self):
+        return {
+            "session_id": self.session_id,
+            "candidate_name": self.session.candidate_name,
+            "template": self.template.name,
+            "question": None if self.complete else self.asked_question,
+            "section": None if self.complete else self.template.question_at(self.question_idx)[1],
+            "question_idx": self.question_idx,
+            "total_questions": self.template.total_questions,
+            "turns": len(self.session),
+            "complete": self.complete
+        }
+
+
+class InterviewService:
+    """
+    Hosts many interviews on one event loop against shared chains (built
+    once, like the replay runner). Interviews idle for `idle_ttl_seconds`
+    are dropped.
+    """
+
+    def __init__(self, llm_provider, api_key, model, evaluator_api_key, template=DEFAULT_TEMPLATE,
+                 history_strategy=DEFAULT_HISTORY_STRATEGY, history_budget=DEFAULT_HISTORY_BUDGET,
+                 max_followups=DEFAULT_MAX_FOLLOWUPS, max_sessions=DEFAULT_MAX_SESSIONS,
+                 max_inflight_turns=DEFAULT_MAX_INFLIGHT_TURNS, queue_seconds=DEFAULT_QUEUE_SECONDS,
+                 session_max_bytes=DEFAULT_SESSION_MAX_BYTES, max_answer_chars=DEFAULT_MAX_ANSWER_CHARS,
+                 idle_ttl_seconds=DEFAULT_IDLE_TTL_SECONDS, timeout=DEFAULT_TURN_TIMEOUT):
+        self.llm_provider = llm_provider
+        self.model = model
+        self.evaluator_api_key = evaluator_api_key
+        self.evaluator_provider, self.evaluator_model = evaluator_for(llm_provider, model)
+        self.template = template
+        self.max_followups = max_followups
+        self.max_sessions = max_sessions
+        self.max_inflight_turns = max_inflight_turns
+        self.queue_seconds = queue_seconds
+        self.session_max_bytes = session_max_bytes
+        self.max_answer_chars = max_answer_chars
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.timeout = timeout
+        self.store = get_session_store()
+        # Every live interview needs its history resident
+        self.store.max_sessions = max(self.store.max_sessions, max_sessions)
+        self.history_strategy = build_history_strategy(history_strategy, history_budget, llm_provider, api_key, model)
+        self.chain = build_interview_chain(llm_provider, api_key, model, history_strategy=self.history_strategy)
+        self.session_log = get_session_log()
+        self._interviews = {}
+        self._slots = asyncio.Semaphore(max_inflight_turns)
+        self._stats = {"started": 0, "completed": 0, "turns": 0, "inflight_turns": 0, "queued_turns": 0,
+                       "rejected": 0, "timeouts": 0}
+
+    def _log(self, interview, event_type, **fields):
+        if self.session_log is not None:
+            self.session_log.append(interview.session_id, event_type, **fields)
+
+    def start_interview(self, candidate_name=None, template=None):
+        self.reap_idle()
+        if len(self._interviews) >= self.max_sessions:
+            self._stats["rejected"] += 1
+            raise ServiceError(503, "Too many interviews in progress, retry later", retry_after=5)
+        template = get_template_registry().get(template or self.template)
+        session_id = f"service-{uuid.uuid4().hex}"
+        interview = LiveInterview(session_id, template, candidate_name)
+        self._interviews[session_id] = interview
+        self._stats["started"] += 1
+        self._log(interview, "start", role=template.role, candidate_name=interview.session.candidate_name,
+                  template=template.name, start_time=interview.session.start_time.isoformat(),
+                  provider=self.llm_provider, model=self.model)
+        return interview
+
+    def get(self, session_id):
+        interview = self._interviews.get(session_id)
+        if interview is None:
+            raise ServiceError(404, f"No interview '{session_id}'")
+        return interview
+
+    async def answer(self, session_id, answer, on_text=None):
+        """
+        Score an answer and move the interview on. With `on_text` (a
+        coroutine function) a follow-up question is streamed to it as it is
+        generated.
+        """
+        interview = self.get(session_id)
+        if interview.complete:
+            raise ServiceError(409, "Interview is complete")
+        if len(answer) > self.max_answer_chars:
+            raise ServiceError(413, f"Answer is longer than {self.max_answer_chars} characters")
+        if interview.bytes_used + len(answer) > self.session_max_bytes:
+            raise ServiceError(413, "Interview reached its memory limit; end it to get the report")
+        if interview.lock.locked():
+            raise ServiceError(409, "A turn is already in progress for this interview")
+
+        async with interview.lock:
+            interview.last_active = time.monotonic()
+            await self._acquire_slot()
+            try:
+                turn = await self._take_turn(interview, answer, on_text)
+            except TurnTimeoutError as e:
+                self._stats["timeouts"] += 1
+                raise ServiceError(504, str(e))
+            finally:
+                self._stats["inflight_turns"] -= 1
+                self._slots.release()
+            return await self._record_turn(interview, answer, turn)
+
+    async def _acquire_slot(self):
+        self._stats["queued_turns"] += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_seconds)
+        except asyncio.TimeoutError:
+            self._stats["rejected"] += 1
+            raise ServiceError(503, "Too many turns in progress, retry shortly", retry_after=1)
+        finally:
+            self._stats["queued_turns"] -= 1
+        self._stats["inflight_turns"] += 1
+
+    def _take_turn(self, interview, answer, on_text):
+        template_question = interview.template.question_at(interview.question_idx)[0]
+        routing = interview.template.routing
+        chain_input = {"input": answer, "role": interview.template.role, "question": template_question,
+                       "routing": routing}
+        evaluate = lambda: aevaluate_answer(answer, self.evaluator_api_key, question=interview.asked_question,
+                                            provider=self.evaluator_provider, model=self.evaluator_model,
+                                            routing=routing)
+        # Streamed only when the follow-up will be the next question asked
+        if on_text is not None and interview.followup_count < self.max_followups:
+            return astream_turn(self.chain, chain_input, interview.session_id, evaluate, on_text, timeout=self.timeout)
+        return arun_turn(self.chain, chain_input, interview.session_id, evaluate, timeout=self.timeout)
+
+    async def _record_turn(self, interview, answer, turn):
+        asked = interview.asked_question
+        section = interview.template.question_at(interview.question_idx)[1]
+        interview.session.add_turn(asked, answer, turn.score, dimension=section, telemetry=turn.telemetry)
+        interview.bytes_used += len(asked) + len(answer) + len(turn.response_text)
+        self._stats["turns"] += 1
+        self._log(interview, "turn", question=asked, answer=answer, score=turn.score, dimension=section,
+                  telemetry=turn.telemetry)
+
+        if turn.question and interview.followup_count < self.max_followups:
+            interview.followup_count += 1
+            interview.asked_question = turn.question
+            self._log(interview, "followup", question=turn.question)
+        else:
+            interview.question_idx += 1
+            interview.followup_count = 0
+            self._log(interview, "advance", question_idx=interview.question_idx)
+            if interview.question_idx >= interview.template.total_questions:
+                await self._complete(interview)
+            else:
+                interview.asked_question = interview.template.question_at(interview.question_idx)[0]
+        return dict(interview.state(), score=turn.score, timings=turn.timings)
+
+    async def _complete(self, interview):
+        interview.complete = True
+        self._stats["completed"] += 1
+        self._log(interview, "complete")
+        # The history is only needed while questions are asked
+        self.store.clear(interview.session_id)
+        await asyncio.to_thread(index_scored_answers, interview.session, self.evaluator_model,
+                                interview.session_id)
+
+    def report(self, session_id):
+        return generate_report(self.get(session_id).session)
+
+    async def finish(self, session_id):
+        """End an interview (complete or not) and return its report"""
+        interview = self.get(session_id)
+        async with interview.lock:
+            if not interview.complete:
+                await self._complete(interview)
+            self._interviews.pop(session_id, None)
+        return generate_report(interview.session)
+
+    def reap_idle(self):
+        """Drop interviews idle for longer than the TTL; returns how many"""
+        cutoff = time.monotonic() - self.idle_ttl_seconds
+        idle = [interview for interview in self._interviews.values()
+                if interview.last_active < cutoff and not interview.lock.locked()]
+        for interview in idle:
+            del self._interviews[interview.session_id]
+            if not interview.complete:
+                self.store.clear(interview.session_id)
+        return len(idle)
+
+    async def reap_forever(self, interval=REAP_INTERVAL_SECONDS):
+        while True:
+            await asyncio.sleep(interval)
+            self.reap_idle()
+
+    def stats(self):
+        live = self._interviews.values()
+        return dict(
+            self._stats,
+            live_sessions=len(self._interviews),
+            active_sessions=sum(not interview.complete for interview in live),
+            session_bytes=sum(interview.bytes_used for interview in live),
+            max_sessions=self.max_sessions,
+            max_inflight_turns=self.max_inflight_turns,
+            cpu_seconds=round(time.process_time(), 3)
+        )
+
+
+def _service_error(error):
+    """
+    ServiceError to answer `error` with: an exhausted LLM budget is 503,
+    a missed deadline 504 and invalid input 400. None for anything else.
+    """
+    if isinstance(error, ServiceError):
+        return error
+    if isinstance(error, BudgetExhaustedError):
+        return ServiceError(503, f"LLM rate limit reached, retry later ({error})",
+                            retry_after=BUDGET_RETRY_AFTER_SECONDS)
+    if isinstance(error, (DeadlineExceededError, TurnTimeoutError)):
+        return ServiceError(504, str(error))
+    if isinstance(error, ValueError):
+        return ServiceError(400, str(error))
+    return None
+
+
+async def _json_body(request):
+    try:
+        body = await request.json()
+    except json.JSONDecodeError:
+        raise ServiceError(400, "Request body must be JSON")
+    if not isinstance(body, dict):
+        raise ServiceError(400, "Request body must be a JSON object")
+    return body
+
+
+def _answer_text(body):
+    answer = body.get("answer")
+    if not isinstance(answer, str):
+        raise ServiceError(400, "'answer' must be a string")
+    return answer
+
+
+@web.middleware
+async def _errors(request, handler):
+    try:
+        return await handler(request)
+    except (ServiceError, BudgetExhaustedError, DeadlineExceededError, TurnTimeoutError, ValueError) as e:
+        error = _service_error(e)
+        headers = {"Retry-After": str(error.retry_after)} if error.retry_after else None
+        return web.json_response({"error": str(error)}, status=error.status, headers=headers)
+
+
+def build_app(service):
+    """aiohttp application serving `service`"""
+    routes = web.RouteTableDef()
+    respond = partial(web.json_response, dumps=_dumps)
+
+    @routes.post("/sessions")
+    async def create(request):
+        body = await _json_body(request) if request.can_read_body else {}
+        interview = service.start_interview(body.get("candidate_name"), body.get("template"))
+        return respond(interview.state(), status=201)
+
+    @routes.post("/sessions/{session_id}/answers")
+    async def answer(request):
+        body = await _json_body(request)
+        return respond(await service.answer(request.match_info["session_id"], _answer_text(body)))
+
+    @routes.get("/sessions/{session_id}")
+    async def state(request):
+        return respond(service.get(request.match_info["session_id"]).state())
+
+    @routes.get("/sessions/{session_id}/report")
+    async def report(request):
+        return respond(service.report(request.match_info["session_id"]))
+
+    @routes.delete("/sessions/{session_id}")
+    async def finish(request):
+        return respond(await service.finish(request.match_info["session_id"]))
+
+    @routes.get("/sessions/{session_id}/ws")
+    async def websocket(request):
+        session_id = request.match_info["session_id"]
+        interview = service.get(session_id)
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        await ws.send_json(dict(interview.state(), type="state"), dumps=_dumps)
+
+        async def send_text(text):
+            # Awaits the socket buffer: a slow reader holds back only its own turn
+            await ws.send_json({"type": "token", "text": text})
+
+        async for message in ws:
+            if message.type != WSMsgType.TEXT:
+                continue
+            try:
+                try:
+                    body = json.loads(message.data)
+                except json.JSONDecodeError:
+                    raise ServiceError(400, "Messages must be JSON")
+                if not isinstance(body, dict):
+                    raise ServiceError(400, "Messages must be JSON objects")
+                result = await service.answer(session_id, _answer_text(body), on_text=send_text)
+                await ws.send_json(dict(result, type="turn"), dumps=_dumps)
+            except Exception as e:
+                # Reported per message; the interview goes on over the same socket
+                error = _service_error(e)
+                if error is None:
+                    print(f"Error in WebSocket turn: {e}")
+                    error = ServiceError(500, "Internal error")
+                message = {"type": "error", "status": error.status, "error": str(error)}
+                if error.retry_after:
+                    message["retry_after"] = error.retry_after
+                await ws.send_json(message)
+        return ws
+
+    @routes.get("/health")
+    async def health(request):
+        return respond(service.stats())
+
+    async def reaper(app):
+        task = asyncio.create_task(service.reap_forever())
+        yield
+        task.cancel()
+
+    app = web.Application(middlewares=[_errors])
+    app.add_routes(routes)
+    app.cleanup_ctx.append(reaper)
+    return app
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--provider", choices=[LOCAL_PROVIDER] + list(API_KEY_VARS), default="Groq")
+    parser.add_argument("--model", default="llama-3.1-8b-instant", help="Model name (fake or replay for Local)")
+    parser.add_argument("--template", default=DEFAULT_TEMPLATE, help="Template for interviews that do not name one")
+    parser.add_argument("--max-followups", type=int, default=DEFAULT_MAX_FOLLOWUPS)
+    parser.add_argument("--history-strategy", choices=HISTORY_STRATEGIES, default=DEFAULT_HISTORY_STRATEGY)
+    parser.add_argument("--history-budget", type=int, default=DEFAULT_HISTORY_BUDGET)
+    parser.add_argument("--max-sessions", type=int, default=DEFAULT_MAX_SESSIONS)
+    parser.add_argument("--max-inflight-turns", type=int, default=DEFAULT_MAX_INFLIGHT_TURNS)
+    parser.add_argument("--queue-seconds", type=float, default=DEFAULT_QUEUE_SECONDS,
+                        help="How long a turn may wait for a slot before 503")
+    parser.add_argument("--session-max-bytes", type=int, default=DEFAULT_SESSION_MAX_BYTES)
+    parser.add_argument("--max-answer-chars", type=int, default=DEFAULT_MAX_ANSWER_CHARS)
+    parser.add_argument("--idle-ttl", type=float, default=DEFAULT_IDLE_TTL_SECONDS, help="Seconds")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TURN_TIMEOUT, help="Seconds allowed per turn")
+    return parser.parse_args()
+
+
+def main():
+    load_dotenv()
+    args = parse_args()
+
+    evaluator_provider, _ = evaluator_for(args.provider, args.model)
+    api_keys = {provider: require_api_key(provider) for provider in {args.provider, evaluator_provider}}
+
+    async def create_app():
+        # Built on the serving loop, which owns the service's semaphore and locks
+        service = InterviewService(
+            args.provider, api_keys[args.provider], args.model, api_keys[evaluator_provider],
+            template=args.template, history_strategy=args.history_strategy, history_budget=args.history_budget,
+            max_followups=args.max_followups, max_sessions=args.max_sessions,
+            max_inflight_turns=args.max_inflight_turns, queue_seconds=args.queue_seconds,
+            session_max_bytes=args.session_max_bytes, max_answer_chars=args.max_answer_chars,
+            idle_ttl_seconds=args.idle_ttl, timeout=args.timeout
+        )
+        return build_app(service)
+
+    web.run_app(create_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
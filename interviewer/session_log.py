@@ -0,0 +1,355 @@
+"""
+Append-only write-ahead log of interview events, so in-flight interviews
+survive a restart and can be resumed from a session link.
+
+Each session has a JSONL log `<session_id>.wal` of events:
+
+    start     - role, candidate name, template, start time, provider/model
+    turn      - question, answer, score, dimension, telemetry
+    followup  - a follow-up question was asked
+    advance   - moved on to template question `question_idx`
+    messages  - messages appended to the interviewer's chat history
+    complete  - the interview ended
+
+Lines are flushed to the OS as they are written and fsynced in batches by
+a background thread (group commit). Every `snapshot_every` events the
+state is folded into `<session_id>.snapshot.json`, which records the log
+offset it covers, so recovery reads the snapshot plus a short tail.
+"""
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from .sessions import InterviewSession
+
+DEFAULT_LOG_DIR = ".cache/session_log"
+DEFAULT_FSYNC_INTERVAL = 0.05
+DEFAULT_SNAPSHOT_EVERY = 50
+DEFAULT_LOG_TTL_SECONDS = 7 * 24 * 3600
+MAX_OPEN_FILES = 64
+
+# Session ids end up in file names and links; keep them to a safe alphabet
+SESSION_ID = re.compile(r"^[A-Za-z0-9_-]{1,128}$")
+
+
+class RecoveredInterview:
+    """Interview state rebuilt by replaying a session's events"""
+
+    def __init__(self):
+        self.meta = {}
+        self.session = None
+        self.question_idx = 0
+        self.followup_count = 0
+        self.pending_followup = None
+        self.messages = []  # chat of the current question: {"role", "content"}
+        self.history = []  # interviewer chat history, as message dicts
+        self.complete = False
+        self.events = 0
+        self.last_event_time = None  # epoch seconds of the latest event
+
+    def apply(self, event):
+        kind = event["type"]
+        if kind == "start":
+            self.meta = {key: value for key, value in event.items() if key not in ("type", "ts")}
+            self.session = InterviewSession(event["role"], candidate_name=event.get("candidate_name"),
+                                            template=event.get("template"))
+            if event.get("start_time"):
+                self.session.start_time = datetime.fromisoformat(event["start_time"])
+        elif kind == "turn":
+            self.session.add_turn(event["question"], event["answer"], event["score"],
+                                  dimension=event.get("dimension"), telemetry=event.get("telemetry"))
+            self.messages.append({"role": "user", "content": event["answer"]})
+            self.pending_followup = None
+        elif kind == "followup":
+            self.followup_count += 1
+            self.pending_followup = event["question"]
+            self.messages.append({"role": "assistant", "content": event["question"]})
+        elif kind == "advance":
+            self.question_idx = event["question_idx"]
+            self.followup_count = 0
+            self.pending_followup = None
+            self.messages = []
+        elif kind == "messages":
+            self.history.extend(event["messages"])
+        elif kind == "complete":
+            self.complete = True
+        self.events += 1
+        self.last_event_time = event.get("ts", self.last_event_time)
+
+    def to_snapshot(self):
+        return {
+            "meta": self.meta,
+            "session": self.session.to_dict() if self.session is not None else None,
+            "question_idx": self.question_idx,
+            "followup_count": self.followup_count,
+            "pending_followup": self.pending_followup,
+            "messages": self.messages,
+            "history": self.history,
+            "complete": self.complete,
+            "events": self.events,
+            "last_event_time": self.last_event_time
+        }
+
+    @classmethod
+    def from_snapshot(cls, data):
+        state = cls()
+        state.meta = data["meta"]
+        state.session = InterviewSession.from_dict(data["session"]) if data["session"] else None
+        state.question_idx = data["question_idx"]
+        state.followup_count = data["followup_count"]
+        state.pending_followup = data["pending_followup"]
+        state.messages = data["messages"]
+        state.history = data["history"]
+        state.complete = data["complete"]
+        state.events = data["events"]
+        state.last_event_time = data.get("last_event_time")
+        return state
+
+    def history_messages(self):
+        """The chat history as LangChain messages"""
+        from langchain_core.messages import messages_from_dict
+        return messages_from_dict(self.history)
+
+
+class SessionLog:
+    """Per-session write-ahead logs with batched fsync and periodic snapshots"""
+
+    def __init__(self, directory=DEFAULT_LOG_DIR, fsync_interval=DEFAULT_FSYNC_INTERVAL,
+                 snapshot_every=DEFAULT_SNAPSHOT_EVERY):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.fsync_interval = fsync_interval
+        self.snapshot_every = snapshot_every
+        self._files = OrderedDict()  # session_id -> open log file, LRU order
+        self._dirty = set()
+        self._since_snapshot = {}
+        self._snapshot_due = set()
+        self._sessions = set()  # sessions logged by this process
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stats = {"events": 0, "fsyncs": 0, "snapshots": 0}
+        threading.Thread(target=self._flusher, daemon=True, name="session-log").start()
+
+    def _paths(self, session_id):
+        if not SESSION_ID.match(session_id or ""):
+            raise ValueError(f"Invalid session id '{session_id}'")
+        return self.directory / f"{session_id}.wal", self.directory / f"{session_id}.snapshot.json"
+
+    def _file(self, session_id):
+        # Callers hold self._lock
+        f = self._files.pop(session_id, None)
+        if f is None:
+            f = open(self._paths(session_id)[0], "ab")
+        self._files[session_id] = f
+        while len(self._files) > MAX_OPEN_FILES:
+            oldest_id, oldest = self._files.popitem(last=False)
+            self._fsync(oldest_id, oldest)
+            oldest.close()
+        return f
+
+    def _fsync(self, session_id, f):
+        if session_id in self._dirty:
+            os.fsync(f.fileno())
+            self._dirty.discard(session_id)
+            self._stats["fsyncs"] += 1
+
+    def append(self, session_id, event_type, **fields):
+        """Append one event; it is on disk within `fsync_interval` seconds"""
+        line = json.dumps(dict(fields, type=event_type, ts=round(time.time(), 3)), default=str) + "\n"
+        with self._lock:
+            f = self._file(session_id)
+            f.write(line.encode("utf-8"))
+            f.flush()
+            self._dirty.add(session_id)
+            self._sessions.add(session_id)
+            self._stats["events"] += 1
+            if event_type == "complete":
+                # Nothing more is logged for a finished interview: make it
+                # durable now and drop what was kept for it
+                self._fsync(session_id, f)
+                self._close(session_id)
+            else:
+                count = self._since_snapshot.get(session_id, 0) + 1
+                self._since_snapshot[session_id] = count
+                if count >= self.snapshot_every:
+                    self._snapshot_due.add(session_id)
+        self._wake.set()
+
+    def _close(self, session_id):
+        # Callers hold self._lock
+        f = self._files.pop(session_id, None)
+        if f is not None:
+            f.close()
+        self._dirty.discard(session_id)
+        self._sessions.discard(session_id)
+        self._since_snapshot.pop(session_id, None)
+        self._snapshot_due.discard(session_id)
+
+    def start(self, session_id, **meta):
+        """Log a new interview (role, candidate_name, template, start_time, ...)"""
+        self.append(session_id, "start", **meta)
+
+    def record_turn(self, session_id, question, answer, score, dimension=None, telemetry=None):
+        self.append(session_id, "turn", question=question, answer=answer, score=score,
+                    dimension=dimension, telemetry=telemetry)
+
+    def is_logged(self, session_id):
+        with self._lock:
+            return session_id in self._sessions
+
+    def history_listener(self, session_id, messages):
+        """SessionStore.on_messages callback: log history of logged sessions"""
+        if self.is_logged(session_id):
+            from langchain_core.messages import message_to_dict
+            self.append(session_id, "messages", messages=[message_to_dict(message) for message in messages])
+
+    def sync(self):
+        """fsync every pending event now"""
+        with self._lock:
+            for session_id in list(self._dirty):
+                f = self._files.get(session_id)
+                if f is not None:
+                    self._fsync(session_id, f)
+
+    def _flusher(self):
+        while True:
+            self._wake.wait()
+            time.sleep(self.fsync_interval)  # let more events join this fsync
+            self._wake.clear()
+            self.sync()
+            with self._lock:
+                due, self._snapshot_due = self._snapshot_due, set()
+            for session_id in due:
+                try:
+                    self.snapshot(session_id)
+                except Exception as e:
+                    print(f"Error writing snapshot for {session_id}: {e}")
+
+    def _replay(self, session_id):
+        wal_path, snapshot_path = self._paths(session_id)
+        if not wal_path.exists():
+            return None, 0
+        state, offset = RecoveredInterview(), 0
+        if snapshot_path.exists():
+            with open(snapshot_path, "r") as f:
+                snapshot = json.load(f)
+            state, offset = RecoveredInterview.from_snapshot(snapshot["state"]), snapshot["offset"]
+        with open(wal_path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                # A torn last line (crash mid-write) is ignored
+                if not line.endswith(b"\n"):
+                    break
+                state.apply(json.loads(line))
+                offset += len(line)
+        return state, offset
+
+    def snapshot(self, session_id):
+        """Fold the log into a snapshot so recovery only replays the tail"""
+        state, offset = self._replay(session_id)
+        if state is None:
+            return
+        _, snapshot_path = self._paths(session_id)
+        tmp_path = snapshot_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"offset": offset, "state": state.to_snapshot()}, f, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, snapshot_path)
+        with self._lock:
+            if session_id in self._since_snapshot:  # not completed meanwhile
+                self._since_snapshot[session_id] = 0
+            self._stats["snapshots"] += 1
+
+    def _load(self, session_id):
+        # (state, log offset replayed up to), or (None, 0)
+        try:
+            state, offset = self._replay(session_id)
+        except ValueError:
+            return None, 0
+        if state is None or state.session is None:
+            return None, 0
+        return state, offset
+
+    def read(self, session_id):
+        """
+        Rebuild a session from its snapshot and log without resuming it;
+        returns a RecoveredInterview, or None for an unknown or invalid
+        session id.
+        """
+        return self._load(session_id)[0]
+
+    def recover(self, session_id):
+        """
+        Rebuild a session to resume it (see read()). Later events for an
+        unfinished session are logged as usual.
+        """
+        state, offset = self._load(session_id)
+        if state is not None and not state.complete:
+            wal_path, _ = self._paths(session_id)
+            with self._lock:
+                if session_id not in self._files and wal_path.stat().st_size > offset:
+                    # Cut a torn last line so the next event starts a line of its own
+                    with open(wal_path, "r+b") as f:
+                        f.truncate(offset)
+                self._sessions.add(session_id)
+                self._since_snapshot.setdefault(session_id, 0)
+        return state
+
+    def prune(self, max_age_seconds=DEFAULT_LOG_TTL_SECONDS):
+        """Delete logs and snapshots of sessions idle for longer than max_age_seconds"""
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        for wal_path in self.directory.glob("*.wal"):
+            session_id = wal_path.name[:-len(".wal")]
+            if wal_path.stat().st_mtime >= cutoff:
+                continue
+            with self._lock:
+                self._close(session_id)
+            for path in (wal_path, self.directory / f"{session_id}.snapshot.json"):
+                path.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, open_files=len(self._files))
+
+
+_default_log = None
+_default_lock = threading.Lock()
+
+
+def get_session_log():
+    """
+    Process-wide session log, or None when disabled. Logs hold candidate
+    names and answers, so logging is off unless SESSION_LOG_DIR is set
+    (e.g. to DEFAULT_LOG_DIR). Also configured by SESSION_LOG_FSYNC_INTERVAL,
+    SESSION_LOG_SNAPSHOT_EVERY and SESSION_LOG_TTL seconds. Its history
+    listener is attached to the shared session store.
+    """
+    global _default_log
+    directory = os.getenv("SESSION_LOG_DIR", "")
+    if not directory:
+        return None
+    with _default_lock:
+        if _default_log is None:
+            from .session_store import get_session_store
+            _default_log = SessionLog(
+                directory,
+                fsync_interval=float(os.getenv("SESSION_LOG_FSYNC_INTERVAL", DEFAULT_FSYNC_INTERVAL)),
+                snapshot_every=int(os.getenv("SESSION_LOG_SNAPSHOT_EVERY", DEFAULT_SNAPSHOT_EVERY))
+            )
+            _default_log.prune(float(os.getenv("SESSION_LOG_TTL", DEFAULT_LOG_TTL_SECONDS)))
+            get_session_store().on_messages(_default_log.history_listener)
+        return _default_log
+
+
+def resume_history(session_id, state):
+    """Put a recovered interview's chat history back into the session store"""
+    from .session_store import get_session_store
+    get_session_store().restore_messages(session_id, state.history_messages())
@@ -0,0 +1,274 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from langchain_core.chat_history import BaseChatMessageHistory, InMemoryChatMessageHistory
+from langchain_core.messages import message_to_dict, messages_from_dict
+
+DEFAULT_MAX_SESSIONS = 500
+DEFAULT_IDLE_TTL_SECONDS = 2 * 3600
+
+
+class SQLiteChatMessageHistory(BaseChatMessageHistory):
+    """Chat history that lives in SQLite instead of RAM"""
+
+    def __init__(self, store, session_id):
+        self.store = store
+        self.session_id = session_id
+
+    @property
+    def messages(self):
+        return self.store._load_messages(self.session_id)
+
+    def add_messages(self, messages):
+        self.store._append_messages(self.session_id, messages)
+
+    def clear(self):
+        self.store._delete_messages(self.session_id)
+
+
+class ObservedChatMessageHistory(BaseChatMessageHistory):
+    """Chat history that reports appended messages to the store's listeners"""
+
+    def __init__(self, history, session_id, notify):
+        self.history = history
+        self.session_id = session_id
+        self.notify = notify
+
+    @property
+    def messages(self):
+        return self.history.messages
+
+    def add_messages(self, messages):
+        self.history.add_messages(messages)
+        self.notify(self.session_id, messages)
+
+    # Delegated so an in-memory history is read and written inline on the
+    # event loop rather than through an executor thread
+    async def aget_messages(self):
+        return await self.history.aget_messages()
+
+    async def aadd_messages(self, messages):
+        await self.history.aadd_messages(messages)
+        self.notify(self.session_id, messages)
+
+    def clear(self):
+        self.history.clear()
+
+
+class SessionStore:
+    """
+    Conversation histories keyed by session id, with idle-TTL and LRU
+    eviction. With a SQLite `path` the messages are kept on disk so they
+    survive a restart and only a lightweight handle stays in memory.
+    """
+
+    def __init__(self, max_sessions=DEFAULT_MAX_SESSIONS, idle_ttl_seconds=DEFAULT_IDLE_TTL_SECONDS, path=None):
+        self.max_sessions = max_sessions
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.path = path
+        self._histories = OrderedDict()  # session_id -> (history, last_access)
+        self._lock = threading.RLock()
+        self._on_evict = []
+        self._on_messages = []
+        self.evictions = 0
+        self._conn = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS messages ("
+                "session_id TEXT NOT NULL, seq INTEGER PRIMARY KEY AUTOINCREMENT, message TEXT NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS messages_session ON messages(session_id, seq)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions (session_id TEXT PRIMARY KEY, last_access REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    def on_evict(self, callback):
+        """
+        Register callback(session_id) run whenever a session is dropped.
+        Bound methods are held weakly so short-lived owners are not kept alive.
+        """
+        with self._lock:
+            # Builtin methods (e.g. list.append) have __self__ but no __func__
+            # and cannot be held by a WeakMethod
+            if hasattr(callback, "__func__"):
+                self._on_evict.append(weakref.WeakMethod(callback))
+            else:
+                self._on_evict.append(lambda: callback)
+
+    def on_messages(self, callback):
+        """
+        Register callback(session_id, messages) run after messages are added
+        to a history created from now on (e.g. to write them to a log)
+        """
+        with self._lock:
+            self._on_messages.append(callback)
+
+    def _notify_messages(self, session_id, messages):
+        for callback in list(self._on_messages):
+            callback(session_id, messages)
+
+    def restore_messages(self, session_id, messages):
+        """Reload a session's history (e.g. after a restart) without notifying listeners"""
+        history = self.get_history(session_id)
+        inner = getattr(history, "history", history)
+        if not inner.messages:
+            inner.add_messages(messages)
+        return history
+
+    def get_history(self, session_id):
+        """Return the chat history for a session, creating it if needed"""
+        now = time.time()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._histories.pop(session_id, None)
+            history = entry[0] if entry else self._new_history(session_id)
+            self._histories[session_id] = (history, now)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sessions (session_id, last_access) VALUES (?, ?)", (session_id, now)
+                )
+                self._conn.commit()
+            while len(self._histories) > self.max_sessions:
+                oldest_id, _ = self._histories.popitem(last=False)
+                # On disk the data is kept; only the in-memory handle goes away
+                if self._conn is None:
+                    self._dropped(oldest_id)
+            return history
+
+    def _new_history(self, session_id):
+        if self._conn is not None:
+            history = SQLiteChatMessageHistory(self, session_id)
+        else:
+            history = InMemoryChatMessageHistory()
+        if self._on_messages:
+            history = ObservedChatMessageHistory(history, session_id, self._notify_messages)
+        return history
+
+    def _evict_idle(self, now):
+        # Entries are in access order, so expired ones are at the front
+        while self._histories:
+            session_id, (_, last_access) = next(iter(self._histories.items()))
+            if now - last_access <= self.idle_ttl_seconds:
+                break
+            self._histories.popitem(last=False)
+            if self._conn is not None:
+                self._delete_messages(session_id)
+            self._dropped(session_id)
+        if self._conn is not None:
+            expired = [row[0] for row in self._conn.execute(
+                "SELECT session_id FROM sessions WHERE last_access < ?", (now - self.idle_ttl_seconds,)
+            )]
+            for session_id in expired:
+                self._delete_messages(session_id)
+                self._dropped(session_id)
+
+    def _dropped(self, session_id):
+        self.evictions += 1
+        if self._conn is not None:
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self._conn.commit()
+        live = []
+        for ref in self._on_evict:
+            callback = ref()
+            if callback is not None:
+                callback(session_id)
+                live.append(ref)
+        self._on_evict = live
+
+    def clear(self, session_id):
+        """Remove a session and its history"""
+        with self._lock:
+            entry = self._histories.pop(session_id, None)
+            if entry is not None:
+                entry[0].clear()
+            elif self._conn is not None:
+                self._delete_messages(session_id)
+            self._dropped(session_id)
+
+    def __contains__(self, session_id):
+        with self._lock:
+            if session_id in self._histories:
+                return True
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT 1 FROM sessions WHERE session_id = ?", (session_id,)
+                ).fetchone()
+                return row is not None
+            return False
+
+    def __len__(self):
+        with self._lock:
+            return len(self._histories)
+
+    def stats(self):
+        """Resident session count and approximate memory / disk footprint"""
+        with self._lock:
+            resident_bytes = 0
+            for history, _ in self._histories.values():
+                history = getattr(history, "history", history)
+                resident_bytes += sys.getsizeof(history)
+                if isinstance(history, InMemoryChatMessageHistory):
+                    for message in history.messages:
+                        resident_bytes += sys.getsizeof(message) + sys.getsizeof(message.content)
+            stats = {
+                "resident_sessions": len(self._histories),
+                "approx_bytes": resident_bytes,
+                "evictions": self.evictions
+            }
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT COUNT(DISTINCT session_id), COALESCE(SUM(LENGTH(message)), 0) FROM messages"
+                ).fetchone()
+                stats["stored_sessions"] = row[0]
+                stats["disk_bytes"] = row[1]
+            return stats
+
+    def _load_messages(self, session_id):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT message FROM messages WHERE session_id = ? ORDER BY seq", (session_id,)
+            ).fetchall()
+        return messages_from_dict([json.loads(row[0]) for row in rows])
+
+    def _append_messages(self, session_id, messages):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO messages (session_id, message) VALUES (?, ?)",
+                [(session_id, json.dumps(message_to_dict(message))) for message in messages]
+            )
+            self._conn.commit()
+
+    def _delete_messages(self, session_id):
+        with self._lock:
+            self._conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            self._conn.commit()
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def get_session_store():
+    """
+    Process-wide session store. Configured by SESSION_STORE_PATH (SQLite file,
+    empty for memory only), SESSION_MAX_ENTRIES and SESSION_IDLE_TTL seconds.
+    """
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = SessionStore(
+                max_sessions=int(os.getenv("SESSION_MAX_ENTRIES", DEFAULT_MAX_SESSIONS)),
+                idle_ttl_seconds=float(os.getenv("SESSION_IDLE_TTL", DEFAULT_IDLE_TTL_SECONDS)),
+                path=os.getenv("SESSION_STORE_PATH") or None
+            )
+        return _default_store
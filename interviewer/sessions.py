@@ -1,41 +1,183 @@
+import heapq
+import sys
+from array import array
 from datetime import datetime
+from .telemetry import TelemetryAggregate
+
+# Strengths and concerns listed in the report, and notable quotes kept
+TOP_K = 3
+MAX_NOTABLE_QUOTES = 5
+
+# Score column value for a turn whose answer could not be scored
+UNSCORED = -1
+
+
+class Turn:
+    """One answered question; the score lives in the session's score column"""
+
+    __slots__ = ("question", "answer", "dimension_id", "telemetry")
+
+    def __init__(self, question, answer, dimension_id, telemetry):
+        self.question = question
+        self.answer = answer
+        self.dimension_id = dimension_id
+        self.telemetry = telemetry
 
 
 class InterviewSession:
-    def __init__(self, role, candidate_name=None):
+    """
+    Transcript of one interview plus running aggregates for the report.
+
+    Turns are stored compactly: slotted records, scores in a signed-byte
+    array, dimension names as indices into `dimensions` and notable quotes
+    as transcript indices. `transcript` rebuilds the familiar list of turn
+    dicts on demand. Every `add_turn` updates the aggregates in O(1)
+    (O(log k) for the top-k heaps), so a report can be built at any time
+    without rescanning the transcript.
+    """
+
+    def __init__(self, role, candidate_name=None, template=None):
         self.role = role
         self.candidate_name = candidate_name or "Anonymous"
-        self.transcript = []
-        self.evaluations = []
+        self.template = template  # template file name, used to weight sections in analytics
+        self.turns = []
+        self.scores = array("b")  # per turn, UNSCORED when scoring failed
+        self.dimensions = []  # dimension names, indexed by Turn.dimension_id
+        self._dimension_ids = {}
         self.start_time = datetime.now()
-        self.dimension_scores = {}  # Scores by dimension/category
-        self.notable_quotes = []
-
-    def add_turn(self, question, answer, evaluation, dimension=None):
-        self.transcript.append({
-            "question": question,
-            "answer": answer,
-            "score": evaluation,
-            "dimension": dimension
-        })
-        self.evaluations.append(evaluation)
-        
+        # Running aggregates of the scored turns
+        self.score_sum = 0
+        self.scored_turns = 0
+        self.unscored_turns = 0
+        self.highest_score = None
+        self.lowest_score = None
+        self.score_distribution = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
+        self.dimension_stats = {}  # dimension -> {"sum", "count", "min", "max"}
+        # Bounded heaps of transcript indices: best answers (score >= 4) and
+        # worst answers (score <= 2), earlier turns winning ties
+        self._strengths = []  # (score, -index)
+        self._concerns = []  # (-score, -index)
+        self.notable_quotes = []  # transcript indices, first MAX_NOTABLE_QUOTES
+        self.similar_answers = []  # transcript indices flagged as near-copies of indexed answers
+        self.telemetry = TelemetryAggregate()
+
+    def _dimension_id(self, dimension):
+        if dimension is None:
+            return None
+        dimension_id = self._dimension_ids.get(dimension)
+        if dimension_id is None:
+            dimension_id = len(self.dimensions)
+            self.dimensions.append(sys.intern(dimension))
+            self._dimension_ids[dimension] = dimension_id
+        return dimension_id
+
+    def add_turn(self, question, answer, evaluation, dimension=None, telemetry=None):
+        index = len(self.turns)
+        # Per-turn spans and token counts (see interviewer/telemetry.py)
+        if telemetry:
+            self.telemetry.add(telemetry)
+            if (telemetry.get("near_duplicate") or {}).get("flagged"):
+                self.similar_answers.append(index)
+        self.turns.append(Turn(question, answer, self._dimension_id(dimension), telemetry or None))
+        self.scores.append(UNSCORED if evaluation is None else evaluation)
+
+        # A None score means scoring failed; keep the turn but leave it out of the averages
+        if evaluation is None:
+            self.unscored_turns += 1
+            return
+        self.score_sum += evaluation
+        self.scored_turns += 1
+        self.highest_score = evaluation if self.highest_score is None else max(self.highest_score, evaluation)
+        self.lowest_score = evaluation if self.lowest_score is None else min(self.lowest_score, evaluation)
+        if evaluation in self.score_distribution:
+            self.score_distribution[evaluation] += 1
+
         # Track dimension scores
         if dimension:
-            if dimension not in self.dimension_scores:
-                self.dimension_scores[dimension] = []
-            self.dimension_scores[dimension].append(evaluation)
-        
+            stats = self.dimension_stats.get(dimension)
+            if stats is None:
+                self.dimension_stats[dimension] = {"sum": evaluation, "count": 1, "min": evaluation, "max": evaluation}
+            else:
+                stats["sum"] += evaluation
+                stats["count"] += 1
+                stats["min"] = min(stats["min"], evaluation)
+                stats["max"] = max(stats["max"], evaluation)
+
+        # Keep the top-k strengths / concerns; the heap root is the one to drop
+        if evaluation >= 4:
+            _push_bounded(self._strengths, (evaluation, -index))
+        elif evaluation <= 2:
+            _push_bounded(self._concerns, (-evaluation, -index))
+
         # Track notable quotes (answers with high or low scores)
-        if evaluation >= 4 or evaluation <= 2:
-            self.notable_quotes.append({
-                "question": question,
-                "answer": answer,
-                "score": evaluation
-            })
-    
+        if (evaluation >= 4 or evaluation <= 2) and len(self.notable_quotes) < MAX_NOTABLE_QUOTES:
+            self.notable_quotes.append(index)
+
+    def __len__(self):
+        return len(self.turns)
+
+    def score_at(self, index):
+        score = self.scores[index]
+        return None if score == UNSCORED else score
+
+    def turn_at(self, index):
+        """Turn `index` as a transcript dict"""
+        turn = self.turns[index]
+        item = {
+            "question": turn.question,
+            "answer": turn.answer,
+            "score": self.score_at(index),
+            "dimension": None if turn.dimension_id is None else self.dimensions[turn.dimension_id]
+        }
+        if turn.telemetry:
+            item["telemetry"] = turn.telemetry
+        return item
+
+    @property
+    def transcript(self):
+        """All turns as a list of dicts (question, answer, score, dimension[, telemetry])"""
+        return [self.turn_at(i) for i in range(len(self.turns))]
+
+    @property
+    def average_score(self):
+        return self.score_sum / self.scored_turns if self.scored_turns else 0
+
+    def top_strengths(self):
+        """Up to TOP_K best-scored turns, best first"""
+        return [self.turn_at(-neg_index) for _, neg_index in sorted(self._strengths, reverse=True)]
+
+    def top_concerns(self):
+        """Up to TOP_K worst-scored turns, worst first"""
+        return [self.turn_at(-neg_index) for _, neg_index in sorted(self._concerns, reverse=True)]
+
+    def to_dict(self):
+        """Plain, JSON-serializable form of the session (see from_dict)"""
+        return {
+            "role": self.role,
+            "candidate_name": self.candidate_name,
+            "template": self.template,
+            "start_time": self.start_time.isoformat(),
+            "transcript": self.transcript
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a session, aggregates included, from to_dict() output"""
+        session = cls(data["role"], candidate_name=data.get("candidate_name"), template=data.get("template"))
+        session.start_time = datetime.fromisoformat(data["start_time"])
+        for turn in data["transcript"]:
+            session.add_turn(turn["question"], turn["answer"], turn["score"], dimension=turn.get("dimension"),
+                             telemetry=turn.get("telemetry"))
+        return session
+
     def get_duration(self):
         """Get interview duration in minutes"""
         duration = datetime.now() - self.start_time
         return int(duration.total_seconds() / 60)
 
+
+def _push_bounded(heap, item):
+    if len(heap) < TOP_K:
+        heapq.heappush(heap, item)
+    else:
+        heapq.heappushpop(heap, item)
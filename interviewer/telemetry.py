@@ -0,0 +1,509 @@
+import bisect
+import contextvars
+import json
+from array import array
+import threading
+import time
+from contextlib import contextmanager
+
+# Spans recorded per turn (seconds):
+#   prompt_build - history selection and prompt formatting
+#   network      - interviewer LLM call(s), request to last token
+#   first_token  - interviewer LLM call start to first streamed token
+#   parse        - parsing / validating the interviewer reply
+#   scoring      - the evaluator call for the answer
+#   queue        - waiting for rate limits and retry backoff (all calls)
+#   total        - the whole turn
+SPANS = ["prompt_build", "queue", "network", "first_token", "parse", "scoring", "total"]
+
+# Run name of the history + prompt step inside the interviewer chain
+PROMPT_BUILD_RUN = "prompt_build"
+
+# Tag marking evaluator runs so their tokens are counted separately
+SCORING_TAG = "scoring"
+
+_current = contextvars.ContextVar("turn_telemetry", default=None)
+_hook_lock = threading.Lock()
+_hook_registered = False
+_callback_class = None
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers (None if empty)"""
+    return sorted_percentile(sorted(values), pct)
+
+
+def sorted_percentile(ordered, pct):
+    """percentile() of an already sorted list, without sorting it again"""
+    if not ordered:
+        return None
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+class TurnTelemetry:
+    """
+    Spans and LLM token counts collected during one turn.
+
+    While `active()`, every LangChain run started from that context (also in
+    worker threads that copied it) reports its timing and usage here, and
+    `span()` / `record_error()` / `record_retry()` write to it.
+    """
+
+    def __init__(self):
+        self.spans = {}
+        self.tokens = {}  # component -> {"input": n, "output": n}
+        self.llm_calls = 0
+        self.retries = 0
+        self.rate_limit_retries = 0
+        self.failovers = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.errors = []
+        self.near_duplicate = None
+        self.routes = []
+        self._lock = threading.Lock()
+        self._callback = None
+
+    def add_span(self, name, seconds):
+        with self._lock:
+            self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def add_usage(self, component, input_tokens, output_tokens):
+        with self._lock:
+            counts = self.tokens.setdefault(component, {"input": 0, "output": 0})
+            counts["input"] += input_tokens
+            counts["output"] += output_tokens
+            self.llm_calls += 1
+
+    def add_error(self, component, error):
+        with self._lock:
+            self.errors.append(f"{component}: {error}")
+
+    def add_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def add_call(self, queue_seconds, retries, failovers):
+        with self._lock:
+            if queue_seconds:
+                self.spans["queue"] = self.spans.get("queue", 0.0) + queue_seconds
+            self.rate_limit_retries += retries
+            self.failovers += failovers
+
+    def add_hedge(self, won):
+        with self._lock:
+            self.hedges += 1
+            self.hedge_wins += int(won)
+
+    def set_near_duplicate(self, match):
+        with self._lock:
+            self.near_duplicate = match
+
+    def add_route(self, route, price, baseline_price):
+        with self._lock:
+            self.routes.append(dict(route, _prices=(price, baseline_price)))
+
+    def complete_route(self, component, seconds, input_tokens, output_tokens):
+        """Latency, tokens and cost of the latest routed call of `component`"""
+        with self._lock:
+            for route in reversed(self.routes):
+                if route["component"] == component and "_prices" in route:
+                    price, baseline_price = route.pop("_prices")
+                    route.update(seconds=round(seconds, 4), input_tokens=input_tokens, output_tokens=output_tokens,
+                                 cost_usd=_cost(price, input_tokens, output_tokens),
+                                 baseline_usd=_cost(baseline_price, input_tokens, output_tokens))
+                    return
+
+    @property
+    def callback(self):
+        """LangChain callback handler feeding this telemetry"""
+        if self._callback is None:
+            self._callback = _get_callback_class()(self)
+        return self._callback
+
+    @contextmanager
+    def active(self):
+        """Make this the current turn's telemetry for the enclosed block"""
+        _register_hook()
+        token = _current.set(self.callback)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+    def as_dict(self):
+        with self._lock:
+            data = {
+                "spans": {name: round(seconds, 4) for name, seconds in self.spans.items()},
+                "tokens": {component: dict(counts) for component, counts in self.tokens.items()},
+                "llm_calls": self.llm_calls,
+                "retries": self.retries,
+                "rate_limit_retries": self.rate_limit_retries,
+                "failovers": self.failovers,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "errors": list(self.errors)
+            }
+            if self.near_duplicate:
+                data["near_duplicate"] = dict(self.near_duplicate)
+            if self.routes:
+                data["routes"] = [{key: value for key, value in route.items() if key != "_prices"}
+                                  for route in self.routes]
+            return data
+
+
+def _cost(price, input_tokens, output_tokens):
+    # Prices are USD per million tokens
+    return round((input_tokens * price[0] + output_tokens * price[1]) / 1e6, 8)
+
+
+def _current_telemetry():
+    handler = _current.get()
+    return handler.telemetry if handler is not None else None
+
+
+@contextmanager
+def span(name):
+    """Time a block into the current turn's telemetry (no-op outside a turn)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        telemetry = _current_telemetry()
+        if telemetry is not None:
+            telemetry.add_span(name, time.perf_counter() - start)
+
+
+def record_error(component, error):
+    telemetry = _current_telemetry()
+    if telemetry is not None:
+        telemetry.add_error(component, error)
+
+
+def record_retry():
+    telemetry = _current_telemetry()
+    if telemetry is not None:
+        telemetry.add_retry()
+
+
+def record_call(queue_seconds, retries, failovers):
+    """Scheduler stats of one LLM call (queueing delay, retries, failovers)"""
+    telemetry = _current_telemetry()
+    if telemetry is not None:
+        telemetry.add_call(queue_seconds, retries, failovers)
+
+
+def record_hedge(won):
+    """A hedged LLM call, and whether the duplicate answered first"""
+    telemetry = _current_telemetry()
+    if telemetry is not None:
+        telemetry.add_hedge(won)
+
+
+def record_near_duplicate(similarity, matched_score, reused, flagged):
+    """The answer closely matches an indexed answer (see interviewer/answer_index.py)"""
+    telemetry = _current_telemetry()
+    if telemetry is not None:
+        telemetry.set_near_duplicate({"similarity": similarity, "matched_score": matched_score,
+                                      "reused": reused, "flagged": flagged})
+
+
+def record_route(route, price, baseline_price):
+    """
+    A model routing decision (see interviewer/routing.py). Its latency and
+    tokens are filled in when the routed call ends; `price` and
+    `baseline_price` are USD per million (input, output) tokens of the
+    routed model and of the model it replaces.
+    """
+    telemetry = _current_telemetry()
+    if telemetry is not None:
+        telemetry.add_route(route, price, baseline_price)
+
+
+def _register_hook():
+    # Attach the current turn's handler to every LangChain run in its context
+    global _hook_registered
+    with _hook_lock:
+        if not _hook_registered:
+            from langchain_core.tracers.context import register_configure_hook
+            register_configure_hook(_current, inheritable=True)
+            _hook_registered = True
+
+
+def _get_callback_class():
+    # Built on first use so importing this module does not load LangChain
+    global _callback_class
+    if _callback_class is not None:
+        return _callback_class
+    from langchain_core.callbacks.base import BaseCallbackHandler
+
+    class TelemetryCallback(BaseCallbackHandler):
+        """Records prompt build, LLM latency, first token and usage per run"""
+
+        # Cheap and thread-safe, so async runs call it inline instead of in an executor
+        run_inline = True
+
+        def __init__(self, telemetry):
+            self.telemetry = telemetry
+            self._runs = {}
+
+        def on_chain_start(self, serialized, inputs, *, run_id, **kwargs):
+            if kwargs.get("name") == PROMPT_BUILD_RUN:
+                self._runs[run_id] = time.perf_counter()
+
+        def on_chain_end(self, outputs, *, run_id, **kwargs):
+            start = self._runs.pop(run_id, None)
+            if start is not None:
+                self.telemetry.add_span("prompt_build", time.perf_counter() - start)
+
+        def on_chain_error(self, error, *, run_id, **kwargs):
+            self._runs.pop(run_id, None)
+
+        def on_chat_model_start(self, serialized, messages, *, run_id, tags=None, **kwargs):
+            component = SCORING_TAG if tags and SCORING_TAG in tags else "followup"
+            self._runs[run_id] = [time.perf_counter(), component, None]
+
+        def on_llm_new_token(self, token, *, run_id, **kwargs):
+            run = self._runs.get(run_id)
+            if run is not None and run[2] is None and token:
+                run[2] = time.perf_counter()
+
+        def _finish(self, run_id):
+            run = self._runs.pop(run_id, None)
+            if run is None:
+                return None, 0.0
+            start, component, first_token = run
+            seconds = time.perf_counter() - start
+            # Evaluator time is reported as the "scoring" span of the turn
+            if component != SCORING_TAG:
+                self.telemetry.add_span("network", seconds)
+                if first_token is not None:
+                    self.telemetry.add_span("first_token", first_token - start)
+            return component, seconds
+
+        def on_llm_end(self, response, *, run_id, **kwargs):
+            component, seconds = self._finish(run_id)
+            if component is None:
+                return
+            input_tokens = output_tokens = 0
+            for generations in response.generations:
+                for generation in generations:
+                    usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                    input_tokens += usage.get("input_tokens", 0)
+                    output_tokens += usage.get("output_tokens", 0)
+            self.telemetry.add_usage(component, input_tokens, output_tokens)
+            self.telemetry.complete_route(component, seconds, input_tokens, output_tokens)
+
+        def on_llm_error(self, error, *, run_id, **kwargs):
+            component, seconds = self._finish(run_id)
+            if component is None:
+                return
+            # Usage is reported at the end of a stream, so a closed one costs nothing here
+            self.telemetry.complete_route(component, seconds, 0, 0)
+            # A stream closed after the question is complete is not an error
+            if not isinstance(error, GeneratorExit):
+                self.telemetry.add_error(component, error)
+
+    _callback_class = TelemetryCallback
+    return _callback_class
+
+
+# Per-turn counters summed into the report's performance section
+COUNTERS = ["llm_calls", "retries", "rate_limit_retries", "failovers", "hedges", "hedge_wins"]
+
+
+class TelemetryAggregate:
+    """
+    Running totals of per-turn telemetry dicts. Each turn is added once and
+    span values are kept sorted, so `summary()` does not rescan the turns.
+    """
+
+    def __init__(self):
+        self.turns_measured = 0
+        self.span_values = {}  # span -> sorted seconds (array of doubles)
+        self.span_totals = {}
+        self.tokens = {}
+        self.counters = {name: 0 for name in COUNTERS}
+        self.errors = 0
+        self.routing = None
+
+    def add(self, turn):
+        if not turn:
+            return
+        self.turns_measured += 1
+        for name, seconds in turn["spans"].items():
+            bisect.insort(self.span_values.setdefault(name, array("d")), seconds)
+            self.span_totals[name] = self.span_totals.get(name, 0.0) + seconds
+        for component, counts in turn["tokens"].items():
+            total = self.tokens.setdefault(component, {"input": 0, "output": 0})
+            total["input"] += counts["input"]
+            total["output"] += counts["output"]
+        for name in COUNTERS:
+            self.counters[name] += turn.get(name, 0)
+        self.errors += len(turn["errors"])
+        for route in turn.get("routes", ()):
+            self._add_route(route)
+
+    def _add_route(self, route):
+        if self.routing is None:
+            self.routing = {"calls": 0, "fast": 0, "strong": 0, "re_evaluations": 0, "by_reason": {},
+                            "seconds": {"fast": 0.0, "strong": 0.0}, "cost_usd": 0.0, "baseline_usd": 0.0}
+        routing = self.routing
+        routing["calls"] += 1
+        routing[route["tier"]] += 1
+        routing["re_evaluations"] += int(route.get("re_evaluation", False))
+        routing["by_reason"][route["reason"]] = routing["by_reason"].get(route["reason"], 0) + 1
+        routing["seconds"][route["tier"]] += route.get("seconds", 0.0)
+        routing["cost_usd"] += route.get("cost_usd", 0.0)
+        routing["baseline_usd"] += route.get("baseline_usd", 0.0)
+
+    def summary(self):
+        """The report's performance section (None when no turn was measured)"""
+        if not self.turns_measured:
+            return None
+        spans = {}
+        for name in SPANS:
+            values = self.span_values.get(name)
+            if values:
+                spans[name] = {
+                    "p50": sorted_percentile(values, 50),
+                    "p95": sorted_percentile(values, 95),
+                    "total": round(self.span_totals[name], 4)
+                }
+        all_tokens = sum(c["input"] + c["output"] for c in self.tokens.values())
+        return dict(
+            {
+                "turns_measured": self.turns_measured,
+                "spans_seconds": spans,
+                "tokens": {component: dict(counts) for component, counts in self.tokens.items()},
+                "tokens_per_turn": round(all_tokens / self.turns_measured, 1)
+            },
+            **self.counters,
+            errors=self.errors,
+            **({"routing": self._routing_summary()} if self.routing else {})
+        )
+
+    def _routing_summary(self):
+        routing = self.routing
+        return {
+            "calls": routing["calls"],
+            "fast": routing["fast"],
+            "strong": routing["strong"],
+            "re_evaluations": routing["re_evaluations"],
+            "by_reason": dict(routing["by_reason"]),
+            # Mean latency of the calls each tier served
+            "mean_seconds": {tier: round(total / routing[tier], 4)
+                             for tier, total in routing["seconds"].items() if routing[tier]},
+            "cost_usd": round(routing["cost_usd"], 6),
+            "baseline_usd": round(routing["baseline_usd"], 6),
+            "saved_usd": round(routing["baseline_usd"] - routing["cost_usd"], 6)
+        }
+
+
+def summarize_telemetry(turn_telemetry):
+    """
+    Aggregate per-turn telemetry dicts for the report's Performance section.
+    Returns None when no turn was measured.
+    """
+    aggregate = TelemetryAggregate()
+    for turn in turn_telemetry:
+        aggregate.add(turn)
+    return aggregate.summary()
+
+
+def _report_labels(report):
+    summary = report["candidate_summary"]
+    return {"candidate": summary["name"], "role": summary["position"]}
+
+
+def telemetry_jsonl(reports):
+    """One JSON line per measured turn of the given reports"""
+    lines = []
+    for report in reports:
+        labels = _report_labels(report)
+        for i, turn in enumerate(report["transcript"], 1):
+            if turn.get("telemetry"):
+                lines.append(json.dumps(dict(labels, turn=i, dimension=turn.get("dimension"), **turn["telemetry"])))
+    return "\n".join(lines) + ("\n" if lines else "")
+
+
+def _label_text(labels):
+    escaped = (
+        (key, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels.items()
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+def prometheus_text(reports):
+    """Prometheus text exposition of the reports' turn telemetry"""
+    metrics = {
+        "interview_turns_total": ("counter", "Measured interview turns", []),
+        "interview_turn_span_seconds": ("summary", "Time spent per turn in each span", []),
+        "interview_llm_tokens_total": ("counter", "LLM tokens by component and direction", []),
+        "interview_llm_calls_total": ("counter", "LLM calls", []),
+        "interview_llm_retries_total": ("counter", "Retried LLM calls", []),
+        "interview_llm_rate_limit_retries_total": ("counter", "LLM calls retried after rate limits or transient errors", []),
+        "interview_llm_failovers_total": ("counter", "LLM calls served by a failover model", []),
+        "interview_llm_hedges_total": ("counter", "LLM calls that sent a hedged duplicate", []),
+        "interview_llm_hedge_wins_total": ("counter", "Hedged LLM calls answered first by the duplicate", []),
+        "interview_llm_errors_total": ("counter", "Failed LLM calls", []),
+        "interview_llm_routed_calls_total": ("counter", "LLM calls by routed model tier", []),
+        "interview_llm_cost_usd_total": ("counter", "Estimated cost of routed LLM calls", []),
+        "interview_llm_baseline_cost_usd_total": ("counter", "Estimated cost of the same calls on the strong model", [])
+    }
+    for report in reports:
+        labels = _report_labels(report)
+        performance = report.get("performance") or summarize_telemetry(
+            [turn.get("telemetry") for turn in report["transcript"]]
+        )
+        if not performance:
+            continue
+        turns = [turn["telemetry"] for turn in report["transcript"] if turn.get("telemetry")]
+        metrics["interview_turns_total"][2].append(("", labels, performance["turns_measured"]))
+        for name, stats in performance["spans_seconds"].items():
+            span_labels = dict(labels, span=name)
+            samples = metrics["interview_turn_span_seconds"][2]
+            samples.append(("", dict(span_labels, quantile="0.5"), stats["p50"]))
+            samples.append(("", dict(span_labels, quantile="0.95"), stats["p95"]))
+            samples.append(("_sum", span_labels, stats["total"]))
+            samples.append(("_count", span_labels, sum(1 for t in turns if name in t["spans"])))
+        for component, counts in performance["tokens"].items():
+            for direction in ("input", "output"):
+                metrics["interview_llm_tokens_total"][2].append(
+                    ("", dict(labels, component=component, direction=direction), counts[direction])
+                )
+        metrics["interview_llm_calls_total"][2].append(("", labels, performance["llm_calls"]))
+        metrics["interview_llm_retries_total"][2].append(("", labels, performance["retries"]))
+        metrics["interview_llm_rate_limit_retries_total"][2].append(("", labels, performance["rate_limit_retries"]))
+        metrics["interview_llm_failovers_total"][2].append(("", labels, performance["failovers"]))
+        metrics["interview_llm_hedges_total"][2].append(("", labels, performance.get("hedges", 0)))
+        metrics["interview_llm_hedge_wins_total"][2].append(("", labels, performance.get("hedge_wins", 0)))
+        metrics["interview_llm_errors_total"][2].append(("", labels, performance["errors"]))
+        routing = performance.get("routing")
+        if routing:
+            for tier in ("fast", "strong"):
+                metrics["interview_llm_routed_calls_total"][2].append(("", dict(labels, tier=tier), routing[tier]))
+            metrics["interview_llm_cost_usd_total"][2].append(("", labels, routing["cost_usd"]))
+            metrics["interview_llm_baseline_cost_usd_total"][2].append(("", labels, routing["baseline_usd"]))
+
+    lines = []
+    for name, (kind, help_text, samples) in metrics.items():
+        if not samples:
+            continue
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for suffix, labels, value in samples:
+            lines.append(f"{name}{suffix}{_label_text(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def export_telemetry(reports, jsonl_path=None, prometheus_path=None):
+    """Write turn telemetry as JSONL and/or a Prometheus textfile"""
+    if jsonl_path:
+        with open(jsonl_path, "w") as f:
+            f.write(telemetry_jsonl(reports))
+    if prometheus_path:
+        with open(prometheus_path, "w") as f:
+            f.write(prometheus_text(reports))
@@ -0,0 +1,157 @@
+import os
+import threading
+from pathlib import Path
+import yaml
+from .routing import RoutingPolicy
+
+# Default location of the interview templates (project root /templates)
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
+TEMPLATE_SUFFIXES = (".yaml", ".yml")
+DEFAULT_TEMPLATE = "AI_engineer.yaml"
+
+# Use libyaml's C loader when PyYAML was built with it
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+class TemplateError(ValueError):
+    """Raised when a template file is missing or malformed"""
+
+
+class CompiledTemplate:
+    """
+    Validated interview template flattened for O(1) navigation.
+
+    `questions[i]` is the i-th question of the interview and
+    `question_sections[i]` the index of its section in `sections`. Each
+    section records its name, weight, offset into `questions` and count.
+    `routing` is the template's model routing policy (see routing.py).
+    """
+
+    def __init__(self, name, data):
+        if not isinstance(data, dict):
+            raise TemplateError(f"{name}: template must be a mapping")
+        role = data.get("role")
+        if not isinstance(role, str) or not role.strip():
+            raise TemplateError(f"{name}: 'role' is required")
+        raw_sections = data.get("sections")
+        if not isinstance(raw_sections, list) or not raw_sections:
+            raise TemplateError(f"{name}: 'sections' must be a non-empty list")
+
+        self.name = name
+        self.role = role
+        self.duration_minutes = data.get("duration_minutes")
+        self.raw = data
+        self.sections = []
+        self.questions = []
+        self.question_sections = []
+
+        for section_idx, section in enumerate(raw_sections):
+            if not isinstance(section, dict):
+                raise TemplateError(f"{name}: section {section_idx + 1} must be a mapping")
+            questions = section.get("questions")
+            if not isinstance(questions, list) or not questions:
+                raise TemplateError(f"{name}: section {section_idx + 1} has no questions")
+            if not all(isinstance(q, str) and q.strip() for q in questions):
+                raise TemplateError(f"{name}: section {section_idx + 1} has a non-text question")
+            weight = section.get("weight", 1.0)
+            if not isinstance(weight, (int, float)) or weight < 0:
+                raise TemplateError(f"{name}: section {section_idx + 1} has an invalid weight")
+
+            # An unnamed lone section is "General", as the app has always shown it
+            default_name = "General" if len(raw_sections) == 1 else f"Section {section_idx + 1}"
+            self.sections.append({
+                "name": section.get("name", default_name),
+                "weight": float(weight),
+                "offset": len(self.questions),
+                "count": len(questions)
+            })
+            self.questions.extend(questions)
+            self.question_sections.extend([section_idx] * len(questions))
+
+        self.total_questions = len(self.questions)
+        self.total_weight = sum(section["weight"] for section in self.sections)
+        self.section_index = {section["name"]: i for i, section in enumerate(self.sections)}
+        try:
+            self.routing = RoutingPolicy.from_config(data.get("routing"))
+        except ValueError as e:
+            raise TemplateError(f"{name}: {e}")
+
+    def question_at(self, idx):
+        """Return (question, section_name) for a question index, or (None, None)"""
+        if 0 <= idx < self.total_questions:
+            return self.questions[idx], self.sections[self.question_sections[idx]]["name"]
+        return None, None
+
+    def section_questions(self, section_idx):
+        """Questions belonging to one section"""
+        section = self.sections[section_idx]
+        return self.questions[section["offset"]:section["offset"] + section["count"]]
+
+    def section_weight(self, section_name):
+        """Normalized weight of a section (weights sum to 1), 0 if unknown"""
+        idx = self.section_index.get(section_name)
+        if idx is None or not self.total_weight:
+            return 0.0
+        return self.sections[idx]["weight"] / self.total_weight
+
+
+class TemplateRegistry:
+    """
+    Discovers templates in a directory and caches each compiled template
+    keyed on its file mtime, so unchanged files are never re-parsed.
+    """
+
+    def __init__(self, directory=TEMPLATES_DIR):
+        self.directory = Path(directory)
+        self._compiled = {}  # name -> (mtime_ns, size, CompiledTemplate)
+        self._listing = (None, [])
+        self._lock = threading.Lock()
+
+    def list_templates(self):
+        """Names of all template files, re-scanned only when the directory changes"""
+        try:
+            mtime = self.directory.stat().st_mtime_ns
+        except FileNotFoundError:
+            return []
+        with self._lock:
+            if self._listing[0] != mtime:
+                names = sorted(
+                    entry.name for entry in os.scandir(self.directory)
+                    if entry.is_file() and entry.name.endswith(TEMPLATE_SUFFIXES)
+                )
+                self._listing = (mtime, names)
+            return list(self._listing[1])
+
+    def get(self, name):
+        """Return the compiled template for a file name"""
+        path = self.directory / name
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            raise TemplateError(f"Template '{name}' not found in {self.directory}")
+        with self._lock:
+            cached = self._compiled.get(name)
+            if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+                return cached[2]
+        with open(path, "r") as f:
+            try:
+                data = yaml.load(f, Loader=YAML_LOADER)
+            except yaml.YAMLError as e:
+                raise TemplateError(f"{name}: invalid YAML ({e})")
+        compiled = CompiledTemplate(name, data)
+        with self._lock:
+            self._compiled[name] = (stat.st_mtime_ns, stat.st_size, compiled)
+        return compiled
+
+
+_default_registry = None
+_default_lock = threading.Lock()
+
+
+def get_template_registry():
+    """Process-wide registry for the project's templates directory"""
+    global _default_registry
+    with _default_lock:
+        if _default_registry is None:
+            _default_registry = TemplateRegistry()
+        return _default_registry
@@ -0,0 +1,11 @@
+# Rough token accounting used to budget prompts without a tokenizer dependency
+
+# Average characters per token for English text on GPT/Llama style tokenizers
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    """Estimate the number of tokens in a piece of text"""
+    if not text:
+        return 0
+    return max(1, (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN)
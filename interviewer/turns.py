@@ -0,0 +1,401 @@
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from .hedging import DeadlineExceededError, deadline_at, get_hedger
+from .parsing import ResponseParser, parse_llm_response
+from .telemetry import TurnTelemetry
+
+# Default time (seconds) a turn may take before it is abandoned
+DEFAULT_TURN_TIMEOUT = 60
+# Every LLM call of a turn stops at the deadline; joining the calls gets
+# this much longer so a scoring call that gave up can still report None
+DEADLINE_GRACE_SECONDS = 1.0
+
+# Shared pool so the follow-up and the scoring call of a turn run side by side
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="interview-turn")
+
+
+def set_turn_workers(max_workers):
+    """
+    Resize the shared turn pool, e.g. when many interviews run at once.
+    Every turn worker makes its LLM call on the hedger's call pool, which
+    grows with it so calls do not queue into their deadline.
+    """
+    global _executor
+    previous = _executor
+    _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="interview-turn")
+    previous.shutdown(wait=False)
+    get_hedger().set_call_workers(max_workers)
+
+
+class TurnTimeoutError(TimeoutError):
+    """Raised when the LLM calls of a turn do not finish within the timeout"""
+
+
+class TurnResult:
+    """Joined outcome of one answered turn"""
+
+    def __init__(self, response_text, score, timings, question=None, evaluation=None, telemetry=None):
+        self.response_text = response_text
+        self.score = score
+        self.timings = timings
+        if question is None:
+            parse_start = time.perf_counter()
+            question, evaluation = parse_llm_response(response_text)
+            if telemetry is not None:
+                telemetry.add_span("parse", time.perf_counter() - parse_start)
+        self.question = question
+        self.evaluation = evaluation
+        self.telemetry = None
+        if telemetry is not None:
+            telemetry.add_span("total", timings["total_seconds"])
+            if timings.get("evaluation_seconds") is not None:
+                telemetry.add_span("scoring", timings["evaluation_seconds"])
+            self.telemetry = telemetry.as_dict()
+
+    def format_timings(self):
+        """Human readable summary of how long each call took"""
+        labels = [
+            ("first_token_seconds", "first token"),
+            ("followup_seconds", "follow-up"),
+            ("evaluation_seconds", "scoring"),
+            ("step_seconds", "combined step"),
+            ("total_seconds", "turn")
+        ]
+        return " | ".join(
+            f"{label} {self.timings[key]:.2f}s"
+            for key, label in labels
+            if self.timings.get(key) is not None
+        )
+
+
+def _timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def _submit(func, *args, **kwargs):
+    # Run in the pool with the caller's context so callbacks/tracing follow the call
+    context = contextvars.copy_context()
+    return _executor.submit(context.run, _timed, func, *args, **kwargs)
+
+
+def _timed_out(timeout):
+    return TurnTimeoutError(f"Turn did not complete within {timeout} seconds")
+
+
+def _split_timings(start, followup_seconds, evaluation_seconds, streamed=False, first_token_seconds=None):
+    # Timings of a turn with separate follow-up and scoring calls
+    timings = {}
+    if streamed:
+        timings["first_token_seconds"] = round(first_token_seconds, 3) if first_token_seconds is not None else None
+    timings.update({
+        "followup_seconds": round(followup_seconds, 3),
+        "evaluation_seconds": round(evaluation_seconds, 3),
+        "total_seconds": round(time.perf_counter() - start, 3)
+    })
+    return timings
+
+
+def run_turn(chain, chain_input, session_id, evaluate, timeout=DEFAULT_TURN_TIMEOUT):
+    """
+    Send the follow-up generation and the answer scoring at the same time
+    and wait for both, so a turn costs the slower call instead of the sum.
+
+    `evaluate` is a zero-argument callable returning the score. Both calls
+    run under a hard deadline of `timeout` seconds.
+    """
+    start = time.perf_counter()
+    telemetry = TurnTelemetry()
+    with telemetry.active(), deadline_at(time.monotonic() + timeout):
+        followup_future = _submit(
+            chain.invoke,
+            chain_input,
+            config={"configurable": {"session_id": session_id}}
+        )
+        score_future = _submit(evaluate)
+
+    try:
+        response, followup_seconds = followup_future.result(timeout=timeout + DEADLINE_GRACE_SECONDS)
+        remaining = max(0, timeout + DEADLINE_GRACE_SECONDS - (time.perf_counter() - start))
+        score, evaluation_seconds = score_future.result(timeout=remaining)
+    except (FutureTimeoutError, DeadlineExceededError):
+        followup_future.cancel()
+        score_future.cancel()
+        raise _timed_out(timeout)
+
+    return TurnResult(response.content, score, _split_timings(start, followup_seconds, evaluation_seconds),
+                      telemetry=telemetry)
+
+
+async def _atimed(awaitable):
+    start = time.perf_counter()
+    result = await awaitable
+    return result, time.perf_counter() - start
+
+
+async def _ajoin(telemetry, followup, evaluate, timeout):
+    """
+    Await the `followup` coroutine and `evaluate()` side by side under the
+    turn deadline: ((follow-up result, seconds), (score, seconds))
+    """
+    # Tasks copy the context here, so the deadline and telemetry follow them
+    with telemetry.active(), deadline_at(time.monotonic() + timeout):
+        followup = asyncio.ensure_future(_atimed(followup))
+        scoring = asyncio.ensure_future(_atimed(evaluate()))
+    try:
+        return await asyncio.wait_for(asyncio.gather(followup, scoring), timeout + DEADLINE_GRACE_SECONDS)
+    except (asyncio.TimeoutError, DeadlineExceededError):
+        raise _timed_out(timeout)
+    finally:
+        # No-op for finished calls; stops the other one when a call failed
+        followup.cancel()
+        scoring.cancel()
+
+
+async def arun_turn(chain, chain_input, session_id, evaluate, timeout=DEFAULT_TURN_TIMEOUT):
+    """
+    Async `run_turn` for an event loop: the follow-up (`chain.ainvoke`) and
+    the scoring call are awaited side by side, without worker threads.
+    `evaluate` is a zero-argument coroutine function returning the score.
+    """
+    start = time.perf_counter()
+    telemetry = TurnTelemetry()
+    followup = chain.ainvoke(chain_input, config={"configurable": {"session_id": session_id}})
+    (response, followup_seconds), (score, evaluation_seconds) = await _ajoin(telemetry, followup, evaluate, timeout)
+    return TurnResult(response.content, score, _split_timings(start, followup_seconds, evaluation_seconds),
+                      telemetry=telemetry)
+
+
+async def _astream_question(chain, chain_input, config, parser, on_text, start):
+    """
+    Stream the follow-up into `parser`, awaiting `on_text` with the question
+    text as it arrives; the generation stops once the question is complete.
+    Returns (response text, first token seconds).
+    """
+    first_token_seconds = None
+
+    async def emit(text):
+        nonlocal first_token_seconds
+        if text:
+            if first_token_seconds is None:
+                first_token_seconds = time.perf_counter() - start
+            await on_text(text)
+
+    try:
+        stream = chain.astream(chain_input, config=config)
+        chunk = await anext(stream, None)
+    except DeadlineExceededError:
+        raise
+    except Exception as e:
+        # Provider does not stream: fall back to the blocking path
+        print(f"Streaming unavailable, falling back to invoke: {e}")
+        response = await chain.ainvoke(chain_input, config=config)
+        parser.feed(response.content)
+        await emit(parser.finish())
+        return response.content, first_token_seconds
+
+    response_text = ""
+    try:
+        while chunk is not None:
+            response_text += chunk.content
+            await emit(parser.feed(chunk.content))
+            if parser.question_complete:
+                break
+            chunk = await anext(stream, None)
+    finally:
+        # Closing the stream stops the generation; the history wrapper still
+        # records the exchange with the text generated so far
+        await stream.aclose()
+    await emit(parser.finish())
+    return response_text, first_token_seconds
+
+
+async def astream_turn(chain, chain_input, session_id, evaluate, on_text, timeout=DEFAULT_TURN_TIMEOUT):
+    """
+    Async `StreamingTurn`: `on_text(text)` (a coroutine function) receives
+    the follow-up question as it is generated while the answer is scored
+    alongside. A slow `on_text` (e.g. a client reading slowly) holds back
+    only this turn. Returns the TurnResult.
+    """
+    start = time.perf_counter()
+    telemetry = TurnTelemetry()
+    parser = ResponseParser()
+    config = {"configurable": {"session_id": session_id}}
+    followup = _astream_question(chain, chain_input, config, parser, on_text, start)
+    ((response_text, first_token_seconds), followup_seconds), (score, evaluation_seconds) = await _ajoin(
+        telemetry, followup, evaluate, timeout
+    )
+
+    parse_start = time.perf_counter()
+    question, evaluation = parser.close()
+    telemetry.add_span("parse", time.perf_counter() - parse_start)
+    timings = _split_timings(start, followup_seconds, evaluation_seconds, streamed=True,
+                             first_token_seconds=first_token_seconds)
+    return TurnResult(response_text, score, timings, question=question, evaluation=evaluation,
+                      telemetry=telemetry)
+
+
+def run_step_turn(step_chain, chain_input, session_id, timeout=DEFAULT_TURN_TIMEOUT, fallback=None):
+    """
+    Combined mode: follow-up, evaluation and score from a single call.
+    If the model never produces a valid step, `fallback` (a zero-argument
+    callable returning a TurnResult, e.g. the split-mode turn) is used.
+    """
+    start = time.perf_counter()
+    telemetry = TurnTelemetry()
+    with telemetry.active(), deadline_at(time.monotonic() + timeout):
+        future = _submit(step_chain.invoke, chain_input, config={"configurable": {"session_id": session_id}})
+    try:
+        (step, response, attempts), step_seconds = future.result(timeout=timeout + DEADLINE_GRACE_SECONDS)
+    except (FutureTimeoutError, DeadlineExceededError):
+        future.cancel()
+        raise _timed_out(timeout)
+    except ValueError as e:
+        if fallback is None:
+            raise
+        print(f"Combined step failed, falling back to split mode: {e}")
+        return fallback()
+
+    timings = {
+        "step_seconds": round(step_seconds, 3),
+        "total_seconds": round(time.perf_counter() - start, 3),
+        "attempts": attempts
+    }
+    return TurnResult(response.content, step.score, timings, question=step.question, evaluation=step.evaluation,
+                      telemetry=telemetry)
+
+
+class StreamingTurn:
+    """
+    A turn whose follow-up is streamed to the caller while the answer is
+    scored in the background.
+
+    Iterate `question_stream()` to receive the QUESTION text as it is
+    generated (the EVALUATION part is withheld), then call `result()`.
+    The stream ends as soon as the question is complete; with
+    `cancel_after_question` the rest of the generation is abandoned.
+    Providers that fail to stream fall back to a blocking call. All LLM
+    calls stop at the turn deadline, so a stalled stream cannot block the
+    caller for longer than `timeout`.
+    """
+
+    def __init__(self, chain, chain_input, session_id, evaluate, timeout=DEFAULT_TURN_TIMEOUT,
+                 cancel_after_question=True):
+        self.chain = chain
+        self.chain_input = chain_input
+        self.session_id = session_id
+        self.telemetry = TurnTelemetry()
+        self.config = {"configurable": {"session_id": session_id}, "callbacks": [self.telemetry.callback]}
+        self.timeout = timeout
+        self.cancel_after_question = cancel_after_question
+        self.start = time.perf_counter()
+        self.deadline = time.monotonic() + timeout
+        with self.telemetry.active(), deadline_at(self.deadline):
+            self.score_future = _submit(evaluate)
+        self.parser = ResponseParser()
+        self.response_text = ""
+        self.first_token_seconds = None
+        self.followup_seconds = None
+        self.cancelled = False
+        self._started = False
+        self._stream = None
+
+    def _emit(self, text):
+        if text and self.first_token_seconds is None:
+            self.first_token_seconds = time.perf_counter() - self.start
+        return text
+
+    def _next_chunk(self):
+        # The LLM call starts on the first chunk; keep the turn deadline on it
+        try:
+            with deadline_at(self.deadline):
+                return next(self._stream, None)
+        except DeadlineExceededError:
+            raise _timed_out(self.timeout)
+
+    def question_stream(self):
+        """Yield the follow-up question text chunk by chunk"""
+        self._started = True
+        try:
+            self._stream = self.chain.stream(self.chain_input, config=self.config)
+            first_chunk = self._next_chunk()
+        except TurnTimeoutError:
+            raise
+        except Exception as e:
+            # Provider does not stream: fall back to the blocking path
+            print(f"Streaming unavailable, falling back to invoke: {e}")
+            self._stream = None
+            try:
+                with deadline_at(self.deadline):
+                    response = self.chain.invoke(self.chain_input, config=self.config)
+            except DeadlineExceededError:
+                raise _timed_out(self.timeout)
+            self.response_text = response.content
+            self.parser.feed(self.response_text)
+            question = self._emit(self.parser.finish())
+            self.followup_seconds = time.perf_counter() - self.start
+            if question:
+                yield question
+            return
+
+        chunk = first_chunk
+        while chunk is not None:
+            self.response_text += chunk.content
+            text = self._emit(self.parser.feed(chunk.content))
+            if text:
+                yield text
+            if self.parser.question_complete:
+                break
+            chunk = self._next_chunk()
+        else:
+            self._stream = None
+
+        if self._stream is not None and self.cancel_after_question:
+            self._cancel()
+        tail = self._emit(self.parser.finish() if self._stream is None else "")
+        if tail:
+            yield tail
+        if self._stream is None:
+            self.followup_seconds = time.perf_counter() - self.start
+
+    def _cancel(self):
+        # Closing the stream stops the generation; the history wrapper still
+        # records the exchange with the text generated so far
+        self._stream.close()
+        self._stream = None
+        self.cancelled = True
+
+    def result(self):
+        """Join the scoring call; call after the question stream is consumed"""
+        if not self._started:
+            for _ in self.question_stream():
+                pass
+        if self._stream is not None:
+            # Drain whatever the model still generates after the question
+            chunk = self._next_chunk()
+            while chunk is not None:
+                self.response_text += chunk.content
+                self.parser.feed(chunk.content)
+                chunk = self._next_chunk()
+            self._stream = None
+            self.parser.finish()
+        if self.followup_seconds is None:
+            self.followup_seconds = time.perf_counter() - self.start
+        parse_start = time.perf_counter()
+        question, evaluation = self.parser.close()
+        self.telemetry.add_span("parse", time.perf_counter() - parse_start)
+
+        remaining = max(0, self.timeout + DEADLINE_GRACE_SECONDS - (time.perf_counter() - self.start))
+        try:
+            score, evaluation_seconds = self.score_future.result(timeout=remaining)
+        except FutureTimeoutError:
+            self.score_future.cancel()
+            raise _timed_out(self.timeout)
+
+        timings = _split_timings(self.start, self.followup_seconds, evaluation_seconds, streamed=True,
+                                 first_token_seconds=self.first_token_seconds)
+        return TurnResult(self.response_text, score, timings, question=question, evaluation=evaluation,
+                          telemetry=self.telemetry)
@@ -0,0 +1,108 @@
+import json
+import os
+from pathlib import Path
+import streamlit as st
+from interviewer.analytics import ReportTable, iter_logged_reports
+from interviewer.export import iter_report_files
+from interviewer.session_log import get_session_log
+
+DEFAULT_REPORTS_DIR = "replay_reports"
+# Candidates offered in the picker (best weighted scores first)
+MAX_CANDIDATE_OPTIONS = 500
+
+
+@st.cache_data(show_spinner="Loading reports...", ttl=60)
+def load_report_table(directory, directory_mtime, include_logged, uploads):
+    """Columnar table of the reports; reloaded when the directory changes (or after the TTL)"""
+    reports = []
+    if directory and Path(directory).is_dir():
+        reports.append(iter_report_files(directory))
+    session_log = get_session_log() if include_logged else None
+    if session_log is not None:
+        reports.append(iter_logged_reports(session_log))
+    reports.append(json.loads(upload) for upload in uploads)
+    return ReportTable.from_reports(report for source in reports for report in source)
+
+
+def render_compare_view():
+    """Compare candidates across archived reports"""
+    st.header("📈 Compare Candidates")
+
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        directory = st.text_input("Reports directory", value=os.getenv("REPORTS_DIR", DEFAULT_REPORTS_DIR),
+                                  help="Folder of downloaded or replay report JSON files")
+    with col2:
+        include_logged = st.checkbox("Include logged interviews", value=True,
+                                     help="Finished interviews from the session log")
+    uploaded = st.file_uploader("Or upload report JSON files", type="json", accept_multiple_files=True)
+
+    try:
+        directory_mtime = os.stat(directory).st_mtime_ns if directory else None
+    except OSError:
+        directory_mtime = None
+    table = load_report_table(directory, directory_mtime, include_logged,
+                              tuple(file.getvalue().decode("utf-8") for file in uploaded or []))
+    if not len(table):
+        st.info("No reports found. Point to a folder of report JSON files or upload some.")
+        return
+
+    templates = ["All templates"] + [name or "(unknown template)" for name in table.templates]
+    choice = st.selectbox("Template", templates)
+    mask = table.rows(None if choice == templates[0] else table.templates[templates.index(choice) - 1])
+    summary = table.summary(mask, top=0)
+    if not summary["reports"]:
+        st.info("No reports for this template.")
+        return
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Reports", summary["reports"])
+    with col2:
+        st.metric("Mean Score", f"{summary['average_score']['mean']}/5")
+    with col3:
+        st.metric("Median Weighted", f"{summary['weighted_score']['p50']}/5")
+    with col4:
+        hires = summary["recommendations"]["Hire"] + summary["recommendations"]["Strong Hire"]
+        st.metric("Hire Rate", f"{hires / summary['reports']:.0%}")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("Score Distribution")
+        st.bar_chart([{"score": f"{level}★", "answers": count}
+                      for level, count in summary["score_distribution"].items()], x="score", y="answers")
+    with col2:
+        st.subheader("Dimension Percentiles")
+        st.dataframe([dict(dimension=name, **stats) for name, stats in summary["dimensions"].items()],
+                     hide_index=True)
+
+    st.subheader("Candidates")
+    search = st.text_input("Find candidate", placeholder="Name contains...")
+    if search:
+        options = [row for row in table.find(search).tolist() if mask[row]][:MAX_CANDIDATE_OPTIONS]
+    else:
+        weighted = table.weighted_scores()
+        selected = mask.nonzero()[0]
+        options = selected[(-weighted[selected]).argsort(kind="stable")[:MAX_CANDIDATE_OPTIONS]].tolist()
+    rows = st.multiselect(
+        "Compare", options, default=options[:3],
+        format_func=lambda row: f"{table.candidate[row]} ({table.date[row]}, {table.average_score[row]:.2f}/5)"
+    )
+    if not rows:
+        return
+
+    profiles = table.compare(rows)
+    st.dataframe([
+        dict({"candidate": profile["name"], "template": profile["template"], "date": profile["date"],
+              "average": profile["average_score"], "weighted": profile["weighted_score"],
+              "percentile": profile["percentile_rank"], "recommendation": profile["recommendation"]},
+             **{dimension: stats["score"] for dimension, stats in profile["dimensions"].items()})
+        for profile in profiles
+    ], hide_index=True)
+    st.bar_chart(
+        [{"dimension": dimension, "candidate": profile["name"], "percentile": stats["percentile_rank"]}
+         for profile in profiles for dimension, stats in profile["dimensions"].items()],
+        x="dimension", y="percentile", color="candidate", stack=False
+    )
+    st.caption("Percentiles rank each score against reports of the same template. Weighted scores use the "
+               "section weights of the template.")
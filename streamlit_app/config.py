@@ -1,9 +1,32 @@
+import sys
 import streamlit as st
-import yaml
+from interviewer.clients import LOCAL_MODELS, LOCAL_PROVIDER, register_api_key, warm_client
+from interviewer.scheduler import get_scheduler
+from interviewer.hedging import get_hedger
+from interviewer.score_cache import get_score_cache
+from interviewer.memory import HISTORY_STRATEGIES, DEFAULT_HISTORY_BUDGET
+from interviewer.session_store import get_session_store
+from interviewer.parsing import get_parse_stats
+from interviewer.routing import get_routing_stats
+from interviewer.interview_step import TURN_MODES
+from interviewer.turns import DEFAULT_TURN_TIMEOUT
+from interviewer.templates import DEFAULT_TEMPLATE, TemplateError, get_template_registry
+from interviewer.session_log import get_session_log, resume_history
+from interviewer.report import generate_report
+from interviewer.evaluator import evaluator_for
+
+INTERVIEW_VIEW = "Interview"
+COMPARE_VIEW = "Compare candidates"
+VIEWS = [INTERVIEW_VIEW, COMPARE_VIEW]
+
+
+def _option_index(options, value):
+    return options.index(value) if value in options else 0
 
 
 def load_sidebar_config():
     """Load all configuration from sidebar"""
+    view = st.sidebar.radio("View", VIEWS, horizontal=True)
     st.sidebar.header("⚙️ Configuration")
     
     # API Keys
@@ -20,41 +43,130 @@ def load_sidebar_config():
         help="Get your key from https://platform.openai.com"
     )
     
-    # LLM Selection
+    # Pre-open pooled connections as soon as a key is entered
+    warmed_keys = st.session_state.setdefault("warmed_keys", set())
+    for provider, key in (("Groq", groq_api_key), ("OpenAI", openai_api_key)):
+        if key and (provider, key) not in warmed_keys:
+            warm_client(provider, key)
+            # Known keys let calls fail over to this provider under rate limits
+            register_api_key(provider, key)
+            warmed_keys.add((provider, key))
+    
+    # LLM Selection (a resumed interview preselects the model it started with)
     st.sidebar.subheader("LLM Selection")
+    resumed = st.session_state.resumed_llm or {}
+    providers = ["Groq", "OpenAI", LOCAL_PROVIDER]
     llm_choice = st.sidebar.selectbox(
         "Choose LLM Provider",
-        ["Groq", "OpenAI"],
-        help="Select which LLM to use for interview"
+        providers,
+        index=_option_index(providers, resumed.get("provider")),
+        help="Select which LLM to use for interview. Local runs offline (fake model or recorded replay)."
     )
     
     # Model selection based on LLM choice
     if llm_choice == "Groq":
         groq_models = ["llama-3.1-8b-instant", "Gemma2-9b-It", "mixtral-8x7b-32768"]
-        selected_model = st.sidebar.selectbox("Groq Model", groq_models)
+        selected_model = st.sidebar.selectbox("Groq Model", groq_models,
+                                              index=_option_index(groq_models, resumed.get("model")))
         if not groq_api_key:
             st.sidebar.warning("⚠️ Groq API key is required")
+    elif llm_choice == LOCAL_PROVIDER:
+        selected_model = st.sidebar.selectbox("Local Model", LOCAL_MODELS,
+                                              index=_option_index(LOCAL_MODELS, resumed.get("model")))
     else:
         openai_models = ["gpt-4o-mini", "gpt-4", "gpt-3.5-turbo"]
-        selected_model = st.sidebar.selectbox("OpenAI Model", openai_models)
+        selected_model = st.sidebar.selectbox("OpenAI Model", openai_models,
+                                              index=_option_index(openai_models, resumed.get("model")))
         if not openai_api_key:
             st.sidebar.warning("⚠️ OpenAI API key is required")
+        elif evaluator_for(llm_choice, selected_model)[0] == llm_choice:
+            st.sidebar.caption(f"No Groq API key: answers are scored with {selected_model}")
     
     # Interview settings
     st.sidebar.subheader("Interview Settings")
     max_followups = st.sidebar.slider("Max Follow-ups per Question", 0, 3, 1)
+    turn_mode = st.sidebar.selectbox(
+        "Turn Mode",
+        TURN_MODES,
+        help="split: separate follow-up and scoring calls; combined: one structured call returns both"
+    )
+    stream_responses = st.sidebar.checkbox(
+        "Stream Follow-ups",
+        value=True,
+        help="Show follow-up questions token by token; falls back to a blocking call if the provider cannot stream"
+    )
+    history_strategy = st.sidebar.selectbox(
+        "History Strategy",
+        HISTORY_STRATEGIES,
+        help="full: replay the whole conversation; window: recent messages within the budget; "
+             "summary: rolling summary of earlier questions plus recent messages"
+    )
+    history_budget = st.sidebar.slider(
+        "History Token Budget", 250, 4000, DEFAULT_HISTORY_BUDGET, step=250,
+        disabled=history_strategy == "full"
+    )
+    turn_deadline = st.sidebar.slider(
+        "Turn Deadline (seconds)", 5, 120, DEFAULT_TURN_TIMEOUT, step=5,
+        help="Every LLM call of a turn stops here; a turn that misses it can be retried"
+    )
+    cache_stats = get_score_cache().stats()
+    st.sidebar.caption(
+        f"Score cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+        f"({cache_stats['disk_entries']} stored)"
+    )
+    # The answer index (and numpy) loads with the first scored answer; until
+    # then it has no stats, and importing it here would slow cold start
+    if "interviewer.answer_index" in sys.modules:
+        from interviewer.answer_index import loaded_answer_index
+        answer_index = loaded_answer_index()
+        if answer_index is not None:
+            index_stats = answer_index.stats()
+            st.sidebar.caption(
+                f"Answer index: {index_stats['answers']} answers / {index_stats['questions']} questions | "
+                f"{index_stats['reused']} scores reused, {index_stats['flagged']} flagged"
+            )
+    parse_stats = get_parse_stats()
+    st.sidebar.caption(
+        f"Reply parsing: {parse_stats['failures']} failed / {parse_stats['responses']} "
+        f"({parse_stats['recovered']} recovered)"
+    )
+    scheduler_stats = get_scheduler().stats()
+    st.sidebar.caption(
+        f"LLM calls: {scheduler_stats['calls']} | queued {scheduler_stats['queue_seconds']:.1f}s | "
+        f"{scheduler_stats['retries']} retries | {scheduler_stats['failovers']} failovers"
+    )
+    hedge_stats = get_hedger().stats()
+    st.sidebar.caption(
+        f"Hedged: {hedge_stats['hedge_rate']:.1%} of calls ({hedge_stats['hedge_wins']} won, "
+        f"~{hedge_stats['latency_saved_seconds']:.1f}s saved) | {hedge_stats['deadline_exceeded']} deadline misses"
+    )
+    routing_stats = get_routing_stats()
+    st.sidebar.caption(
+        f"Model routing: {routing_stats['fast']} fast / {routing_stats['strong']} strong calls | "
+        f"{routing_stats['re_evaluated']} re-evaluated"
+    )
+    store_stats = get_session_store().stats()
+    st.sidebar.caption(
+        f"Sessions: {store_stats['resident_sessions']} resident "
+        f"(~{store_stats['approx_bytes'] / 1024:.0f} KB)"
+    )
     
     # Load template
     st.sidebar.subheader("Interview Template")
+    registry = get_template_registry()
+    template_files = registry.list_templates()
+    # A resumed interview keeps the template it was started with
+    selected_template = st.session_state.template_file or DEFAULT_TEMPLATE
     template_file = st.sidebar.selectbox(
         "Select Template",
-        ["AI_engineer.yaml"]
+        template_files,
+        index=template_files.index(selected_template) if selected_template in template_files else 0,
+        disabled=st.session_state.interview_started
     )
     
     try:
-        with open(f"templates/{template_file}", "r") as f:
-            template = yaml.safe_load(f)
-    except Exception as e:
+        template = registry.get(template_file)
+    except TemplateError as e:
         st.sidebar.error(f"Error loading template: {e}")
         st.stop()
     
@@ -64,7 +176,13 @@ def load_sidebar_config():
         "llm_choice": llm_choice,
         "selected_model": selected_model,
         "max_followups": max_followups,
-        "template": template
+        "stream_responses": stream_responses,
+        "turn_mode": turn_mode,
+        "history_strategy": history_strategy,
+        "history_budget": history_budget,
+        "turn_deadline": turn_deadline,
+        "template": template,
+        "view": view
     }
 
 
@@ -80,13 +198,63 @@ def initialize_session_state():
         st.session_state.messages = []
     if "chain" not in st.session_state:
         st.session_state.chain = None
-    if "session_store" not in st.session_state:
-        st.session_state.session_store = {}
+    if "step_chain" not in st.session_state:
+        st.session_state.step_chain = None
+    if "history_strategy" not in st.session_state:
+        st.session_state.history_strategy = None
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = None
     if "report" not in st.session_state:
         st.session_state.report = None
     if "interview_complete" not in st.session_state:
         st.session_state.interview_complete = False
     if "followup_count" not in st.session_state:
         st.session_state.followup_count = 0
+    if "asked_question" not in st.session_state:
+        # The follow-up being answered; None while the template question is
+        st.session_state.asked_question = None
+    if "turn_timings" not in st.session_state:
+        st.session_state.turn_timings = []
     if "max_followups_value" not in st.session_state:
         st.session_state.max_followups_value = 1
+    if "failed_turn" not in st.session_state:
+        st.session_state.failed_turn = None
+    if "template_file" not in st.session_state:
+        st.session_state.template_file = None
+    if "resumed_llm" not in st.session_state:
+        st.session_state.resumed_llm = None
+    if "resume_checked" not in st.session_state:
+        st.session_state.resume_checked = False
+        resume_from_link()
+
+
+def resume_from_link():
+    """
+    Rebuild an interview from the session log when the page is opened with
+    ?session=<id>, e.g. after a server restart or from a saved link
+    """
+    session_id = st.query_params.get("session")
+    session_log = get_session_log()
+    if not session_id or session_log is None:
+        return
+    state = session_log.recover(session_id)
+    if state is None:
+        st.warning("This interview link could not be resumed; starting fresh.")
+        st.query_params.clear()
+        return
+    resume_history(session_id, state)
+    st.session_state.session = state.session
+    st.session_state.session_id = session_id
+    st.session_state.template_file = state.meta.get("template")
+    st.session_state.resumed_llm = {"provider": state.meta.get("provider"), "model": state.meta.get("model")}
+    st.session_state.interview_started = True
+    st.session_state.current_question_idx = state.question_idx
+    st.session_state.followup_count = state.followup_count
+    st.session_state.asked_question = state.pending_followup
+    st.session_state.messages = [
+        message if message["role"] == "user" else {"role": "assistant", "content": f"**Follow-up:** {message['content']}"}
+        for message in state.messages
+    ]
+    st.session_state.interview_complete = state.complete
+    if state.complete:
+        st.session_state.report = generate_report(state.session)
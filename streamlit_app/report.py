@@ -1,6 +1,52 @@
 import streamlit as st
-import json
 from datetime import datetime
+from interviewer.session_store import get_session_store
+from interviewer.telemetry import prometheus_text
+from interviewer.export import export_file_name, export_report
+
+# Report download formats: label -> (export format, compression, mime type)
+DOWNLOAD_FORMATS = {
+    "JSON": ("json", None, "application/json"),
+    "NDJSON (gzip)": ("ndjson", "gzip", "application/gzip")
+}
+
+
+def format_score(score):
+    return "unscored (evaluator failed)" if score is None else f"{score}/5"
+
+
+def get_transcript_markdown(report):
+    """Render the transcript to markdown once per finished report"""
+    cached = st.session_state.get("report_transcript")
+    if cached and cached[0] is report:
+        return cached[1]
+    blocks = []
+    for i, turn in enumerate(report["transcript"], 1):
+        blocks.append(
+            f"**Q{i}:** {turn['question']}\n\n"
+            f"**A:** {turn['answer']}\n\n"
+            f"*Score: {format_score(turn['score'])} | Dimension: {turn.get('dimension', 'N/A')}*"
+        )
+    transcript = "\n\n---\n\n".join(blocks)
+    st.session_state.report_transcript = (report, transcript)
+    return transcript
+
+
+def get_report_download(report, download_format="JSON"):
+    """
+    Serialize a finished report once per download format and reuse the
+    result on every rerun. Returns (data, file_name).
+    """
+    cached = st.session_state.get("report_download")
+    if not cached or cached[0] is not report:
+        cached = (report, {})
+        st.session_state.report_download = cached
+    if download_format not in cached[1]:
+        fmt, compression, _ = DOWNLOAD_FORMATS[download_format]
+        stem = f"interview_report_{report['candidate_summary']['name']}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        cached[1][download_format] = (export_report(report, fmt, compression),
+                                      export_file_name(stem, fmt, compression))
+    return cached[1][download_format]
 
 
 def render_report(report):
@@ -33,6 +79,8 @@ def render_report(report):
         with col3:
             stats = report["summary_statistics"]
             st.metric("Highest Score", f"{stats['highest_score']}/5")
+            if stats.get("unscored_turns"):
+                st.caption(f"⚠️ {stats['unscored_turns']} answer(s) could not be scored and are excluded")
     
     # Dimension Scores
     if report["dimension_scores"]:
@@ -63,18 +111,56 @@ def render_report(report):
                 st.info(f"**A:** {quote['quote']}")
                 st.caption(f"Score: {quote['score']}/5 - {quote['significance']}")
     
-    # Full Transcript
+    # Near-duplicates of earlier candidates' answers (older reports have none)
+    if report.get("similar_answers"):
+        with st.expander("🔁 Near-Duplicate Answers"):
+            for i, similar in enumerate(report["similar_answers"], 1):
+                st.write(f"**{i}. {similar['question']}**")
+                st.caption(similar["excerpt"])
+                reused = " (score reused)" if similar["score_reused"] else ""
+                st.caption(f"{similar['similarity']:.0%} similar to an earlier answer scored "
+                           f"{similar['matched_score']}/5{reused}")
+    
+    # Performance (per-turn spans and tokens)
+    performance = report.get("performance")
+    if performance:
+        with st.expander("⚡ Performance"):
+            spans = performance["spans_seconds"]
+            cols = st.columns(len(spans))
+            for col, (span_name, span_stats) in zip(cols, spans.items()):
+                with col:
+                    st.metric(span_name.replace("_", " ").title(), f"{span_stats['p50']:.2f}s",
+                              help=f"p50 per turn; p95 {span_stats['p95']:.2f}s")
+            st.caption(
+                f"{performance['turns_measured']} turns | {performance['tokens_per_turn']} tokens/turn | "
+                f"{performance['llm_calls']} LLM calls | {performance['retries']} retries | "
+                f"{performance.get('hedges', 0)} hedged | {performance['errors']} errors"
+            )
+            routing = performance.get("routing")
+            if routing:
+                st.caption(
+                    f"Model routing: {routing['fast']} fast / {routing['strong']} strong calls | "
+                    f"{routing['re_evaluations']} re-evaluated | ${routing['cost_usd']:.4f} "
+                    f"vs ${routing['baseline_usd']:.4f} on the strong model (~${routing['saved_usd']:.4f} saved)"
+                )
+            st.download_button(
+                label="📈 Download Metrics (Prometheus)",
+                data=prometheus_text([report]),
+                file_name="interview_metrics.prom",
+                mime="text/plain"
+            )
+    
+    # Full Transcript (rendered as one memoized markdown block)
     with st.expander("📝 Full Transcript"):
-        for i, turn in enumerate(report["transcript"], 1):
-            st.write(f"**Q{i}:** {turn['question']}")
-            st.write(f"**A:** {turn['answer']}")
-            st.caption(f"Score: {turn['score']}/5 | Dimension: {turn.get('dimension', 'N/A')}")
-            st.divider()
+        st.markdown(get_transcript_markdown(report))
     
     # Download Report Button
     col1, col2 = st.columns(2)
     with col1:
         if st.button("🔄 Start New Interview"):
+            if st.session_state.session_id:
+                get_session_store().clear(st.session_state.session_id)
+            st.session_state.session_id = None
             st.session_state.interview_started = False
             st.session_state.interview_complete = False
             st.session_state.session = None
@@ -82,13 +168,24 @@ def render_report(report):
             st.session_state.messages = []
             st.session_state.current_question_idx = 0
             st.session_state.followup_count = 0
+            st.session_state.asked_question = None
+            st.session_state.turn_timings = []
+            st.session_state.report_download = None
+            st.session_state.report_transcript = None
+            st.session_state.chain = None
+            st.session_state.failed_turn = None
+            st.session_state.template_file = None
+            st.session_state.resumed_llm = None
+            st.query_params.clear()
             st.rerun()
     
     with col2:
-        report_json = json.dumps(report, indent=2, default=str)
+        download_format = st.radio("Download format", list(DOWNLOAD_FORMATS), horizontal=True,
+                                   label_visibility="collapsed")
+        report_data, file_name = get_report_download(report, download_format)
         st.download_button(
-            label="📥 Download Report (JSON)",
-            data=report_json,
-            file_name=f"interview_report_{report['candidate_summary']['name']}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-            mime="application/json"
+            label=f"📥 Download Report ({download_format})",
+            data=report_data,
+            file_name=file_name,
+            mime=DOWNLOAD_FORMATS[download_format][2]
         )
@@ -1,30 +1,39 @@
+import uuid
 import streamlit as st
 from interviewer.sessions import InterviewSession
-from .chain import build_interview_chain, parse_llm_response
-from interviewer.evaluator import evaluate_answer
+from interviewer.report import generate_report
+from .chain import get_interview_chains
+from interviewer.evaluator import evaluate_answer, evaluator_for, index_scored_answers
+from interviewer.turns import run_turn, run_step_turn, StreamingTurn
+from interviewer.session_log import get_session_log
+
+
+def log_event(event_type, **fields):
+    """Write an interview event to the session log (no-op when logging is off)"""
+    session_log = get_session_log()
+    if session_log is not None and st.session_state.session_id:
+        session_log.append(st.session_state.session_id, event_type, **fields)
+
+
+def finish_interview(config):
+    """Mark the interview complete, build the report and index the scored answers"""
+    st.session_state.interview_complete = True
+    st.session_state.report = generate_report(st.session_state.session)
+    _, evaluator_model = evaluator_for(config["llm_choice"], config["selected_model"])
+    index_scored_answers(st.session_state.session, evaluator_model, source=st.session_state.session_id)
 
 
 def get_next_question(template):
     """Get the next question from template"""
-    idx = st.session_state.current_question_idx
-    for section in template["sections"]:
-        for question in section["questions"]:
-            if idx == 0:
-                section_name = section.get("name", "General")
-                return question, section_name
-            idx -= 1
-    return None, None
+    return template.question_at(st.session_state.current_question_idx)
 
 
 def count_total_questions(template):
     """Count total questions in template"""
-    count = 0
-    for section in template["sections"]:
-        count += len(section["questions"])
-    return count
+    return template.total_questions
 
 
-def render_interview_header(template):
+def render_interview_header(template, config=None):
     """Render the interview header with candidate info and controls"""
     col1, col2, col3 = st.columns(3)
     
@@ -39,7 +48,7 @@ def render_interview_header(template):
     with col2:
         interview_role = st.selectbox(
             "Interview Role",
-            [template["role"]],
+            [template.role],
             disabled=st.session_state.interview_started
         )
     
@@ -47,27 +56,73 @@ def render_interview_header(template):
         if st.button("🚀 Start Interview", key="start_btn", disabled=st.session_state.interview_started or not candidate_name):
             st.session_state.interview_started = True
             st.session_state.session = InterviewSession(
-                role=template["role"],
-                candidate_name=candidate_name or "Anonymous"
+                role=template.role,
+                candidate_name=candidate_name or "Anonymous",
+                template=template.name
             )
+            st.session_state.session_id = f"streamlit-{uuid.uuid4().hex}"
+            st.session_state.template_file = template.name
+            log_event("start", role=template.role, candidate_name=st.session_state.session.candidate_name,
+                      template=template.name, start_time=st.session_state.session.start_time.isoformat(),
+                      provider=config["llm_choice"] if config else None,
+                      model=config["selected_model"] if config else None)
+            # The link resumes this interview after a restart
+            st.query_params["session"] = st.session_state.session_id
+            st.session_state.turn_timings = []
             st.session_state.current_question_idx = 0
             st.session_state.messages = []
             st.session_state.followup_count = 0
+            st.session_state.asked_question = None
             st.success(f"✅ Interview started for {candidate_name}!")
             st.rerun()
     
     return candidate_name
 
 
+def render_live_scoreboard(session):
+    """Partial report of the answers so far (cheap: built from running aggregates)"""
+    report = generate_report(session, include_transcript=False)
+    stats = report["summary_statistics"]
+    scored = session.scored_turns
+    with st.expander("📊 Live Scoreboard", expanded=scored > 0):
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Average Score", f"{report['average_score']:.2f}/5" if scored else "-")
+        with col2:
+            st.metric("Trending", report["overall_recommendation"] if scored else "-")
+        with col3:
+            st.metric("Scored Answers", scored,
+                      help=f"{stats['unscored_turns']} unscored" if stats["unscored_turns"] else None)
+        with col4:
+            st.metric("Highest / Lowest",
+                      f"{stats['highest_score']} / {stats['lowest_score']}" if scored else "-")
+        if report["dimension_scores"]:
+            st.caption(" | ".join(
+                f"{dimension}: {summary['average_score']:.2f} ({summary['count']})"
+                for dimension, summary in report["dimension_scores"].items()
+            ))
+
+
 def render_interview_interface(config, template):
     """Render the main interview interface"""
     if st.session_state.interview_started and not st.session_state.interview_complete:
         if st.session_state.chain is None:
-            st.session_state.chain = build_interview_chain(
-                config["llm_choice"],
-                config["groq_api_key"] if config["llm_choice"] == "Groq" else config["openai_api_key"],
-                config["selected_model"]
-            )
+            llm_api_key = config["groq_api_key"] if config["llm_choice"] == "Groq" else config["openai_api_key"]
+            try:
+                history_strategy, chain, step_chain = get_interview_chains(
+                    config["llm_choice"],
+                    llm_api_key,
+                    config["selected_model"],
+                    config["history_strategy"],
+                    config["history_budget"]
+                )
+            except ValueError as e:
+                # e.g. a resumed interview before the API key is entered again
+                st.warning(f"⚠️ {e}. Enter it in the sidebar to continue the interview.")
+                return
+            st.session_state.history_strategy = history_strategy
+            st.session_state.chain = chain
+            st.session_state.step_chain = step_chain if config["turn_mode"] == "combined" else None
             st.session_state.max_followups_value = config["max_followups"]
         
         # Progress indicator
@@ -77,15 +132,24 @@ def render_interview_interface(config, template):
         with progress_col1:
             st.progress(st.session_state.current_question_idx / total_questions, 
                        f"Progress: {st.session_state.current_question_idx}/{total_questions} questions")
+            first_tokens = sorted(
+                t["first_token_seconds"] for t in st.session_state.turn_timings
+                if t.get("first_token_seconds") is not None
+            )
+            if first_tokens:
+                st.caption(f"Median time to first follow-up token: {first_tokens[len(first_tokens) // 2]:.2f}s")
         
         with progress_col2:
             if st.button("🏁 End Interview"):
-                st.session_state.interview_complete = True
-                from interviewer.report import generate_report
-                st.session_state.report = generate_report(st.session_state.session)
+                log_event("complete")
+                finish_interview(config)
                 st.success("Interview completed!")
                 st.rerun()
         
+        render_live_scoreboard(st.session_state.session)
+        if get_session_log() is not None:
+            st.caption("🔗 This page's link resumes the interview, even after a server restart.")
+        
         st.divider()
         
         # Get current question
@@ -110,27 +174,77 @@ def render_interview_interface(config, template):
             # Chat input
             user_input = st.chat_input("Your answer...", key=f"chat_input_{st.session_state.current_question_idx}")
             
+            # A turn that failed keeps its answer so it can be resent
+            if not user_input and st.session_state.failed_turn:
+                failed_answer, failed_error = st.session_state.failed_turn
+                st.error(f"Error: {failed_error}. Your answer was kept.")
+                if st.button("🔁 Retry last answer"):
+                    user_input = failed_answer
+            
             if user_input:
+                st.session_state.failed_turn = None
                 # Add user message
                 st.session_state.messages.append({"role": "user", "content": user_input})
                 
                 try:
-                    # Get LLM response
-                    response = st.session_state.chain.invoke(
-                        {"input": user_input, "role": template["role"]},
-                        config={"configurable": {"session_id": "streamlit-session"}}
+                    # Get the follow-up and score the answer concurrently
+                    api_key = config["groq_api_key"] if config["llm_choice"] == "Groq" else config["openai_api_key"]
+                    chain_input = {"input": user_input, "role": template.role, "question": question,
+                                   "routing": template.routing}
+                    evaluator_provider, evaluator_model = evaluator_for(config["llm_choice"], config["selected_model"])
+                    evaluator_key = config["groq_api_key"] if evaluator_provider == "Groq" else api_key
+                    # Scored (and matched against the answer index) for the question actually asked
+                    asked_question = st.session_state.asked_question or question
+                    evaluate = lambda: evaluate_answer(user_input, evaluator_key, question=asked_question,
+                                                       provider=evaluator_provider, model=evaluator_model,
+                                                       routing=template.routing)
+                    
+                    split_turn = lambda: run_turn(
+                        st.session_state.chain, chain_input, st.session_state.session_id, evaluate,
+                        timeout=config["turn_deadline"]
                     )
                     
-                    response_text = response.content
-                    followup_question, _ = parse_llm_response(response_text)
+                    if st.session_state.step_chain is not None:
+                        # One structured call returns follow-up, evaluation and score
+                        turn = run_step_turn(
+                            st.session_state.step_chain, chain_input, st.session_state.session_id,
+                            timeout=config["turn_deadline"], fallback=split_turn
+                        )
+                    # Stream the follow-up only when it will actually be asked
+                    elif (config["stream_responses"] and
+                          st.session_state.followup_count < st.session_state.max_followups_value):
+                        streaming_turn = StreamingTurn(
+                            st.session_state.chain, chain_input, st.session_state.session_id, evaluate,
+                            timeout=config["turn_deadline"]
+                        )
+                        with chat_container:
+                            st.chat_message("user").write(user_input)
+                            st.chat_message("assistant").write_stream(streaming_turn.question_stream())
+                        turn = streaming_turn.result()
+                    else:
+                        turn = split_turn()
+                    st.session_state.turn_timings.append(turn.timings)
                     
-                    # Evaluate answer
-                    api_key = config["groq_api_key"] if config["llm_choice"] == "Groq" else config["openai_api_key"]
-                    score = evaluate_answer(user_input, api_key)
-                    st.session_state.session.add_turn(question, user_input, score, dimension=section_name)
+                    followup_question = turn.question
+                    score = turn.score
+                    st.session_state.session.add_turn(asked_question, user_input, score, dimension=section_name,
+                                                      telemetry=turn.telemetry)
+                    log_event("turn", question=asked_question, answer=user_input, score=score, dimension=section_name,
+                              telemetry=turn.telemetry)
                     
                     # Display score
-                    st.success(f"✓ Score: {score}/5")
+                    if score is None:
+                        st.warning("⚠️ This answer could not be scored; it is marked unscored in the report")
+                    else:
+                        st.success(f"✓ Score: {score}/5")
+                    prompt_stats = st.session_state.history_strategy.last_turn_stats(st.session_state.session_id)
+                    if prompt_stats:
+                        st.caption(
+                            f"⏱️ {turn.format_timings()} | prompt ~{prompt_stats['prompt_tokens']} tokens "
+                            f"(history {prompt_stats['history_tokens_sent']} of {prompt_stats['history_tokens_full']})"
+                        )
+                    else:
+                        st.caption(f"⏱️ {turn.format_timings()}")
                     
                     # Check if we should ask follow-up question based on limit
                     # Only ask follow-up if it's not empty and we haven't exceeded the limit
@@ -139,6 +253,8 @@ def render_interview_interface(config, template):
                         len(followup_question) > 10 and
                         st.session_state.followup_count < st.session_state.max_followups_value):
                         st.session_state.followup_count += 1
+                        st.session_state.asked_question = followup_question
+                        log_event("followup", question=followup_question)
                         st.session_state.messages.append({
                             "role": "assistant",
                             "content": f"**Follow-up:** {followup_question}"
@@ -149,21 +265,23 @@ def render_interview_interface(config, template):
                         st.session_state.current_question_idx += 1
                         st.session_state.messages = []
                         st.session_state.followup_count = 0
+                        st.session_state.asked_question = None
+                        log_event("advance", question_idx=st.session_state.current_question_idx)
                         
                         if st.session_state.current_question_idx >= total_questions:
-                            st.session_state.interview_complete = True
-                            from interviewer.report import generate_report
-                            st.session_state.report = generate_report(st.session_state.session)
+                            log_event("complete")
+                            finish_interview(config)
                             st.info("✅ All questions completed!")
                             st.rerun()
                         else:
                             st.rerun()
                             
                 except Exception as e:
-                    st.error(f"Error: {str(e)}")
+                    # Keep the answer out of the chat until it goes through, and offer a retry
+                    st.session_state.messages.pop()
+                    st.session_state.failed_turn = (user_input, str(e))
+                    st.rerun()
         else:
             if st.session_state.current_question_idx >= total_questions:
-                st.session_state.interview_complete = True
-                from interviewer.report import generate_report
-                st.session_state.report = generate_report(st.session_state.session)
+                finish_interview(config)
                 st.rerun()
@@ -0,0 +1,8 @@
+import os
+
+# Keep caches, indexes and logs in memory and the Local fake instant, before
+# any process-wide singleton reads its settings
+for name, value in (("SCORE_CACHE_PATH", ""), ("ANSWER_INDEX_PATH", ""), ("SESSION_LOG_DIR", ""),
+                    ("SESSION_STORE_PATH", ""), ("LOCAL_LLM_FIRST_TOKEN_SECONDS", "0"),
+                    ("LOCAL_LLM_TOKENS_PER_SECOND", "0")):
+    os.environ.setdefault(name, value)
@@ -0,0 +1,128 @@
+"""
+Report analytics: ReportTable percentiles, template-weighted scores and
+percentile ranks against plain-Python computations, the .npz round trip,
+and reports of logged interviews.
+"""
+import json
+import random
+import numpy as np
+import pytest
+from interviewer.analytics import ReportTable, iter_logged_reports
+from interviewer.report import generate_report
+from interviewer.session_log import SessionLog
+from interviewer.sessions import InterviewSession
+
+TEMPLATE = "AI_engineer.yaml"
+ROLE = "AI Engineer"
+# Section weights of templates/AI_engineer.yaml
+WEIGHTS = {"ML Basics": 0.4, "Applied AI & LLMs": 0.4, "Communication": 0.2}
+
+
+def make_report(name, scores, template=TEMPLATE, role=ROLE):
+    """Report of an interview with `scores` as (dimension, score) pairs"""
+    session = InterviewSession(role, candidate_name=name, template=template)
+    for index, (dimension, score) in enumerate(scores):
+        session.add_turn(f"Question {index}?", f"Answer {index}.", score, dimension=dimension)
+    # Through JSON, as reports are read from disk
+    return json.loads(json.dumps(generate_report(session, include_transcript=False)))
+
+
+def random_reports(count, seed=0):
+    rng = random.Random(seed)
+    reports = []
+    for index in range(count):
+        dimensions = rng.sample(sorted(WEIGHTS), rng.randint(1, 3))
+        scores = [(dimension, rng.randint(1, 5)) for dimension in dimensions for _ in range(rng.randint(1, 3))]
+        reports.append(make_report(f"Candidate {index}", scores))
+    return reports
+
+
+def dimension_average(report, dimension):
+    scores = report["dimension_scores"].get(dimension)
+    return scores["average_score"] if scores else None
+
+
+def test_dimension_percentiles_match_numpy_on_each_dimension():
+    reports = random_reports(50)
+    stats = ReportTable.from_reports(reports).dimension_percentiles(percentiles=(25, 50, 90))
+    assert sorted(stats) == sorted(WEIGHTS)
+    for dimension, result in stats.items():
+        values = [dimension_average(report, dimension) for report in reports
+                  if dimension_average(report, dimension) is not None]
+        assert result["reports"] == len(values)
+        assert result["mean"] == pytest.approx(np.mean(values), abs=0.01)
+        for pct in (25, 50, 90):
+            assert result[f"p{pct}"] == pytest.approx(np.percentile(values, pct), abs=0.01)
+
+
+def test_weighted_scores_use_the_template_section_weights():
+    reports = random_reports(30, seed=1)
+    weighted = ReportTable.from_reports(reports).weighted_scores()
+    for report, score in zip(reports, weighted):
+        present = {dimension: dimension_average(report, dimension) for dimension in WEIGHTS
+                   if dimension_average(report, dimension) is not None}
+        expected = sum(WEIGHTS[d] * s for d, s in present.items()) / sum(WEIGHTS[d] for d in present)
+        assert score == pytest.approx(expected, abs=1e-4)
+
+
+def test_weighted_scores_fall_back_by_position_then_to_the_average():
+    scores = [("ML Basics", 5), ("Communication", 1)]
+    table = ReportTable.from_reports([
+        make_report("Named", scores),
+        make_report("By position", scores, template=None),
+        make_report("Unknown", scores, template=None, role="Chef"),
+        make_report("No weighted dimension", [("Cooking", 4)])
+    ])
+    expected = (0.4 * 5 + 0.2 * 1) / 0.6
+    assert table.weighted_scores().tolist() == pytest.approx([expected, expected, 3.0, 4.0])
+
+
+def test_percentile_ranks_count_ties_as_half_within_a_template():
+    table = ReportTable.from_reports([
+        make_report("A", [("ML Basics", 1)]),
+        make_report("B", [("ML Basics", 3)]),
+        make_report("C", [("ML Basics", 3)]),
+        make_report("D", [("ML Basics", 5)]),
+        make_report("Other template", [("ML Basics", 2)], template="other.yaml")
+    ])
+    values = table.average_score
+    assert table.percentile_ranks(values).tolist() == [12.5, 50.0, 50.0, 87.5, 50.0]
+    assert table.percentile_ranks(values, by_template=False).tolist() == [10.0, 60.0, 60.0, 90.0, 30.0]
+
+
+def test_summary_counts_and_top_candidates():
+    reports = random_reports(40, seed=2)
+    table = ReportTable.from_reports(reports)
+    summary = table.summary(top=5)
+    assert summary["reports"] == 40
+    assert summary["templates"] == {TEMPLATE: 40}
+    expected_counts = {level: sum(report["summary_statistics"]["score_distribution"][str(level)]
+                                  for report in reports) for level in range(1, 6)}
+    assert summary["score_distribution"] == expected_counts
+    top = [candidate["weighted_score"] for candidate in summary["top_candidates"]]
+    assert top == sorted(top, reverse=True)
+    assert top[0] == pytest.approx(float(table.weighted_scores().max()), abs=0.01)
+
+
+def test_saved_table_loads_with_the_same_summary(tmp_path):
+    table = ReportTable.from_reports(random_reports(20, seed=3))
+    table.save(tmp_path / "reports.npz")
+    loaded = ReportTable.load(tmp_path / "reports.npz")
+    assert loaded.summary() == table.summary()
+    assert np.array_equal(loaded.dimension_scores, table.dimension_scores, equal_nan=True)
+
+
+def test_logged_reports_are_dated_by_their_start(tmp_path):
+    log = SessionLog(tmp_path)
+    log.start("s1", role=ROLE, candidate_name="Ada", template=TEMPLATE, start_time="2025-03-01T10:00:00")
+    log.record_turn("s1", "What is overfitting?", "Memorising noise.", 4, dimension="ML Basics")
+    log.append("s1", "complete")
+    log.start("s2", role=ROLE, candidate_name="Bob", template=TEMPLATE, start_time="2025-03-02T11:00:00")
+    log.sync()
+    reader = SessionLog(tmp_path)
+    reports = list(iter_logged_reports(reader))
+    assert [(r["candidate_summary"]["name"], r["candidate_summary"]["date"], r["candidate_summary"]["time"])
+            for r in reports] == [("Ada", "2025-03-01", "10:00:00")]
+    assert len(list(iter_logged_reports(reader, include_incomplete=True))) == 2
+    # Reading for analytics does not resume the unfinished interview
+    assert not reader.is_logged("s2")
@@ -0,0 +1,141 @@
+"""
+Near-duplicate answer index: LSH matches above and below the reuse and flag
+thresholds, the reuse modes, partitions by question and scorer, and the
+SQLite round trip.
+"""
+import pytest
+from interviewer import answer_index as answer_index_module
+from interviewer.answer_index import (DEFAULT_FLAG_THRESHOLD, DEFAULT_REUSE_THRESHOLD, AnswerIndex,
+                                      get_answer_index)
+from interviewer.evaluator import evaluate_answer, scorer_id
+from interviewer.sessions import InterviewSession
+
+QUESTION = "What is overfitting and how would you detect it?"
+SCORER = scorer_id("llama-3.1-8b-instant")
+ANSWER = ("Overfitting happens when a model learns the noise in its training data instead of the underlying "
+          "pattern, so it scores well on the examples it has seen and poorly on new ones. I would detect it by "
+          "holding out a validation set and watching the gap between training and validation loss as training "
+          "goes on; when validation loss starts rising while training loss keeps falling the model is "
+          "overfitting. To reduce it I would gather more data, add regularisation such as weight decay or "
+          "dropout, simplify the model, or stop training early at the best validation checkpoint.")
+
+
+def reword(answer, words):
+    """`answer` with `words` of its words, ten apart, replaced"""
+    tokens = answer.split()
+    for i in range(words):
+        tokens[5 + 10 * i] = "really"
+    return " ".join(tokens)
+
+
+def interview(*turns, question=QUESTION):
+    session = InterviewSession("AI Engineer", candidate_name="Ada", template="AI_engineer.yaml")
+    for answer, score in turns:
+        session.add_turn(question, answer, score, dimension="ML Basics")
+    return session
+
+
+@pytest.fixture
+def index():
+    index = AnswerIndex()
+    index.add_session(interview((ANSWER, 4)), SCORER, source="s1")
+    return index
+
+
+def test_near_copy_is_reused_and_flagged(index):
+    matches = index.lookup(QUESTION, reword(ANSWER, 1), SCORER)
+    assert len(matches) == 1 and matches[0][0] >= DEFAULT_FLAG_THRESHOLD
+    assert index.reusable_score(matches) == 4
+    assert index.is_flagged(matches)
+
+
+def test_match_between_the_thresholds_is_reused_but_not_flagged(index):
+    matches = index.lookup(QUESTION, reword(ANSWER, 2), SCORER)
+    assert len(matches) == 1 and DEFAULT_REUSE_THRESHOLD <= matches[0][0] < DEFAULT_FLAG_THRESHOLD
+    assert index.reusable_score(matches) == 4
+    assert not index.is_flagged(matches)
+
+
+def test_answers_below_the_thresholds_do_not_match(index):
+    assert index.lookup(QUESTION, reword(ANSWER, 4), SCORER) == []
+    assert index.lookup(QUESTION, "I am not sure, maybe when the model is too big?", SCORER) == []
+    assert index.lookup(QUESTION, "", SCORER) == []
+    stats = index.stats()
+    assert (stats["reused"], stats["flagged"]) == (0, 0)
+
+
+def test_thresholds_are_configurable():
+    index = AnswerIndex(reuse_threshold=0.8, flag_threshold=0.99)
+    index.add_session(interview((ANSWER, 4)), SCORER)
+    matches = index.lookup(QUESTION, reword(ANSWER, 4), SCORER)
+    assert len(matches) == 1 and 0.8 <= matches[0][0] < DEFAULT_REUSE_THRESHOLD
+    assert index.reusable_score(matches) == 4
+    assert not index.is_flagged(index.lookup(QUESTION, reword(ANSWER, 1), SCORER))
+
+
+def test_reuse_modes():
+    session = interview((ANSWER, 5), (reword(ANSWER, 1), 2))
+    matches = {}
+    for mode in ("reuse", "blend", "flag"):
+        index = AnswerIndex(mode=mode)
+        index.add_session(session, SCORER)
+        matches[mode] = index.lookup(QUESTION, ANSWER, SCORER)
+        assert [score for _, score in matches[mode]] == [5, 2]
+        scores = matches[mode]
+        if mode == "reuse":
+            assert index.reusable_score(scores) == 5
+        elif mode == "blend":
+            expected = (scores[0][0] * 5 + scores[1][0] * 2) / (scores[0][0] + scores[1][0])
+            assert index.reusable_score(scores) == round(expected)
+        else:
+            assert index.reusable_score(scores) is None
+            assert index.is_flagged(scores)
+    with pytest.raises(ValueError):
+        AnswerIndex(mode="copy")
+
+
+def test_partitions_are_kept_per_question_and_scorer(index):
+    assert index.lookup("How do you tune a learning rate?", ANSWER, SCORER) == []
+    assert index.lookup(QUESTION, ANSWER, scorer_id("llama-3.3-70b-versatile")) == []
+    assert index.lookup(QUESTION, ANSWER, "llama-3.1-8b-instant/v0") == []
+    # The question is normalized like the score cache keys
+    assert index.lookup("  what is OVERFITTING and how would you detect it? ", ANSWER, SCORER)[0] == (1.0, 4)
+    index.add_session(interview((ANSWER, 2), question="How do you tune a learning rate?"), SCORER)
+    assert index.lookup(QUESTION, ANSWER, SCORER) == [(1.0, 4)]
+    assert index.stats()["questions"] == 2
+
+
+def test_unscored_turns_are_not_indexed():
+    index = AnswerIndex()
+    assert index.add_session(interview((ANSWER, None), ("", 1)), SCORER) == 0
+    assert index.lookup(QUESTION, ANSWER, SCORER) == []
+
+
+def test_partition_size_is_capped():
+    index = AnswerIndex(max_per_partition=2)
+    added = index.add_session(interview((ANSWER, 3), (reword(ANSWER, 1), 4), (reword(ANSWER, 2), 5)), SCORER)
+    assert added == 2
+    assert index.stats()["answers"] == 2
+
+
+def test_index_persists_and_sessions_are_added_once(tmp_path):
+    path = str(tmp_path / "answer_index.sqlite")
+    index = AnswerIndex(path)
+    assert index.add_session(interview((ANSWER, 4)), SCORER, source="s1") == 1
+    assert index.add_session(interview((ANSWER, 4)), SCORER, source="s1") == 0
+    reloaded = AnswerIndex(path)
+    assert reloaded.lookup(QUESTION, reword(ANSWER, 1), SCORER) == index.lookup(QUESTION, reword(ANSWER, 1), SCORER)
+    assert reloaded.add_session(interview((ANSWER, 4)), SCORER, source="s1") == 0
+    reloaded.clear()
+    assert AnswerIndex(path).stats()["answers"] == 0
+
+
+def test_evaluator_reuses_the_score_of_a_near_copy(monkeypatch):
+    monkeypatch.setenv("ANSWER_INDEX_THRESHOLD", "0.8")
+    monkeypatch.setattr(answer_index_module, "_default_index", None)
+    index = get_answer_index()
+    assert index.reuse_threshold == 0.8
+    index.add_session(interview((ANSWER, 4)), scorer_id("fake"))
+    # The Local fake would score differently; the indexed score is reused
+    assert evaluate_answer(reword(ANSWER, 4), None, question=QUESTION, provider="Local", model="fake") == 4
+    assert index.stats()["reused"] == 1
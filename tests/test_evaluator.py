@@ -0,0 +1,28 @@
+"""Which provider and model score the answers"""
+import pytest
+from interviewer import clients
+from interviewer.evaluator import EVALUATOR_MODEL, EVALUATOR_PROVIDER, evaluator_for
+
+
+@pytest.fixture
+def no_keys(monkeypatch):
+    monkeypatch.delenv("GROQ_API_KEY", raising=False)
+    monkeypatch.setattr(clients, "_api_keys", {})
+
+
+def test_local_scores_offline(no_keys):
+    assert evaluator_for("Local", "fake") == ("Local", "fake")
+
+
+def test_groq_evaluator_when_its_key_is_known(no_keys):
+    clients.register_api_key("Groq", "gsk-test")
+    assert evaluator_for("OpenAI", "gpt-4o-mini") == (EVALUATOR_PROVIDER, EVALUATOR_MODEL)
+
+
+def test_groq_key_from_environment(no_keys, monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "gsk-test")
+    assert evaluator_for("OpenAI", "gpt-4o-mini") == (EVALUATOR_PROVIDER, EVALUATOR_MODEL)
+
+
+def test_without_groq_key_the_interview_model_scores(no_keys):
+    assert evaluator_for("OpenAI", "gpt-4o-mini") == ("OpenAI", "gpt-4o-mini")
@@ -0,0 +1,116 @@
+"""
+Report archives: NDJSON (plain, gzip, zstd) and Parquet written and read
+back whole, by position and by name, plus single-report exports.
+"""
+import gzip
+import json
+import random
+import pytest
+from interviewer.export import (NDJSONArchive, archive_format, export_report, index_path, open_archive,
+                                open_archive_writer, save_report)
+from interviewer.report import generate_report
+from interviewer.sessions import InterviewSession
+from interviewer.telemetry import TurnTelemetry
+
+ARCHIVES = ["reports.ndjson", "reports.ndjson.gz", "reports.ndjson.zst", "reports.parquet"]
+
+
+def make_reports(count, seed=0):
+    """Reports as read back from JSON (score keys become strings)"""
+    rng = random.Random(seed)
+    reports = []
+    for index in range(count):
+        session = InterviewSession("AI Engineer", candidate_name=f"Candidate {index}", template="AI_engineer.yaml")
+        for turn in range(rng.randint(1, 4)):
+            telemetry = None
+            if rng.random() < 0.5:
+                telemetry = TurnTelemetry()
+                telemetry.add_span("turn", rng.random())
+                telemetry = telemetry.as_dict()
+            session.add_turn(f"Question {turn}?", f"Answer {turn} by candidate {index}.",
+                             rng.choice([None, 1, 2, 3, 4, 5]), dimension=rng.choice(["ML Basics", "Communication"]),
+                             telemetry=telemetry)
+        reports.append(json.loads(json.dumps(generate_report(session))))
+    return reports
+
+
+def write_archive(path, reports, **kwargs):
+    with open_archive_writer(str(path), **kwargs) as writer:
+        for report in reports:
+            writer.write(report)
+    return writer
+
+
+@pytest.mark.parametrize("name", ARCHIVES)
+def test_archive_round_trip(tmp_path, name):
+    reports = make_reports(70)
+    writer = write_archive(tmp_path / name, reports)
+    assert writer.reports == 70
+    archive = open_archive(str(tmp_path / name))
+    assert len(archive) == 70
+    assert list(archive) == reports
+    assert archive.names() == [report["candidate_summary"]["name"] for report in reports]
+    assert archive.read(0) == reports[0] and archive.read(69) == reports[69]
+    assert archive.get("Candidate 40") == reports[40]
+    assert archive.get("Nobody") is None
+
+
+def test_parquet_with_gzip_inside(tmp_path):
+    reports = make_reports(10)
+    write_archive(tmp_path / "reports.parquet", reports, compression="gzip")
+    assert list(open_archive(str(tmp_path / "reports.parquet"))) == reports
+
+
+def test_compressed_archives_are_valid_streams(tmp_path):
+    reports = make_reports(40)
+    write_archive(tmp_path / "reports.ndjson.gz", reports)
+    write_archive(tmp_path / "reports.ndjson.zst", reports)
+    with gzip.open(tmp_path / "reports.ndjson.gz", "rt") as f:
+        assert [json.loads(line) for line in f] == reports
+    zstandard = pytest.importorskip("zstandard")
+    with open(tmp_path / "reports.ndjson.zst", "rb") as raw:
+        data = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True).read()
+    assert [json.loads(line) for line in data.splitlines()] == reports
+
+
+@pytest.mark.parametrize("name", ["reports.ndjson", "reports.ndjson.gz"])
+def test_appending_keeps_earlier_blocks_readable(tmp_path, name):
+    reports = make_reports(50)
+    write_archive(tmp_path / name, reports[:33])
+    write_archive(tmp_path / name, reports[33:], append=True)
+    archive = NDJSONArchive(tmp_path / name)
+    assert list(archive) == reports
+    assert [archive.read(position) for position in range(50)] == reports
+
+
+def test_lookup_by_name_without_loading_the_index(tmp_path):
+    reports = make_reports(40)
+    write_archive(tmp_path / "reports.ndjson.zst", reports)
+    # A torn last index line (crash mid-write) is skipped
+    with open(index_path(tmp_path / "reports.ndjson.zst"), "ab") as f:
+        f.write(b'{"name": "Candidate 39"')
+    archive = NDJSONArchive(tmp_path / "reports.ndjson.zst")
+    assert archive.get("Candidate 39") == reports[39]
+    assert archive._entries is None
+    assert len(archive) == 40
+
+
+@pytest.mark.parametrize("name", ["report.json", "report.json.gz", "report.parquet", "report.ndjson.zst"])
+def test_save_report(tmp_path, name):
+    report = make_reports(1)[0]
+    save_report(report, str(tmp_path / name))
+    fmt, compression = archive_format(name)
+    if fmt == "json":
+        data = (tmp_path / name).read_bytes()
+        if compression:
+            data = gzip.decompress(data)
+        assert json.loads(data) == report
+    else:
+        assert list(open_archive(str(tmp_path / name))) == [report]
+
+
+def test_export_report_rejects_unknown_formats():
+    with pytest.raises(ValueError):
+        export_report({}, fmt="xml")
+    with pytest.raises(ValueError):
+        archive_format("reports.csv")
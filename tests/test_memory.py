@@ -0,0 +1,49 @@
+"""
+History strategies: per-call prompt overhead on a strategy shared by the
+split and combined chains, and bounded per-session state.
+"""
+from langchain_core.messages import AIMessage, HumanMessage
+from interviewer.interview_chain import INTERVIEW_PROMPT_TOKENS, build_interview_chain
+from interviewer.interview_step import STEP_PROMPT_TOKENS
+from interviewer.memory import MAX_TURN_STATS, HistoryStrategy
+from interviewer.session_store import SessionStore
+
+CONFIG = {"configurable": {"session_id": "s1"}}
+HISTORY = [HumanMessage(content="Overfitting is memorising noise."), AIMessage(content="QUESTION: How to detect it?")]
+
+
+def test_prompt_overhead_is_per_call():
+    strategy = HistoryStrategy("window", budget=1000)
+    strategy({"input": "Cross-validation.", "history": HISTORY}, CONFIG, INTERVIEW_PROMPT_TOKENS)
+    split = strategy.last_turn_stats("s1")["prompt_tokens"]
+    strategy({"input": "Cross-validation.", "history": HISTORY}, CONFIG, STEP_PROMPT_TOKENS)
+    combined = strategy.last_turn_stats("s1")["prompt_tokens"]
+    assert combined - split == STEP_PROMPT_TOKENS - INTERVIEW_PROMPT_TOKENS
+    # The shared strategy itself is left as constructed
+    assert strategy.prompt_overhead == 0
+
+
+def test_cap_counts_the_calls_prompt_overhead():
+    strategy = HistoryStrategy("full", max_prompt_tokens=INTERVIEW_PROMPT_TOKENS + 20)
+    kept = strategy({"input": "Yes.", "history": HISTORY}, CONFIG, INTERVIEW_PROMPT_TOKENS)["history"]
+    assert kept == HISTORY[1:]
+    assert strategy({"input": "Yes.", "history": HISTORY}, CONFIG)["history"] == HISTORY
+
+
+def test_turn_stats_are_bounded():
+    strategy = HistoryStrategy()
+    for turn in range(MAX_TURN_STATS + 10):
+        strategy({"input": f"Answer {turn}.", "history": HISTORY}, CONFIG)
+    assert len(strategy.turn_stats("s1")) == MAX_TURN_STATS
+    assert strategy.last_turn_stats("s1")["prompt_tokens"] > 0
+
+
+def test_evicted_session_is_forgotten():
+    strategy = HistoryStrategy()
+    store = SessionStore(max_sessions=1)
+    build_interview_chain("Local", None, "fake", history_strategy=strategy, store=store)
+    store.get_history("s1")
+    strategy({"input": "Cross-validation.", "history": HISTORY}, CONFIG)
+    # A second session pushes s1 out of the store and its stats go with it
+    store.get_history("s2")
+    assert strategy.last_turn_stats("s1") is None
@@ -0,0 +1,76 @@
+"""
+Interviewer reply parsing: the question is released chunk by chunk as it
+streams in, and malformed replies are recovered or counted as failures.
+"""
+import pytest
+from interviewer.parsing import ResponseParser, get_parse_stats, parse_llm_response
+
+
+def feed_all(chunks):
+    parser = ResponseParser()
+    released = [(parser.feed(chunk), parser.question_complete) for chunk in chunks]
+    return parser, released
+
+
+def stats_delta(before):
+    after = get_parse_stats()
+    return {name: after[name] - before[name] for name in after}
+
+
+def test_question_is_released_as_it_arrives():
+    parser, released = feed_all(["QUES", "TION: What is", " over", "fitting?\nEVAL", "UATION: Good start."])
+    assert released == [("", False), ("What is", False), (" over", False), ("fitting?", False), ("", True)]
+    assert parser.close() == ("What is overfitting?", "Good start.")
+
+
+def test_label_alone_releases_nothing_yet():
+    parser = ResponseParser()
+    assert parser.feed("QUESTION:") == ""
+    assert parser.feed(" Why?") == "Why?"
+
+
+def test_text_that_may_become_the_evaluation_label_is_held_back():
+    parser = ResponseParser()
+    assert parser.feed("QUESTION: Why?\nEv") == "Why?"
+    # Not the label after all: the held-back line is released
+    assert parser.feed("idence first.") == "\nEvidence first."
+    assert not parser.question_complete
+    parser.finish()
+    assert parser.question_complete
+    assert parser.close()[0] == "Why?\nEvidence first."
+
+
+def test_multi_line_question_ends_at_a_blank_line():
+    parser, released = feed_all(["**Question:** How would", "\nyou detect it?\n", "\nSome notes."])
+    assert [chunk for chunk, _ in released] == ["How would", "\nyou detect it?", ""]
+    assert released[-1][1]
+    assert parser.close() == ("How would\nyou detect it?", "")
+
+
+def test_released_chunks_add_up_to_the_question():
+    reply = "QUESTION: Which metric would you track,\nand why?\nEVALUATION: Solid answer."
+    parser = ResponseParser()
+    released = "".join(parser.feed(reply[i:i + 3]) for i in range(0, len(reply), 3)) + parser.finish()
+    assert released == parser.close()[0] == "Which metric would you track,\nand why?"
+
+
+@pytest.mark.parametrize("reply, question, outcome", [
+    ("QUESTION: What is bias?\nEVALUATION: ok", "What is bias?", None),
+    ("Sure, a follow-up.\n**How would you detect overfitting?**\nEVALUATION: ok",
+     "How would you detect overfitting?", "recovered"),
+    ("Thanks for the answer.", "", "failures"),
+    ("QUESTION:\nEVALUATION: Missing question.", "", "failures")
+])
+def test_malformed_replies_are_recovered_or_counted(reply, question, outcome):
+    before = get_parse_stats()
+    assert parse_llm_response(reply)[0] == question
+    expected = {"responses": 1, "recovered": 0, "failures": 0}
+    if outcome:
+        expected[outcome] = 1
+    assert stats_delta(before) == expected
+
+
+def test_recovered_question_is_returned_by_finish():
+    parser = ResponseParser()
+    assert parser.feed("I would ask: what is regularisation?") == ""
+    assert parser.finish() == "I would ask: what is regularisation?"
@@ -0,0 +1,210 @@
+"""
+Rate-limit scheduler: token buckets, Retry-After parsing, failover order
+and deadlines, against the offline Local fake model.
+
+Run from the project root:
+    python -m pytest -q
+"""
+import time
+import pytest
+from langchain_core.messages import HumanMessage
+from interviewer import scheduler as scheduler_module
+from interviewer.hedging import DeadlineExceededError, deadline_after, get_hedger, remaining
+from interviewer.local_llm import FakeChatModel
+from interviewer.scheduler import (BudgetExhaustedError, RequestScheduler, ScheduledChatModel, TokenBucket,
+                                   _retry_after, failover_routes)
+from interviewer.telemetry import TurnTelemetry
+
+PROMPT = [HumanMessage(content="Tell me about overfitting.")]
+
+
+class FakeResponse:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+class RateLimitError(Exception):
+    """Provider error shaped like the SDKs' (status code and response headers)"""
+
+    status_code = 429
+
+    def __init__(self, headers=None):
+        super().__init__("rate limited")
+        self.response = FakeResponse(headers or {})
+
+
+def fake(model):
+    return FakeChatModel(model_name=model, first_token_seconds=0, tokens_per_second=0)
+
+
+@pytest.fixture
+def use_scheduler(monkeypatch):
+    """Install a fresh process-wide scheduler with the given limits"""
+    def install(limits, **kwargs):
+        scheduler = RequestScheduler(limits, **kwargs)
+        monkeypatch.setattr(scheduler_module, "_default_scheduler", scheduler)
+        return scheduler
+    return install
+
+
+def scheduled(provider, model):
+    # Every route answers with the Local fake under the route's model name
+    return ScheduledChatModel(provider=provider, model_name=model, inner=fake(model),
+                              resolve_route=lambda route_provider, route_model: fake(route_model))
+
+
+def test_bucket_refills_over_time():
+    bucket = TokenBucket(60)
+    assert bucket.try_acquire(60) == 0.0
+    assert bucket.try_acquire(1) == pytest.approx(1.0, abs=0.05)
+    # Two seconds later two units are back at 1 per second
+    bucket.updated -= 2
+    assert bucket.try_acquire(2) == 0.0
+    assert bucket.try_acquire(1) > 0
+
+
+def test_bucket_refill_is_capped_at_capacity():
+    bucket = TokenBucket(10)
+    bucket.updated -= 3600
+    assert bucket.try_acquire(10) == 0.0
+    assert bucket.try_acquire(1) > 0
+
+
+def test_bucket_acquire_gives_up_past_max_wait():
+    bucket = TokenBucket(60)
+    bucket.try_acquire(60)
+    with pytest.raises(BudgetExhaustedError):
+        bucket.acquire(30, max_wait=1)
+    # Waits up to max_wait for a unit that is due sooner
+    assert bucket.acquire(1, max_wait=2) == pytest.approx(1.0, abs=0.2)
+
+
+def test_failed_acquire_refunds_earlier_buckets(use_scheduler):
+    scheduler = use_scheduler({"Groq": {"requests_per_minute": 10}, "Groq/m": {"tokens_per_minute": 100}})
+    scheduler.call("Groq", "m", 100, lambda: "first")
+    with pytest.raises(BudgetExhaustedError):
+        scheduler.call("Groq", "m", 100, lambda: "never", max_wait=0)
+    # The request taken from the provider bucket for the failed call went back
+    requests = scheduler._buckets[("Groq", "requests_per_minute")]
+    assert requests.try_acquire(9) == 0.0
+    assert requests.try_acquire(1) > 0
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ({"retry-after": "2"}, 2.0),
+    ({"retry-after": "0.5"}, 0.5),
+    ({"retry-after-ms": "1500"}, 1.5),
+    ({"retry-after-ms": "250", "retry-after": "9"}, 0.25),
+    ({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}, None),
+    ({}, None)
+])
+def test_retry_after(headers, expected):
+    assert _retry_after(RateLimitError(headers)) == expected
+
+
+def test_retry_after_without_response():
+    assert _retry_after(ValueError("no response")) is None
+
+
+def test_call_retries_after_server_delay(use_scheduler):
+    scheduler = use_scheduler({})
+    attempts = []
+
+    def flaky():
+        attempts.append(time.monotonic())
+        if len(attempts) < 2:
+            raise RateLimitError({"retry-after-ms": "100"})
+        return "ok"
+
+    result, call_stats = scheduler.call("Groq", "m", 10, flaky)
+    assert result == "ok"
+    assert call_stats["retries"] == 1
+    assert attempts[1] - attempts[0] >= 0.1
+
+
+def test_call_gives_up_after_max_retries(use_scheduler):
+    scheduler = use_scheduler({}, max_retries=1)
+
+    def limited():
+        raise RateLimitError({"retry-after-ms": "10"})
+
+    with pytest.raises(BudgetExhaustedError):
+        scheduler.call("Groq", "m", 10, limited)
+    assert scheduler.stats()["exhausted"] == 1
+
+
+def test_failover_routes_order():
+    assert failover_routes("Groq", "llama-3.3-70b-versatile") == [
+        ("Groq", "llama-3.1-8b-instant"), ("OpenAI", "gpt-4o-mini")
+    ]
+    assert failover_routes("OpenAI", "gpt-4o-mini") == [("Groq", "llama-3.1-8b-instant")]
+    assert failover_routes("Local", "fake") == []
+
+
+def test_exhausted_model_fails_over_to_smaller_model(use_scheduler):
+    use_scheduler({"Groq/llama-3.3-70b-versatile": {"requests_per_minute": 1}}, max_queue_seconds=0)
+    llm = scheduled("Groq", "llama-3.3-70b-versatile")
+    first = llm.invoke(PROMPT).response_metadata["scheduler"]
+    assert (first["model"], first["failovers"]) == ("llama-3.3-70b-versatile", 0)
+    second = llm.invoke(PROMPT).response_metadata["scheduler"]
+    assert (second["provider"], second["model"], second["failovers"]) == ("Groq", "llama-3.1-8b-instant", 1)
+
+
+def test_exhausted_provider_fails_over_to_other_provider(use_scheduler):
+    scheduler = use_scheduler({"Groq": {"requests_per_minute": 1}}, max_queue_seconds=0)
+    llm = scheduled("Groq", "llama-3.3-70b-versatile")
+    llm.invoke(PROMPT)
+    telemetry = TurnTelemetry()
+    with telemetry.active():
+        call_stats = llm.invoke(PROMPT).response_metadata["scheduler"]
+    assert (call_stats["provider"], call_stats["model"], call_stats["failovers"]) == ("OpenAI", "gpt-4o-mini", 2)
+    assert scheduler.stats()["failovers"] == 2
+    # Each exhausted route is reported as a turn error
+    errors = telemetry.as_dict()["errors"]
+    assert [error.split(":")[0] for error in errors] == ["scheduler", "scheduler"]
+    assert "Groq/llama-3.3-70b-versatile" in errors[0] and "Groq/llama-3.1-8b-instant" in errors[1]
+
+
+def test_every_route_exhausted_raises(use_scheduler):
+    use_scheduler({"Groq": {"requests_per_minute": 1}, "OpenAI": {"requests_per_minute": 1}}, max_queue_seconds=0)
+    llm = scheduled("Groq", "llama-3.1-8b-instant")
+    llm.invoke(PROMPT)
+    llm.invoke(PROMPT)
+    with pytest.raises(BudgetExhaustedError):
+        llm.invoke(PROMPT)
+
+
+def test_deadline_reaches_the_call_thread(use_scheduler):
+    scheduler = use_scheduler({})
+    with deadline_after(5):
+        left, _ = scheduler.call("Groq", "m", 10, lambda: get_hedger().run(("Groq", "m", "test"), remaining))
+    assert left is not None and 0 < left <= 5
+
+
+def test_budget_wait_past_deadline_is_a_deadline_miss(use_scheduler):
+    scheduler = use_scheduler({"Groq": {"requests_per_minute": 1}}, max_queue_seconds=30)
+    scheduler.call("Groq", "m", 10, lambda: "first")
+    start = time.monotonic()
+    with deadline_after(0.2), pytest.raises(DeadlineExceededError):
+        scheduler.call("Groq", "m", 10, lambda: "second")
+    assert time.monotonic() - start < 1
+
+
+def test_retry_backoff_past_deadline_is_a_deadline_miss(use_scheduler):
+    scheduler = use_scheduler({})
+
+    def limited():
+        raise RateLimitError({"retry-after": "2"})
+
+    with deadline_after(0.5), pytest.raises(DeadlineExceededError):
+        scheduler.call("Groq", "m", 10, limited)
+
+
+def test_slow_model_stops_at_the_deadline(use_scheduler):
+    use_scheduler({})
+    slow = FakeChatModel(model_name="fake", first_token_seconds=2, tokens_per_second=0)
+    llm = ScheduledChatModel(provider="Local", model_name="fake", inner=slow)
+    start = time.monotonic()
+    with deadline_after(0.2), pytest.raises(DeadlineExceededError):
+        llm.invoke(PROMPT)
+    assert time.monotonic() - start < 1
@@ -0,0 +1,106 @@
+"""
+Evaluator score cache: TTL expiry and LRU/size eviction in both tiers,
+and cache keys that change with the question, model and prompt version.
+"""
+import pytest
+from interviewer import score_cache as score_cache_module
+from interviewer.evaluator import PROMPT_VERSION, evaluate_answer
+from interviewer.score_cache import ScoreCache, make_cache_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Frozen time.time() for the cache; advance it with clock[0] += seconds"""
+    now = [1_000_000.0]
+    monkeypatch.setattr(score_cache_module.time, "time", lambda: now[0])
+    return now
+
+
+def test_key_ignores_case_whitespace_and_final_punctuation():
+    key = make_cache_key("Overfitting  is memorising NOISE.", "What is overfitting?", "m", "v1")
+    assert key == make_cache_key("overfitting is memorising noise", "What is overfitting?", "m", "v1")
+
+
+@pytest.mark.parametrize("question, model, prompt_version", [
+    ("What is underfitting?", "m", "v1"),
+    ("What is overfitting?", "other-model", "v1"),
+    ("What is overfitting?", "m", "v2")
+])
+def test_key_changes_with_question_model_and_prompt_version(question, model, prompt_version):
+    key = make_cache_key("Memorising noise.", "What is overfitting?", "m", "v1")
+    assert make_cache_key("Memorising noise.", question, model, prompt_version) != key
+
+
+def test_memory_entry_expires_after_ttl(clock):
+    cache = ScoreCache(ttl_seconds=60)
+    cache.set("k", 4)
+    clock[0] += 60
+    assert cache.get("k") == 4
+    clock[0] += 1
+    assert cache.get("k") is None
+    assert cache.stats()["memory_entries"] == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = ScoreCache(max_memory_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+
+def test_disk_tier_survives_a_restart(tmp_path):
+    path = str(tmp_path / "scores.sqlite")
+    ScoreCache(path=path).set("k", 5)
+    cache = ScoreCache(path=path)
+    assert cache.get("k") == 5
+    assert cache.stats()["disk_hits"] == 1
+    # Now in the memory tier as well
+    assert cache.get("k") == 5
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_expired_disk_row_is_a_miss(tmp_path, clock):
+    path = str(tmp_path / "scores.sqlite")
+    ScoreCache(path=path, ttl_seconds=60).set("k", 5)
+    clock[0] += 61
+    assert ScoreCache(path=path, ttl_seconds=60).get("k") is None
+
+
+def test_disk_eviction_drops_least_recently_used(tmp_path, clock, monkeypatch):
+    monkeypatch.setattr(score_cache_module, "EVICTION_INTERVAL", 1)
+    cache = ScoreCache(path=str(tmp_path / "scores.sqlite"), max_memory_entries=1, max_disk_entries=2)
+    cache.set("a", 1)
+    clock[0] += 1
+    cache.set("b", 2)
+    clock[0] += 1
+    assert cache.get("a") == 1  # read from disk: "a" is now more recently used than "b"
+    clock[0] += 1
+    cache.set("c", 3)
+    fresh = ScoreCache(path=cache.path)
+    assert [fresh.get(key) for key in ("a", "b", "c")] == [1, None, 3]
+
+
+def test_disk_eviction_drops_expired_rows(tmp_path, clock, monkeypatch):
+    monkeypatch.setattr(score_cache_module, "EVICTION_INTERVAL", 1)
+    cache = ScoreCache(path=str(tmp_path / "scores.sqlite"), ttl_seconds=60)
+    cache.set("old", 1)
+    clock[0] += 61
+    cache.set("new", 2)
+    assert cache.stats()["disk_entries"] == 1
+
+
+def test_evaluator_caches_under_question_model_and_prompt_version(monkeypatch):
+    cache = ScoreCache()
+    monkeypatch.setattr(score_cache_module, "_default_cache", cache)
+    answer, question = "Overfitting is memorising noise in the training data.", "What is overfitting?"
+    score = evaluate_answer(answer, None, question=question, provider="Local", model="fake")
+    assert cache.get(make_cache_key(answer, question, "fake", PROMPT_VERSION)) == score
+    assert cache.get(make_cache_key(answer, "What is underfitting?", "fake", PROMPT_VERSION)) is None
+    # A repeat of the answer is served from the cache
+    hits = cache.hits
+    assert evaluate_answer(answer.upper(), None, question=question, provider="Local", model="fake") == score
+    assert cache.hits == hits + 1
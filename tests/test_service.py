@@ -0,0 +1,110 @@
+"""
+Async interview service: LLM budget, deadline and input errors become
+HTTP statuses, and WebSocket clients keep their connection after one.
+"""
+import asyncio
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+from interviewer import scheduler as scheduler_module
+from interviewer.scheduler import RequestScheduler
+from interviewer.service import InterviewService, build_app
+
+
+@pytest.fixture
+def exhausted_budget(monkeypatch):
+    """A scheduler whose Local/fake budget is already used up"""
+    scheduler = RequestScheduler({"Local/fake": {"requests_per_minute": 1}}, max_queue_seconds=0)
+    scheduler.call("Local", "fake", 1, lambda: None)
+    monkeypatch.setattr(scheduler_module, "_default_scheduler", scheduler)
+
+
+def run_with_client(test, configure=None):
+    async def main():
+        service = InterviewService("Local", None, "fake", None, timeout=10)
+        if configure is not None:
+            configure(service)
+        async with TestClient(TestServer(build_app(service))) as client:
+            response = await client.post("/sessions", json={"candidate_name": "Ada"})
+            session_id = (await response.json())["session_id"]
+            return await test(client, session_id)
+
+    return asyncio.run(main())
+
+
+def needs_groq_key(service):
+    # Scoring on a provider without a key: the evaluator raises ValueError
+    service.evaluator_provider = "Groq"
+
+
+def test_answer_is_scored():
+    async def test(client, session_id):
+        response = await client.post(f"/sessions/{session_id}/answers", json={"answer": "Bias and variance."})
+        return response.status, await response.json()
+
+    status, body = run_with_client(test)
+    assert status == 200
+    assert body["score"] is not None
+
+
+def test_exhausted_budget_is_503_with_retry_after(exhausted_budget):
+    async def test(client, session_id):
+        response = await client.post(f"/sessions/{session_id}/answers", json={"answer": "Bias and variance."})
+        return response.status, response.headers.get("Retry-After")
+
+    status, retry_after = run_with_client(test)
+    assert status == 503
+    assert retry_after is not None and int(retry_after) > 0
+
+
+def test_evaluator_value_error_is_400():
+    async def test(client, session_id):
+        response = await client.post(f"/sessions/{session_id}/answers", json={"answer": "Bias and variance."})
+        return response.status, await response.json()
+
+    status, body = run_with_client(test, configure=needs_groq_key)
+    assert status == 400
+    assert "API key" in body["error"]
+
+
+def receive_until_turn_or_error(ws):
+    async def receive():
+        while True:
+            message = await ws.receive_json(timeout=10)
+            if message["type"] in ("turn", "error"):
+                return message
+    return receive()
+
+
+def test_websocket_keeps_connection_after_budget_error(exhausted_budget, monkeypatch):
+    async def test(client, session_id):
+        async with client.ws_connect(f"/sessions/{session_id}/ws") as ws:
+            assert (await ws.receive_json())["type"] == "state"
+            await ws.send_json({"answer": "Bias and variance."})
+            error = await receive_until_turn_or_error(ws)
+            # Budget back: the next answer on the same socket goes through
+            monkeypatch.setattr(scheduler_module, "_default_scheduler", RequestScheduler({}))
+            await ws.send_json({"answer": "Bias and variance."})
+            turn = await receive_until_turn_or_error(ws)
+            return error, turn, ws.closed
+
+    error, turn, closed = run_with_client(test)
+    assert (error["type"], error["status"]) == ("error", 503)
+    assert error["retry_after"] > 0
+    assert turn["type"] == "turn"
+    assert not closed
+
+
+def test_websocket_keeps_connection_after_value_error():
+    async def test(client, session_id):
+        async with client.ws_connect(f"/sessions/{session_id}/ws") as ws:
+            await ws.receive_json()
+            await ws.send_json({"answer": "Bias and variance."})
+            first = await receive_until_turn_or_error(ws)
+            await ws.send_json({"answer": "Again."})
+            second = await receive_until_turn_or_error(ws)
+            return first, second, ws.closed
+
+    first, second, closed = run_with_client(test, configure=needs_groq_key)
+    assert (first["type"], first["status"]) == ("error", 400)
+    assert (second["type"], second["status"]) == ("error", 400)
+    assert not closed
@@ -0,0 +1,126 @@
+"""
+Session write-ahead log: recovery from the log and from snapshots, a torn
+last line, and the state dropped when an interview completes.
+"""
+import json
+import time
+import pytest
+from interviewer.session_log import SessionLog, get_session_log
+
+
+@pytest.fixture
+def log(tmp_path):
+    return SessionLog(tmp_path, snapshot_every=1000)
+
+
+def start(log, session_id="s1"):
+    log.start(session_id, role="AI Engineer", candidate_name="Ada", template="AI_engineer.yaml",
+              start_time="2025-03-01T10:00:00")
+
+
+def log_interview(log, session_id="s1"):
+    start(log, session_id)
+    log.record_turn(session_id, "What is overfitting?", "Memorising noise.", 4, dimension="ML Basics")
+    log.append(session_id, "followup", question="How would you detect it?")
+    log.record_turn(session_id, "How would you detect it?", "A validation set.", 3, dimension="ML Basics")
+    log.append(session_id, "advance", question_idx=1)
+    log.append(session_id, "followup", question="Why does that work?")
+
+
+def assert_interview(state):
+    assert state.session.candidate_name == "Ada"
+    assert state.session.start_time.isoformat() == "2025-03-01T10:00:00"
+    assert [turn["score"] for turn in state.session.transcript] == [4, 3]
+    assert state.question_idx == 1
+    assert state.pending_followup == "Why does that work?"
+    assert state.messages == [{"role": "assistant", "content": "Why does that work?"}]
+    assert not state.complete
+
+
+def test_recover_replays_the_log(log):
+    log_interview(log)
+    log.sync()
+    state = SessionLog(log.directory).recover("s1")
+    assert_interview(state)
+    assert state.events == 6
+
+
+def test_torn_last_line_is_ignored(log):
+    log_interview(log)
+    log.sync()
+    wal_path = log.directory / "s1.wal"
+    with open(wal_path, "ab") as f:
+        f.write(b'{"question": "Half writ')
+    resumed = SessionLog(log.directory)
+    assert_interview(resumed.recover("s1"))
+    # The torn line is cut, so events logged after resuming are read back
+    resumed.record_turn("s1", "Why does that work?", "Held-out data.", 5, dimension="ML Basics")
+    resumed.sync()
+    assert [turn["score"] for turn in SessionLog(log.directory).read("s1").session.transcript] == [4, 3, 5]
+
+
+def test_snapshot_plus_tail_matches_a_full_replay(log):
+    log_interview(log)
+    log.sync()
+    log.snapshot("s1")
+    snapshot = json.loads((log.directory / "s1.snapshot.json").read_text())
+    assert snapshot["offset"] == (log.directory / "s1.wal").stat().st_size
+    log.record_turn("s1", "Why does that work?", "Held-out data.", 5, dimension="ML Basics")
+    log.sync()
+    from_snapshot = SessionLog(log.directory).read("s1")
+    (log.directory / "s1.snapshot.json").unlink()
+    full = SessionLog(log.directory).read("s1")
+    assert from_snapshot.to_snapshot() == full.to_snapshot()
+    assert [turn["score"] for turn in full.session.transcript] == [4, 3, 5]
+
+
+def test_snapshots_are_taken_every_n_events(tmp_path):
+    log = SessionLog(tmp_path, fsync_interval=0, snapshot_every=3)
+    log_interview(log)
+    # The background flusher folds the log into a snapshot
+    for _ in range(100):
+        if log.stats()["snapshots"]:
+            break
+        time.sleep(0.01)
+    assert (tmp_path / "s1.snapshot.json").exists()
+    assert_interview(SessionLog(tmp_path).recover("s1"))
+
+
+def test_unknown_or_invalid_session(log):
+    assert log.recover("missing") is None
+    assert log.recover("../etc/passwd") is None
+
+
+def test_read_does_not_resume(log):
+    log_interview(log)
+    other = SessionLog(log.directory)
+    assert other.read("s1") is not None
+    assert not other.is_logged("s1")
+    assert other.recover("s1") is not None
+    assert other.is_logged("s1")
+
+
+def test_completed_session_state_is_dropped(log):
+    log_interview(log)
+    assert log.is_logged("s1")
+    log.append("s1", "complete")
+    assert not log.is_logged("s1")
+    assert log.stats()["open_files"] == 0
+    assert "s1" not in log._since_snapshot and "s1" not in log._snapshot_due
+    # Completed sessions can still be read, but are not resumed
+    assert log.recover("s1").complete
+    assert not log.is_logged("s1")
+
+
+def test_prune_removes_idle_logs(log):
+    log_interview(log)
+    start(log, "s2")
+    log.sync()
+    assert log.prune(max_age_seconds=-1) == 2
+    assert not log.is_logged("s1") and log._since_snapshot == {}
+    assert list(log.directory.iterdir()) == []
+
+
+def test_logging_is_opt_in(monkeypatch):
+    monkeypatch.delenv("SESSION_LOG_DIR", raising=False)
+    assert get_session_log() is None
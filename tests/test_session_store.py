@@ -0,0 +1,113 @@
+"""
+Session store: idle-TTL and LRU eviction in memory and with the SQLite
+tier, and the on_evict / on_messages callbacks.
+"""
+import gc
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from interviewer import session_store as session_store_module
+from interviewer.session_store import SessionStore
+
+MESSAGES = [HumanMessage(content="Overfitting is memorising noise."), AIMessage(content="QUESTION: How to detect it?")]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Frozen time.time() for the store; advance it with clock[0] += seconds"""
+    now = [1_000_000.0]
+    monkeypatch.setattr(session_store_module.time, "time", lambda: now[0])
+    return now
+
+
+def store_with_log(**kwargs):
+    store = SessionStore(**kwargs)
+    evicted = []
+    store.on_evict(evicted.append)
+    return store, evicted
+
+
+def test_least_recently_used_session_is_evicted():
+    store, evicted = store_with_log(max_sessions=2)
+    store.get_history("s1").add_messages(MESSAGES)
+    store.get_history("s2")
+    store.get_history("s1")
+    store.get_history("s3")
+    assert evicted == ["s2"]
+    assert "s2" not in store and "s1" in store
+    assert len(store) == 2 and store.stats()["evictions"] == 1
+    assert store.get_history("s1").messages == MESSAGES
+
+
+def test_idle_session_expires(clock):
+    store, evicted = store_with_log(idle_ttl_seconds=60)
+    store.get_history("s1")
+    clock[0] += 30
+    store.get_history("s2")
+    clock[0] += 31  # s1 idle for 61s, s2 for 31s
+    store.get_history("s3")
+    assert evicted == ["s1"]
+    assert "s1" not in store and "s2" in store
+
+
+def test_clear_runs_on_evict():
+    store, evicted = store_with_log()
+    store.get_history("s1").add_messages(MESSAGES)
+    store.clear("s1")
+    assert evicted == ["s1"]
+    assert store.get_history("s1").messages == []
+
+
+def test_on_evict_holds_bound_methods_weakly():
+    class Owner:
+        def __init__(self):
+            self.forgotten = []
+
+        def forget(self, session_id):
+            self.forgotten.append(session_id)
+
+    store = SessionStore(max_sessions=1)
+    kept, dropped = Owner(), Owner()
+    store.on_evict(kept.forget)
+    store.on_evict(dropped.forget)
+    del dropped
+    gc.collect()
+    store.get_history("s1")
+    store.get_history("s2")
+    assert kept.forgotten == ["s1"]
+    assert len(store._on_evict) == 1
+
+
+def test_sqlite_keeps_lru_evicted_sessions_on_disk(tmp_path):
+    store, evicted = store_with_log(max_sessions=1, path=str(tmp_path / "sessions.sqlite"))
+    store.get_history("s1").add_messages(MESSAGES)
+    store.get_history("s2")
+    # Only the in-memory handle went away
+    assert evicted == [] and len(store) == 1
+    assert "s1" in store
+    assert store.get_history("s1").messages == MESSAGES
+    assert store.stats()["stored_sessions"] == 1
+
+
+def test_sqlite_deletes_idle_sessions(tmp_path, clock):
+    path = str(tmp_path / "sessions.sqlite")
+    store, evicted = store_with_log(max_sessions=1, idle_ttl_seconds=60, path=path)
+    store.get_history("s1").add_messages(MESSAGES)
+    store.get_history("s2")
+    clock[0] += 61
+    # A restarted process expires s1 from the sessions table
+    restarted, restarted_evicted = store_with_log(idle_ttl_seconds=60, path=path)
+    restarted.get_history("s3")
+    assert sorted(restarted_evicted) == ["s1", "s2"]
+    assert "s1" not in restarted
+    assert restarted.get_history("s1").messages == []
+
+
+def test_on_messages_sees_appended_messages():
+    store = SessionStore()
+    seen = []
+    store.on_messages(lambda session_id, messages: seen.append((session_id, list(messages))))
+    store.get_history("s1").add_messages(MESSAGES)
+    # Restored history is not reported again
+    store.restore_messages("s2", MESSAGES)
+    assert seen == [("s1", MESSAGES)]
+    assert store.get_history("s2").messages == MESSAGES
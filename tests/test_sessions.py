@@ -0,0 +1,118 @@
+"""
+Interview sessions: running report aggregates and top-k lists match a
+full recompute over the transcript, and the compact layout survives a
+to_dict/from_dict round trip.
+"""
+import json
+import random
+import pytest
+from interviewer.sessions import MAX_NOTABLE_QUOTES, TOP_K, UNSCORED, InterviewSession
+from interviewer.telemetry import TurnTelemetry
+
+DIMENSIONS = ["ML Basics", "Applied AI & LLMs", "Communication", None]
+
+
+def random_session(seed, turns=40):
+    rng = random.Random(seed)
+    session = InterviewSession("AI Engineer", candidate_name="Ada", template="AI_engineer.yaml")
+    for index in range(turns):
+        score = rng.choice([None, 1, 2, 3, 4, 5])
+        session.add_turn(f"Question {index}?", f"Answer {index}.", score, dimension=rng.choice(DIMENSIONS))
+    return session
+
+
+def recompute(transcript):
+    """The aggregates, computed from scratch over the transcript"""
+    scored = [(index, turn) for index, turn in enumerate(transcript) if turn["score"] is not None]
+    scores = [turn["score"] for _, turn in scored]
+    dimensions = {}
+    for _, turn in scored:
+        if turn["dimension"]:
+            dimensions.setdefault(turn["dimension"], []).append(turn["score"])
+    return {
+        "average": sum(scores) / len(scores) if scores else 0,
+        "highest": max(scores, default=None),
+        "lowest": min(scores, default=None),
+        "unscored": len(transcript) - len(scored),
+        "distribution": {score: scores.count(score) for score in range(1, 6)},
+        "dimensions": {name: {"sum": sum(values), "count": len(values), "min": min(values), "max": max(values)}
+                       for name, values in dimensions.items()},
+        # Best / worst first, earlier turns winning ties
+        "strengths": [index for index, turn in sorted(scored, key=lambda item: (-item[1]["score"], item[0]))
+                      if turn["score"] >= 4][:TOP_K],
+        "concerns": [index for index, turn in sorted(scored, key=lambda item: (item[1]["score"], item[0]))
+                     if turn["score"] <= 2][:TOP_K],
+        "quotes": [index for index, turn in scored if turn["score"] >= 4 or turn["score"] <= 2][:MAX_NOTABLE_QUOTES]
+    }
+
+
+def aggregates(session):
+    transcript = session.transcript
+    return {
+        "average": session.average_score,
+        "highest": session.highest_score,
+        "lowest": session.lowest_score,
+        "unscored": session.unscored_turns,
+        "distribution": session.score_distribution,
+        "dimensions": session.dimension_stats,
+        "strengths": [transcript.index(turn) for turn in session.top_strengths()],
+        "concerns": [transcript.index(turn) for turn in session.top_concerns()],
+        "quotes": session.notable_quotes
+    }
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_running_aggregates_match_a_full_recompute(seed):
+    session = random_session(seed)
+    assert aggregates(session) == recompute(session.transcript)
+
+
+def test_aggregates_after_every_turn():
+    session = InterviewSession("AI Engineer")
+    rng = random.Random(1)
+    for index in range(30):
+        session.add_turn(f"Question {index}?", f"Answer {index}.", rng.choice([None, 1, 2, 4, 5]),
+                         dimension=rng.choice(DIMENSIONS))
+        assert aggregates(session) == recompute(session.transcript)
+
+
+def test_ties_keep_the_earliest_turns():
+    session = InterviewSession("AI Engineer")
+    for index in range(5):
+        session.add_turn(f"Question {index}?", "Answer.", 5)
+        session.add_turn(f"Weak {index}?", "Answer.", 1)
+    assert [turn["question"] for turn in session.top_strengths()] == ["Question 0?", "Question 1?", "Question 2?"]
+    assert [turn["question"] for turn in session.top_concerns()] == ["Weak 0?", "Weak 1?", "Weak 2?"]
+
+
+def test_empty_session():
+    session = InterviewSession("AI Engineer")
+    assert aggregates(session) == recompute([])
+
+
+def test_compact_layout():
+    session = random_session(3)
+    assert session.scores.typecode == "b"
+    assert [session.score_at(i) for i in range(len(session))] == [turn["score"] for turn in session.transcript]
+    assert all(score == UNSCORED for i, score in enumerate(session.scores) if session.score_at(i) is None)
+    # Each dimension name is stored once and referenced by index
+    assert sorted(session.dimensions) == sorted({name for name in DIMENSIONS if name})
+    assert {turn.dimension_id for turn in session.turns} <= set(range(len(session.dimensions))) | {None}
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_round_trip_keeps_turns_and_aggregates(seed):
+    session = random_session(seed)
+    telemetry = TurnTelemetry()
+    telemetry.set_near_duplicate({"similarity": 0.97, "matched_score": 3, "reused": False, "flagged": True})
+    session.add_turn("Flagged?", "Copied answer.", 3, dimension="Communication", telemetry=telemetry.as_dict())
+    data = json.loads(json.dumps(session.to_dict()))
+    restored = InterviewSession.from_dict(data)
+    assert restored.to_dict() == data
+    assert (restored.role, restored.candidate_name, restored.template, restored.start_time) == (
+        session.role, session.candidate_name, session.template, session.start_time)
+    assert restored.scores == session.scores
+    assert restored.dimensions == session.dimensions
+    assert aggregates(restored) == aggregates(session)
+    assert restored.similar_answers == session.similar_answers == [len(session) - 1]
+    assert restored.telemetry.turns_measured == session.telemetry.turns_measured == 1